@@ -0,0 +1,120 @@
+"""
+Benchmark for `docsparser.get_parameter_info_from_docstring`.
+
+Compares parsing with all four format parsers (the old behaviour) with format
+detection, both cold (memoization cache cleared) and warm.
+Run as `python benchmarks/docsparser.py`.
+
+The corpus consists of prose docstrings from the standard library (which have
+no parameter section in any of the supported formats), and large docstrings in
+all four formats, modelled after wide real-world APIs (e.g. `pandas.read_csv`).
+"""
+
+import argparse
+import inspect
+import subprocess
+import textwrap
+import timeit
+
+from clargs import docsparser
+
+PARAMS = 60
+
+
+def sphynx_docstring(n: int) -> str:
+    return "Reads a table.\n\n" + "".join(
+        f":param param{i}(int): The parameter number {i}, which\n"
+        f"    is described in quite a lot of detail, with a line\n"
+        f"    break or two.\n"
+        for i in range(n)
+    )
+
+
+def epytext_docstring(n: int) -> str:
+    return sphynx_docstring(n).replace(":param", "@param")
+
+
+def googledoc_docstring(n: int) -> str:
+    return (
+        "Reads a table.\n\nArgs:\n"
+        + "".join(
+            f"    param{i} (int): The parameter number {i}, which\n"
+            f"        is described in quite a lot of detail.\n"
+            for i in range(n)
+        )
+        + "\nReturns:\n    A table\n"
+    )
+
+
+def numpydoc_docstring(n: int) -> str:
+    return (
+        "Reads a table.\n\nParameters\n----------\n"
+        + "".join(
+            f"param{i} : int, optional\n"
+            f"    The parameter number {i}, which\n"
+            f"    is described in quite a lot of detail.\n"
+            for i in range(n)
+        )
+        + "\nReturns\n-------\nDataFrame\n"
+    )
+
+
+CORPUS = {
+    "stdlib prose": [
+        inspect.getdoc(obj) or ""
+        for obj in (
+            argparse.ArgumentParser,
+            subprocess.Popen,
+            subprocess.run,
+            textwrap.TextWrapper,
+            timeit.Timer,
+        )
+    ],
+    "sphynx": [sphynx_docstring(PARAMS)],
+    "epytext": [epytext_docstring(PARAMS)],
+    "googledoc": [googledoc_docstring(PARAMS)],
+    "numpydoc": [numpydoc_docstring(PARAMS)],
+}
+
+
+def parse_with_all_parsers(docstring: str):
+    results: list = []
+    for parser in docsparser.format_parsers().values():
+        parser_results = parser.extract_parameters(docstring)
+        if len(parser_results) > len(results):
+            results = parser_results
+    return results
+
+
+def parse_cold(docstring: str):
+    docsparser._get_parameter_info_from_docstring.cache_clear()
+    return docsparser.get_parameter_info_from_docstring(docstring)
+
+
+def main():
+    number = 200
+    print(f"{'corpus':<14} {'all parsers':>12} {'detection':>12} {'memoized':>12}")
+    for name, docstrings in CORPUS.items():
+        for docstring in docstrings:
+            assert parse_with_all_parsers(docstring) == parse_cold(docstring)
+        timings = [
+            min(
+                timeit.repeat(
+                    lambda: [parse(docstring) for docstring in docstrings],
+                    number=number,
+                    repeat=5,
+                )
+            )
+            / number
+            * 1e6
+            for parse in (
+                parse_with_all_parsers,
+                parse_cold,
+                docsparser.get_parameter_info_from_docstring,
+            )
+        ]
+        print(f"{name:<14}" + "".join(f" {t:>10.1f}us" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark for numeric list parameters: `list[int]` / `list[float]` (converted
+by argparse, token by token, into a list of python objects) against
+`clargs.IntArray` / `clargs.FloatArray` (converted in batches into an
+`array.array`).
+
+Reports the time to parse the arguments, and the memory the parsed value
+takes (measured with tracemalloc, so including the element objects), for the
+values on the command line, and in a file (`@FILE`; for lists this needs
+`clargs.StreamedList`). On the command line most of the time is spent in
+argparse itself, which handles every token (and looks up negative numbers as
+possible options), for lists and arrays alike.
+Run as `python benchmarks/numeric_lists.py [N]`.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import clargs
+
+N = 1_000_000
+
+
+def int_list(*, values: list[int]):
+    pass
+
+
+def int_array(*, values: clargs.IntArray):
+    pass
+
+
+def float_list(*, values: list[float]):
+    pass
+
+
+def float_array(*, values: clargs.FloatArray):
+    pass
+
+
+def int_streamed_list(*, values: clargs.StreamedList[int]):
+    pass
+
+
+def float_streamed_list(*, values: clargs.StreamedList[float]):
+    pass
+
+
+def measure(func, argv):
+    parser = clargs.create_parser(func)
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        parser.parse_args(argv)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    args = parser.parse_args(argv)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del args
+    return min(timings), retained
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N
+    rng = random.Random(0)
+    ints = ["--values", *(str(rng.randrange(-(10**12), 10**12)) for _ in range(n))]
+    floats = ["--values", *(repr(rng.uniform(-1e6, 1e6)) for _ in range(n))]
+
+    print(f"{n} values")
+    print(f"{'parameter':<20} {'input':<6} {'time':>10} {'memory':>12}")
+    with tempfile.TemporaryDirectory() as tempdir:
+        for name, argv, funcs in [
+            ("ints", ints, [int_list, int_array, int_streamed_list]),
+            ("floats", floats, [float_list, float_array, float_streamed_list]),
+        ]:
+            path = os.path.join(tempdir, f"{name}.txt")
+            with open(path, "w") as f:
+                f.write("\n".join(argv[1:]))
+            list_func, array_func, streamed_func = funcs
+            for func, input, func_argv in [
+                (list_func, "argv", argv),
+                (array_func, "argv", argv),
+                (streamed_func, "@FILE", ["--values", f"@{path}"]),
+                (array_func, "@FILE", ["--values", f"@{path}"]),
+            ]:
+                elapsed, retained = measure(func, func_argv)
+                print(
+                    f"{func.__name__:<20} {input:<6} "
+                    f"{elapsed * 1e3:>8.0f}ms {retained / 2**20:>10.1f}MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,136 @@
-from .clargs import (
-    Clargs,
-    Settings,
-    ExtraInfo,
-    extra_info,
-    AddArgumentParameters,
-    create_parser,
-    add_to_parser,
-    add_subparser,
-    create_parser_and_run,
-    run,
-)
-
-from .helper_types import (
-    Flag,
-    Count,
-    ListOfAtLeastOne,
-    ExistingFilePath,
-    ExistingDirectoryPath,
-)
-
-from .aap_from_data import GetArgsFromTypeException
+"""
+The public names are imported from their submodules on first use (see
+`__getattr__`), so that `import clargs` itself costs next to nothing, e.g. for
+a CLI that only prints its version, or uses a cached parser.
+"""
 
+# typing.TYPE_CHECKING, without importing typing (deleted again below)
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .clargs import (
+        Clargs,
+        Settings,
+        ExtraInfo,
+        extra_info,
+        AddArgumentParameters,
+        ArgumentSpec,
+        create_parser,
+        build_parser,
+        add_to_parser,
+        add_subparser,
+        add_lazy_subparser,
+        create_parser_and_run,
+        run,
+        run_async,
+        run_many,
+        run_many_async,
+        serve,
+        fork_server,
+    )
+
+    from .helper_types import (
+        Flag,
+        Count,
+        ListOfAtLeastOne,
+        StreamedList,
+        ExistingFilePath,
+        ExistingDirectoryPath,
+        MappedFile,
+        IntArray,
+        FloatArray,
+    )
+
+    from .aap_from_data import GetArgsFromTypeException
+
+    from .lazy import LazySubParsersAction
+
+    from .batch import BatchResult
+
+    from .tracing import FlameTracer
+
+del TYPE_CHECKING
+
+# public name -> submodule that defines it
+_EXPORTS = {
+    "Clargs": "clargs",
+    "Settings": "clargs",
+    "ExtraInfo": "clargs",
+    "extra_info": "clargs",
+    "AddArgumentParameters": "clargs",
+    "ArgumentSpec": "clargs",
+    "create_parser": "clargs",
+    "build_parser": "clargs",
+    "add_to_parser": "clargs",
+    "add_subparser": "clargs",
+    "add_lazy_subparser": "clargs",
+    "LazySubParsersAction": "lazy",
+    "create_parser_and_run": "clargs",
+    "run": "clargs",
+    "run_async": "clargs",
+    "run_many": "clargs",
+    "run_many_async": "clargs",
+    "serve": "clargs",
+    "fork_server": "clargs",
+    "BatchResult": "batch",
+    "FlameTracer": "tracing",
+    "Flag": "helper_types",
+    "Count": "helper_types",
+    "ListOfAtLeastOne": "helper_types",
+    "StreamedList": "helper_types",
+    "GetArgsFromTypeException": "aap_from_data",
+    "ExistingFilePath": "helper_types",
+    "ExistingDirectoryPath": "helper_types",
+    "MappedFile": "helper_types",
+    "IntArray": "helper_types",
+    "FloatArray": "helper_types",
+}
+
+# a literal list, for linters; the same names as _EXPORTS
 __all__ = [
     "Clargs",
     "Settings",
     "ExtraInfo",
     "extra_info",
     "AddArgumentParameters",
+    "ArgumentSpec",
     "create_parser",
+    "build_parser",
     "add_to_parser",
     "add_subparser",
+    "add_lazy_subparser",
+    "LazySubParsersAction",
     "create_parser_and_run",
     "run",
+    "run_async",
+    "run_many",
+    "run_many_async",
+    "serve",
+    "fork_server",
+    "BatchResult",
+    "FlameTracer",
     "Flag",
     "Count",
     "ListOfAtLeastOne",
+    "StreamedList",
     "GetArgsFromTypeException",
     "ExistingFilePath",
     "ExistingDirectoryPath",
+    "MappedFile",
+    "IntArray",
+    "FloatArray",
 ]
+
+
+def __getattr__(name: str):
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    # same as `from .module import name`, and shows up in `python -X importtime`
+    value = getattr(__import__(module, globals(), None, [name], 1), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,113 @@
+import argparse
+import pathlib
+import sys
+import typing as t
+
+import clargs
+
+
+class TargetError(Exception):
+    """
+    The "module:name" target cannot be imported
+    """
+
+
+def import_target(target: str) -> t.Any:
+    from . import lazy
+
+    try:
+        return lazy.import_target(target)
+    except (ImportError, AttributeError, ValueError) as e:
+        raise TargetError(f"cannot import {target}: {e}") from e
+
+
+def compile_command(
+    target: str,
+    *,
+    output: t.Optional[pathlib.Path] = None,
+    check: clargs.Flag = False,
+) -> int:
+    """
+    Generates a python module with a static argparse parser for a function
+
+    :param target: The function, as "module:function"
+    :param output: The file to write to (default: stdout)
+    :param check: Don't write anything, but fail if output is not up to date
+    """
+    from . import codegen
+
+    import_target(target)
+    code = codegen.generate_module(clargs.Clargs(), target)
+    if check:
+        if output is None:
+            print("--check needs --output", file=sys.stderr)
+            return 2
+        if not output.is_file() or output.read_text() != code:
+            print(f"{output} is not up to date with {target}", file=sys.stderr)
+            return 1
+        return 0
+    if output is None:
+        sys.stdout.write(code)
+    else:
+        output.write_text(code)
+    return 0
+
+
+def completion(
+    shell: t.Literal["bash", "zsh", "fish"],
+    target: str,
+    *,
+    prog: t.Optional[str] = None,
+    output: t.Optional[pathlib.Path] = None,
+) -> int:
+    """
+    Generates a shell completion script for a function
+
+    :param shell: The shell to generate the script for
+    :param target: The function, a list of functions (as subcommands) or an
+        argparse parser, as "module:name"
+    :param prog: The command to complete (default: the top-level package of
+        target, e.g. "mytool" for "mytool.cli:main")
+    :param output: The file to write to (default: stdout)
+    """
+    from . import completion
+    from . import lazy
+
+    obj = import_target(target)
+    if isinstance(obj, argparse.ArgumentParser):
+        parser = obj
+    else:
+        parser = clargs.build_parser(obj)
+    if prog is None:
+        prog = lazy.split_target(target)[0].partition(".")[0]
+    script = completion.generate(
+        parser,
+        shell,
+        prog,
+        source=f"python -m clargs completion {shell} {target} --prog {prog}",
+    )
+    if output is None:
+        sys.stdout.write(script)
+    else:
+        output.write_text(script)
+    return 0
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m clargs")
+    subparsers = parser.add_subparsers(required=True)
+    clargs.add_subparser(subparsers, compile_command, name="compile")
+    clargs.add_subparser(subparsers, completion)
+    return parser
+
+
+def main(args=None) -> int:
+    parser = create_parser()
+    try:
+        return clargs.run(parser.parse_args(args))
+    except TargetError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
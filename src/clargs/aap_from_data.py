@@ -1,6 +1,13 @@
 from __future__ import annotations
+import argparse
+import array
+import collections.abc
+import functools
 import inspect
+from . import arrays
 from . import clargs
+from . import streaming
+from . import tracing
 import types
 import typing as t
 import pathlib
@@ -26,6 +33,85 @@ SIMPLE_TYPES: t.Mapping[t.Any, t.Callable[[str], t.Any]] = {
 }
 
 
+class MappingLookup(t.Generic[T]):
+    def __init__(self, mapping: t.Mapping[str, T]):
+        self.mapping = mapping
+
+    def __call__(self, key: str) -> T:
+        return self.mapping[key]
+
+    def __repr__(self):
+        return f"MappingLookup({self.mapping!r})"
+
+
+class ValidatedType(t.Generic[T]):
+    """
+    Wraps a type and validates the result after conversion.
+
+    This is a class (instead of a closure) so that it can be pickled and
+    referred to by import path.
+    """
+
+    def __init__(
+        self, originaltype: t.Callable[..., T], validate: t.Callable[[T], bool]
+    ):
+        self.originaltype = originaltype
+        self.validate = validate
+        # argparse uses __name__ in the "invalid <name> value" error message
+        self.__name__ = f"{originaltype.__name__}-validation"
+
+    def __call__(self, *args, **kwargs) -> T:
+        result = self.originaltype(*args, **kwargs)
+        tracer = tracing.active()
+        if tracer is None:
+            valid = self.validate(result)
+        else:
+            with tracing.span(tracer, "validate", type=self.__name__):
+                valid = self.validate(result)
+        if not valid:
+            raise ValueError("Problem with validation")
+        return result
+
+    def __repr__(self):
+        return f"ValidatedType({self.originaltype!r}, {self.validate!r})"
+
+
+# Validators that have a faster way to validate many values at once: maps the
+# validator to a function that returns the values that fail validation
+BATCH_VALIDATORS: t.Dict[
+    t.Callable[[t.Any], bool], t.Callable[[t.Sequence[t.Any]], t.Sequence[t.Any]]
+] = {}
+
+
+class BatchValidatedExtendAction(argparse._ExtendAction):
+    """
+    The "extend" action, that validates all values at once (see
+    `BATCH_VALIDATORS`), and reports all values that fail.
+    """
+
+    def __init__(
+        self,
+        option_strings,
+        dest,
+        *,
+        find_failures: t.Callable[[t.Sequence[t.Any]], t.Sequence[t.Any]],
+        **kwargs,
+    ):
+        super().__init__(option_strings, dest, **kwargs)
+        self.find_failures = find_failures
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        with tracing.span(tracing.active(), "validate", parameter=self.dest):
+            failures = self.find_failures(values)
+        if failures:
+            raise argparse.ArgumentError(
+                self,
+                f"Problem with validation of {len(failures)} value(s): "
+                + ", ".join(repr(str(failure)) for failure in failures),
+            )
+        super().__call__(parser, namespace, values, option_string)
+
+
 class AutoGeneratedShortName(str):
     pass
 
@@ -44,6 +130,90 @@ def issubclass_rugged(subcls, parentcls) -> bool:
         return False
 
 
+def _unwrap(
+    param: inspect.Parameter, typehint: t.Any
+) -> t.Tuple[t.Any, clargs.ExtraInfo]:
+    """
+    Returns the type (without Annotated and Optional) and the ExtraInfo
+    """
+    (typ, *metadatas) = (
+        t.get_args(typehint)
+        if t.get_origin(typehint) == t.Annotated
+        else (typehint, [])
+    )
+
+    if t.get_origin(typ) == t.Union or t.get_origin(typ) == types.UnionType:  # noqa
+        # check for Optional[]; if so, remove
+        args = list(t.get_args(typ))
+        if len(args) == 2 and type(None) in args:
+            typehint = args[0] if args[1] is type(None) else args[1]  # noqa
+            (typ, *extra_metadatas) = (
+                t.get_args(typehint)
+                if t.get_origin(typehint) == t.Annotated
+                else (typehint, [])
+            )
+            metadatas = [*metadatas, *extra_metadatas]
+
+    extra_infos = [
+        *(md for md in metadatas if isinstance(md, clargs.ExtraInfo)),
+    ]
+    if len(extra_infos) > 1:
+        raise GetArgsFromTypeException(param, "Can only have one ExtraInfo")
+    extra_info = extra_infos[0] if extra_infos else clargs.ExtraInfo()
+    return typ, extra_info
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class ResolvedType(t.Generic[T]):
+    """
+    What only depends on the type hint of a parameter: the unwrapped type, its
+    ExtraInfo, and the AddArgumentParameters of the handler that matched
+    """
+
+    typ: t.Type[T]
+    extra_info: clargs.ExtraInfo
+    handler: str
+    aap: clargs.AddArgumentParameters[T]
+
+
+def metadata_ids(typehint: t.Any) -> t.Tuple[int, ...]:
+    """
+    The ids of all Annotated metadata in the type hint. Annotated compares its
+    metadata by value, and `extra_info(default=0)` equals `extra_info(default=False)`
+    """
+    return (
+        *(id(metadata) for metadata in getattr(typehint, "__metadata__", ())),
+        *(i for arg in t.get_args(typehint) for i in metadata_ids(arg)),
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def resolve_type(
+    typehint: t.Any, metadata_ids: t.Tuple[int, ...], settings: clargs.Settings
+) -> ResolvedType:
+    """
+    Resolves a type hint once, for all parameters (of all functions) that use
+    it. Raises for type hints that cannot be used; the error is reported again,
+    for the actual parameter, by AapFromData.
+
+    The metadata_ids (see above) are only part of the cache key; the cached
+    type hint keeps the metadata alive, so the ids are not reused.
+    """
+    param = inspect.Parameter("_", inspect.Parameter.KEYWORD_ONLY, annotation=typehint)
+    typ, extra_info = _unwrap(param, typehint)
+    data = AapFromData(
+        typ=typ,
+        param=param,
+        settings=settings,
+        extra_info=extra_info,
+        docstring_description=None,
+    )
+    handler, aap = data.match_handler()
+    if handler is None or aap is None:
+        raise GetArgsFromTypeException(param, "Cannot find a rule for this type.")
+    return ResolvedType(typ=typ, extra_info=extra_info, handler=handler, aap=aap)
+
+
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class AapFromData(t.Generic[T]):
     typ: t.Type[T]
@@ -51,6 +221,7 @@ class AapFromData(t.Generic[T]):
     settings: clargs.Settings
     extra_info: clargs.ExtraInfo
     docstring_description: t.Optional[str]
+    resolved: t.Optional[ResolvedType[T]] = None
 
     @classmethod
     def from_param_and_settings(
@@ -73,31 +244,23 @@ class AapFromData(t.Generic[T]):
         typehint = (
             str if param.annotation is inspect.Parameter.empty else param.annotation
         )
-        (typ, *metadatas) = (
-            t.get_args(typehint)
-            if t.get_origin(typehint) == t.Annotated
-            else (typehint, [])
-        )
-
-        if t.get_origin(typ) == t.Union or t.get_origin(typ) == types.UnionType:  # noqa
-            # check for Optional[]; if so, remove
-            args = list(t.get_args(typ))
-            if len(args) == 2 and type(None) in args:
-                typehint = args[0] if args[1] is type(None) else args[1]  # noqa
-                (typ, *extra_metadatas) = (
-                    t.get_args(typehint)
-                    if t.get_origin(typehint) == t.Annotated
-                    else (typehint, [])
-                )
-                metadatas = [*metadatas, *extra_metadatas]
-
-        extra_infos = [
-            *(md for md in metadatas if isinstance(md, clargs.ExtraInfo)),
-        ]
-        if len(extra_infos) > 1:
-            raise GetArgsFromTypeException(param, "Can only have one ExtraInfo")
-        extra_info = extra_infos[0] if extra_infos else clargs.ExtraInfo()
+        try:
+            resolved = resolve_type(typehint, metadata_ids(typehint), settings)
+        except (GetArgsFromTypeException, TypeError):
+            # not cached: type hints that are not hashable (TypeError), or
+            # that cannot be used, which is reported for this parameter
+            resolved = None
+        if resolved is not None:
+            return cls(
+                typ=resolved.typ,
+                param=param,
+                docstring_description=docstring_description,
+                settings=settings,
+                extra_info=resolved.extra_info,
+                resolved=resolved,
+            )
 
+        typ, extra_info = _unwrap(param, typehint)
         return cls(
             typ=typ,
             param=param,
@@ -173,7 +336,7 @@ class AapFromData(t.Generic[T]):
         mapping = self.extra_info.mapping
         return clargs.AddArgumentParameters(
             choices=list(mapping.keys()),
-            type=lambda x: mapping[x],
+            type=MappingLookup(mapping),
         )
 
     def handle_literal(
@@ -200,20 +363,60 @@ class AapFromData(t.Generic[T]):
         return result.with_fields({"choices": args})
 
     def handle_list(self) -> None | clargs.AddArgumentParameters[T]:
-        if not issubclass_rugged(t.get_origin(self.typ), t.Sequence):
+        # Iterator / Iterable parameters get their elements as they are read
+        lazy = t.get_origin(self.typ) in (
+            collections.abc.Iterator,
+            collections.abc.Iterable,
+        )
+        if not lazy and not issubclass_rugged(t.get_origin(self.typ), t.Sequence):
             return None
         if issubclass_rugged(t.get_origin(self.typ), t.Tuple):
             # Tuples not supported
             return None
         args = t.get_args(self.typ)
         assert len(args) == 1
-        result = self.handle_simple_type(override_typ=args[0]) or self.handle_literal(
-            override_typ=args[0]
+        # inner validation, e.g. list[clargs.ExistingFilePath]
+        (innertyp, *metadatas) = (
+            t.get_args(args[0])
+            if t.get_origin(args[0]) == t.Annotated
+            else (args[0], [])
+        )
+        validates = [
+            md.validate
+            for md in metadatas
+            if isinstance(md, clargs.ExtraInfo)
+            and not isinstance(md.validate, clargs.NOT_SET_TYPE)
+        ]
+        validate = validates[0] if validates else None
+        result = self.handle_simple_type(override_typ=innertyp) or self.handle_literal(
+            override_typ=innertyp
         )
         if not result:
             raise GetArgsFromTypeException(
                 self.param, "List only supports simple and literal inner types."
             )
+        find_failures = BATCH_VALIDATORS.get(validate) if validate else None
+        if validate and (lazy or self.extra_info.stream or not find_failures):
+            assert not isinstance(result.type, clargs.NOT_SET_TYPE)
+            result = result.with_fields({"type": ValidatedType(result.type, validate)})
+        if lazy or self.extra_info.stream:
+            return result.with_fields(
+                {
+                    "nargs": "*",
+                    "action": streaming.StreamingIterAction
+                    if lazy
+                    else streaming.StreamingListAction,
+                }
+            )
+        if find_failures:
+            return result.with_fields(
+                {
+                    "nargs": "*",
+                    "action": functools.partial(
+                        BatchValidatedExtendAction, find_failures=find_failures
+                    ),
+                }
+            )
         return result.with_fields(
             {
                 "nargs": "*",
@@ -221,57 +424,84 @@ class AapFromData(t.Generic[T]):
             }
         )
 
+    def handle_array(self) -> None | clargs.AddArgumentParameters[T]:
+        if not issubclass_rugged(self.typ, array.array):
+            return None
+        action = self.extra_info.add_argument_parameters.action
+        if not issubclass_rugged(action, arrays.ArrayAction):
+            raise GetArgsFromTypeException(
+                self.param, "Use clargs.IntArray or clargs.FloatArray for arrays."
+            )
+        return clargs.AddArgumentParameters(nargs="*")
+
+    def match_handler(
+        self,
+    ) -> t.Tuple[t.Optional[str], t.Optional[clargs.AddArgumentParameters[T]]]:
+        """
+        Returns the name and result of the first handler that matches the type
+        """
+        for handler in (
+            self.handle_explicit_type,
+            self.handle_literal,
+            self.handle_simple_type,
+            self.handle_list,
+            self.handle_array,
+        ):
+            aap = handler()
+            if aap:
+                return handler.__name__, aap
+        return None, None
+
     def get_args_and_aap(
         self,
     ) -> t.Tuple[t.Sequence[str], clargs.AddArgumentParameters[T]]:
-        aap = (
-            None
-            or self.handle_explicit_type()
-            or self.handle_literal()
-            or self.handle_simple_type()
-            or self.handle_list()
-        )
+        with tracing.span(
+            self.settings.tracer, "resolve_type", parameter=self.param.name
+        ) as attributes:
+            handler: t.Optional[str]
+            aap: t.Optional[clargs.AddArgumentParameters[T]]
+            if self.resolved is not None:
+                handler, aap = self.resolved.handler, self.resolved.aap
+            else:
+                handler, aap = self.match_handler()
+            if handler is not None:
+                attributes["handler"] = handler
+            return self._complete_args_and_aap(aap)
+
+    def _complete_args_and_aap(
+        self, aap: t.Optional[clargs.AddArgumentParameters[T]]
+    ) -> t.Tuple[t.Sequence[str], clargs.AddArgumentParameters[T]]:
         if not aap:
             raise GetArgsFromTypeException(
                 self.param, "Cannot find a rule for this type."
             )
+        # the per-parameter fields, merged into the (shared) aap of the type at once
+        fields: t.Dict[str, t.Any] = {}
         if self.docstring_description is not None:
-            aap = aap.with_fields({"help": self.docstring_description})
+            fields["help"] = self.docstring_description
         if self.has_default():
-            aap = aap.with_fields(
-                {
-                    "default": self.param.default,
-                }
-            )
+            fields["default"] = self.param.default
 
             if self.arg_type_is_flag() and not aap.action:
-                aap = aap.with_fields({"required": False})
+                fields["required"] = False
             else:
                 if aap.nargs == clargs.NOT_SET:
-                    aap = aap.with_fields({"nargs": "?"})
+                    fields["nargs"] = "?"
         else:
             if (
                 self.arg_type_is_flag()
                 and not aap.action
                 and aap.nargs not in ["*", "?"]
             ):
-                aap = aap.with_fields({"required": True})
+                fields["required"] = True
 
         # overwrite any explicitly set data
-        aap = aap.with_fields(self.extra_info.add_argument_parameters)
-
-        if self.extra_info.validate is not clargs.NOT_SET:
-            assert not isinstance(aap.type, clargs.NOT_SET_TYPE)
-            originaltype = aap.type
-
-            def validate(*args, **kwargs):
-                result = originaltype(*args, **kwargs)
-                if not self.extra_info.validate(result):
-                    raise ValueError("Problem with validation")
-                return result
-
-            validate.__name__ = f"{originaltype.__name__}-validation"
+        fields.update(self.extra_info.add_argument_parameters.asdict(keep_unset=True))
 
-            aap = aap.with_fields({"type": validate})
+        if not isinstance(self.extra_info.validate, clargs.NOT_SET_TYPE):
+            typ = fields.get("type", aap.type)
+            assert not isinstance(typ, clargs.NOT_SET_TYPE)
+            fields["type"] = ValidatedType(typ, self.extra_info.validate)
 
+        aap = aap.with_fields(fields)
         return (self.get_all_param_names(), aap)
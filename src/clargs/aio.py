@@ -0,0 +1,207 @@
+"""
+Support for `async def` functions.
+
+`Clargs.run` runs the coroutine of an `async def` function on a new event
+loop (see `Settings.event_loop_factory` and `Settings.asyncio_debug`).
+
+For batches, the invocations of an `async def` function run concurrently on
+one event loop; `jobs` limits how many run at the same time. Lines are parsed
+as they are needed, so the input is not read in at once.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import collections
+import contextlib
+import contextvars
+import dataclasses
+import io
+import sys
+import typing as t
+
+from . import batch
+
+if t.TYPE_CHECKING:
+    from .clargs import Clargs, Settings
+
+T = t.TypeVar("T")
+
+
+@contextlib.contextmanager
+def event_loop(settings: Settings) -> t.Iterator[asyncio.AbstractEventLoop]:
+    """
+    A new event loop, closed like `asyncio.run` does.
+
+    Unlike `asyncio.run`, it's not set as the event loop of the thread: the
+    coroutine finds it as the running loop, and any event loop that the
+    caller set stays set.
+    """
+    factory = settings.event_loop_factory or asyncio.new_event_loop
+    loop = factory()
+    loop.set_debug(settings.asyncio_debug)
+    try:
+        yield loop
+    finally:
+        try:
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                # gather finds the loop from the tasks
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            loop.close()
+
+
+def run_coroutine(coroutine: t.Awaitable[T], settings: Settings) -> T:
+    with event_loop(settings) as loop:
+        return loop.run_until_complete(coroutine)
+
+
+_stdout: contextvars.ContextVar[t.Optional[io.StringIO]] = contextvars.ContextVar(
+    "clargs_stdout", default=None
+)
+
+
+class _ContextStdout:
+    """
+    Stands in for sys.stdout, so that every task writes to its own capture
+    """
+
+    def __init__(self, default):
+        self._default = default
+
+    def __getattr__(self, name):
+        return getattr(_stdout.get() or self._default, name)
+
+
+async def _call(
+    line_number: int,
+    args: argparse.Namespace,
+    semaphore: asyncio.Semaphore,
+    capture_output: bool,
+) -> batch.BatchResult:
+    from .clargs import Clargs
+
+    stdout = io.StringIO() if capture_output else None
+    if stdout is not None:
+        # tasks run in a copy of the context, so this is only for this task
+        _stdout.set(stdout)
+    async with semaphore:
+        try:
+            result = await Clargs.run_async(args)
+        except SystemExit as e:
+            result = batch.BatchResult(
+                line_number=line_number,
+                exit_status=batch.exit_status(e),
+                error=None if isinstance(e.code, (int, type(None))) else str(e.code),
+            )
+        except Exception as e:
+            result = batch.BatchResult(
+                line_number=line_number, exit_status=1, error=batch._error_message(e)
+            )
+        else:
+            result = batch.BatchResult(
+                line_number=line_number, exit_status=0, result=result
+            )
+    if stdout is not None:
+        result = dataclasses.replace(result, stdout=stdout.getvalue())
+    return result
+
+
+async def run_many_async(
+    clargs_obj: Clargs,
+    func: t.Callable,
+    lines: t.Iterable[str | t.Sequence[str]],
+    *,
+    capture_output: bool = False,
+    jobs: int = 1,
+    ordered: bool = True,
+) -> t.AsyncGenerator[batch.BatchResult, None]:
+    parser = clargs_obj.create_parser(func)
+    semaphore = asyncio.Semaphore(jobs)
+    # limits the number of parsed lines waiting for the semaphore
+    max_pending = jobs * 4
+    pending: t.Deque[asyncio.Future[batch.BatchResult]] = collections.deque()
+
+    async def completed() -> t.AsyncIterator[batch.BatchResult]:
+        if ordered:
+            yield await pending.popleft()
+            return
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for future in [future for future in pending if future in done]:
+            pending.remove(future)
+            yield future.result()
+
+    original_stdout = sys.stdout
+    if capture_output:
+        sys.stdout = t.cast(t.Any, _ContextStdout(original_stdout))
+    try:
+        for line_number, argv in batch.numbered_argvs(lines):
+            parsed: argparse.Namespace | batch.BatchResult
+            if isinstance(argv, batch.BatchResult):
+                parsed = argv
+            else:
+                stdout = io.StringIO()
+                with (
+                    contextlib.redirect_stdout(stdout)
+                    if capture_output
+                    else contextlib.nullcontext()
+                ):
+                    parsed = batch.parse_argv(parser, line_number, argv)
+                if isinstance(parsed, batch.BatchResult) and capture_output:
+                    parsed = dataclasses.replace(parsed, stdout=stdout.getvalue())
+            if isinstance(parsed, batch.BatchResult):
+                future: asyncio.Future[batch.BatchResult] = (
+                    asyncio.get_running_loop().create_future()
+                )
+                future.set_result(parsed)
+            else:
+                future = asyncio.create_task(
+                    _call(line_number, parsed, semaphore, capture_output)
+                )
+            pending.append(future)
+            while len(pending) > max_pending:
+                async for result in completed():
+                    yield result
+        while pending:
+            async for result in completed():
+                yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        if capture_output:
+            sys.stdout = original_stdout
+
+
+def run_many(
+    clargs_obj: Clargs,
+    func: t.Callable,
+    lines: t.Iterable[str | t.Sequence[str]],
+    *,
+    capture_output: bool = False,
+    jobs: int = 1,
+    ordered: bool = True,
+) -> t.Iterator[batch.BatchResult]:
+    """
+    Runs `run_many_async` on a new event loop
+    """
+    results = run_many_async(
+        clargs_obj,
+        func,
+        lines,
+        capture_output=capture_output,
+        jobs=jobs,
+        ordered=ordered,
+    )
+    with event_loop(clargs_obj.settings) as loop:
+        try:
+            while True:
+                yield loop.run_until_complete(results.__anext__())
+        except StopAsyncIteration:
+            pass
+        finally:
+            loop.run_until_complete(results.aclose())
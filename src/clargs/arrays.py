@@ -0,0 +1,91 @@
+"""
+Numeric list arguments as compact `array.array`s, for `clargs.IntArray` and
+`clargs.FloatArray`.
+
+argparse converts the values of a `list[int]` one at a time (calling the
+`type` and the action for every token) and stores them as python objects. The
+actions here get the strings, and convert them in batches straight into an
+`array.array` (8 bytes per element). Like streamed lists (`clargs.streaming`)
+values can also be `@FILE` or `-`.
+
+NumPy users can wrap the result without a copy: `numpy.frombuffer(values,
+dtype=numpy.int64)` (or `numpy.float64`).
+"""
+
+from __future__ import annotations
+import argparse
+import array
+import itertools
+import typing as t
+
+from . import streaming
+
+BATCHSIZE = 1 << 16
+
+
+class ArrayAction(argparse.Action):
+    typecode: t.ClassVar[str]
+    converter: t.ClassVar[t.Callable[[str], t.Any]]
+
+    def __init__(self, option_strings, dest, *, type=None, **kwargs):
+        # argparse should pass the strings unchanged; they are converted here
+        super().__init__(option_strings, dest, **kwargs)
+
+    def _invalid(
+        self, tokens: t.Sequence[str], location: t.Optional[str], offset: int
+    ) -> argparse.ArgumentError:
+        converter = type(self).converter
+        for index, token in enumerate(tokens, offset + 1):
+            try:
+                array.array(self.typecode, [converter(token)])
+            except (TypeError, ValueError, OverflowError) as e:
+                where = f" ({location}, item {index})" if location else ""
+                reason = " (out of range)" if isinstance(e, OverflowError) else ""
+                return argparse.ArgumentError(
+                    self,
+                    f"invalid {converter.__name__} value: {token!r}{where}{reason}",
+                )
+        raise AssertionError("No invalid token found")
+
+    def _extend(
+        self, result: array.array, tokens: t.Iterable[str], location: t.Optional[str]
+    ):
+        converter = type(self).converter
+        tokens = iter(tokens)
+        offset = 0
+        while batch := list(itertools.islice(tokens, BATCHSIZE)):
+            try:
+                result.extend(map(converter, batch))
+            except (TypeError, ValueError, OverflowError):
+                raise self._invalid(batch, location, offset)
+            offset += len(batch)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        result = array.array(self.typecode, getattr(namespace, self.dest, None) or ())
+        if "-" not in values and "\0@" not in "\0".join(["", *values]):
+            # only values on the command line; convert in one go
+            try:
+                result.extend(map(type(self).converter, values))
+            except (TypeError, ValueError, OverflowError):
+                raise self._invalid(values, None, 0)
+            setattr(namespace, self.dest, result)
+            return
+        for is_source, group in itertools.groupby(values, streaming.is_source):
+            if not is_source:
+                self._extend(result, group, None)
+                continue
+            for value in group:
+                name, opener = streaming.open_source(self, value)
+                with opener as f:
+                    self._extend(result, streaming.split_stream(f), name)
+        setattr(namespace, self.dest, result)
+
+
+class IntArrayAction(ArrayAction):
+    typecode = "q"
+    converter = int
+
+
+class FloatArrayAction(ArrayAction):
+    typecode = "d"
+    converter = float
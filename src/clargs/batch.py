@@ -0,0 +1,417 @@
+"""
+Batch mode: run many argument vectors through one parser.
+
+Every line is one argument vector, either as shell text (split with
+`shlex.split`) or as a JSON array of strings. Lines with only whitespace are
+skipped (use `[]` for an empty argument vector). Every line gives a
+`BatchResult`, so that a failing line (parse error, exception, `sys.exit`)
+doesn't stop the batch.
+
+Lines are always parsed in this process. The function is called either here,
+or (with `jobs` > 1) in a process pool. Workers don't get the parser or the
+function; they import the function by its qualified name, and get the bound
+arguments. Mapped files and iterators can't be sent to a worker, so
+functions that take them are rejected for the pool. `async def` functions run
+on one event loop instead (see `clargs.aio`).
+"""
+
+from __future__ import annotations
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import dataclasses
+import functools
+import inspect
+import io
+import json
+import os
+import shlex
+import sys
+import traceback
+import typing as t
+
+from . import lazy
+
+if t.TYPE_CHECKING:
+    from .clargs import Clargs
+
+BATCH_SWITCH = "--clargs-batch"
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class BatchResult:
+    line_number: int
+    exit_status: int
+    result: t.Any = None
+    error: t.Optional[str] = None
+    stdout: t.Optional[str] = None
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "line": self.line_number,
+                "status": self.exit_status,
+                "result": self.result,
+                "error": self.error,
+                "stdout": self.stdout,
+            },
+            default=repr,
+        )
+
+
+def split_line(line: str | t.Sequence[str]) -> t.List[str]:
+    if not isinstance(line, str):
+        return list(line)
+    if line.lstrip().startswith("["):
+        argv = json.loads(line)
+        if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+            raise ValueError("JSON line should be an array of strings")
+        return argv
+    return shlex.split(line)
+
+
+def exit_status(exc: SystemExit) -> int:
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    return 1
+
+
+def _error_message(exc: BaseException) -> str:
+    return "".join(traceback.format_exception_only(type(exc), exc)).strip()
+
+
+def numbered_argvs(
+    lines: t.Iterable[str | t.Sequence[str]],
+) -> t.Iterator[t.Tuple[int, t.List[str] | BatchResult]]:
+    """
+    Yields (line number, argv) or (line number, BatchResult) for bad lines
+    """
+    for line_number, line in enumerate(lines, 1):
+        if isinstance(line, str) and not line.strip():
+            continue
+        try:
+            yield line_number, split_line(line)
+        except ValueError as e:
+            yield (
+                line_number,
+                BatchResult(
+                    line_number=line_number,
+                    exit_status=2,
+                    error=f"Cannot read line: {e}",
+                ),
+            )
+
+
+def parse_argv(
+    parser: argparse.ArgumentParser, line_number: int, argv: t.Sequence[str]
+) -> argparse.Namespace | BatchResult:
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr):
+            return parser.parse_args(argv)
+    except SystemExit as e:
+        return BatchResult(
+            line_number=line_number,
+            exit_status=exit_status(e),
+            error=stderr.getvalue().strip() or None,
+        )
+
+
+def call(line_number: int, function: t.Callable[[], t.Any]) -> BatchResult:
+    try:
+        result = function()
+    except SystemExit as e:
+        return BatchResult(
+            line_number=line_number,
+            exit_status=exit_status(e),
+            error=None if isinstance(e.code, (int, type(None))) else str(e.code),
+        )
+    except Exception as e:
+        return BatchResult(
+            line_number=line_number, exit_status=1, error=_error_message(e)
+        )
+    return BatchResult(line_number=line_number, exit_status=0, result=result)
+
+
+def _captured(capture_output: bool, make_result: t.Callable[[], BatchResult]):
+    if not capture_output:
+        return make_result()
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        result = make_result()
+    return dataclasses.replace(result, stdout=stdout.getvalue())
+
+
+def run_many(
+    clargs_obj: Clargs,
+    func: t.Callable,
+    lines: t.Iterable[str | t.Sequence[str]],
+    *,
+    capture_output: bool = False,
+    jobs: int = 1,
+    chunksize: int = 16,
+    ordered: bool = True,
+    mp_context: t.Optional[str] = None,
+) -> t.Iterator[BatchResult]:
+    if inspect.iscoroutinefunction(func):
+        from . import aio
+
+        return aio.run_many(
+            clargs_obj,
+            func,
+            lines,
+            capture_output=capture_output,
+            jobs=jobs,
+            ordered=ordered,
+        )
+    parser = clargs_obj.create_parser(func)
+    if jobs > 1:
+        _check_sendable(parser)
+        return _run_many_in_pool(
+            parser,
+            _function_target(func),
+            lines,
+            capture_output=capture_output,
+            jobs=jobs,
+            chunksize=chunksize,
+            ordered=ordered,
+            mp_context=mp_context,
+        )
+    return _run_many_here(clargs_obj, parser, lines, capture_output=capture_output)
+
+
+def _run_many_here(
+    clargs_obj: Clargs,
+    parser: argparse.ArgumentParser,
+    lines: t.Iterable[str | t.Sequence[str]],
+    *,
+    capture_output: bool,
+) -> t.Iterator[BatchResult]:
+    def parse_and_call(line_number: int, argv: t.Sequence[str]) -> BatchResult:
+        args = parse_argv(parser, line_number, argv)
+        if isinstance(args, BatchResult):
+            return args
+        thunk = functools.partial(clargs_obj.run, args, clargs_obj.settings)
+        return call(line_number, thunk)
+
+    for line_number, argv in numbered_argvs(lines):
+        if isinstance(argv, BatchResult):
+            yield argv
+            continue
+        yield _captured(
+            capture_output, functools.partial(parse_and_call, line_number, argv)
+        )
+
+
+# (line number, positional arguments, keyword arguments), or a result already
+_ChunkItem = t.Union[t.Tuple[int, t.List[t.Any], t.Dict[str, t.Any]], BatchResult]
+
+# functions imported in the worker process, by target
+_worker_functions: t.Dict[str, t.Callable] = {}
+
+
+def _run_chunk(
+    target: str, chunk: t.Sequence[_ChunkItem], capture_output: bool
+) -> t.List[BatchResult]:
+    if target not in _worker_functions:
+        _worker_functions[target] = lazy.import_target(target)
+    function = _worker_functions[target]
+    results = []
+    for item in chunk:
+        if isinstance(item, BatchResult):
+            results.append(item)
+            continue
+        line_number, positional, keyword = item
+        thunk = functools.partial(function, *positional, **keyword)
+        results.append(
+            _captured(capture_output, functools.partial(call, line_number, thunk))
+        )
+    return results
+
+
+def _check_sendable(parser: argparse.ArgumentParser) -> None:
+    """
+    Raises if the parser gives values that can't be pickled for a worker: the
+    `memoryview` of a `MappedFile` and the iterator of an `Iterator[X]`
+    """
+    from . import aap_from_data
+    from . import mapped
+    from . import streaming
+
+    for action in parser._actions:
+        typ = action.type
+        if isinstance(typ, aap_from_data.ValidatedType):
+            typ = typ.originaltype
+        if typ is mapped.map_file or isinstance(action, streaming.StreamingIterAction):
+            raise ValueError(
+                f"To run in a process pool, {action.dest} cannot be a MappedFile "
+                "or an iterator; use a list, or jobs=1"
+            )
+
+
+def _function_target(func: t.Callable) -> str:
+    target = f"{func.__module__}:{func.__qualname__}"
+    try:
+        found = lazy.import_target(target)
+    except (ImportError, AttributeError, ValueError):
+        found = None
+    if found is not func:
+        raise ValueError(
+            f"To run in a process pool, {func!r} must be importable as {target}"
+        )
+    return target
+
+
+def _chunk_results(
+    future: concurrent.futures.Future, line_numbers: t.Sequence[int]
+) -> t.List[BatchResult]:
+    try:
+        return future.result()
+    except Exception as e:
+        # e.g. an argument or return value that could not be pickled
+        return [
+            BatchResult(
+                line_number=line_number,
+                exit_status=1,
+                error=f"Worker failed: {_error_message(e)}",
+            )
+            for line_number in line_numbers
+        ]
+
+
+def _run_many_in_pool(
+    parser: argparse.ArgumentParser,
+    target: str,
+    lines: t.Iterable[str | t.Sequence[str]],
+    *,
+    capture_output: bool,
+    jobs: int,
+    chunksize: int,
+    ordered: bool,
+    mp_context: t.Optional[str],
+) -> t.Iterator[BatchResult]:
+    import multiprocessing
+
+    from .clargs import Clargs
+
+    # limits the number of parsed lines waiting for a worker
+    max_pending = jobs * 4
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context(mp_context) if mp_context else None,
+    ) as executor:
+        pending: t.Deque[t.Tuple[concurrent.futures.Future, t.List[int]]] = (
+            collections.deque()
+        )
+
+        def completed() -> t.Iterator[BatchResult]:
+            if ordered:
+                yield from _chunk_results(*pending.popleft())
+                return
+            done, _ = concurrent.futures.wait(
+                [future for future, _ in pending],
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for item in [item for item in pending if item[0] in done]:
+                pending.remove(item)
+                yield from _chunk_results(*item)
+
+        chunk: t.List[_ChunkItem] = []
+
+        def submit():
+            line_numbers = [
+                item.line_number if isinstance(item, BatchResult) else item[0]
+                for item in chunk
+            ]
+            future = executor.submit(_run_chunk, target, list(chunk), capture_output)
+            pending.append((future, line_numbers))
+            chunk.clear()
+
+        for line_number, argv in numbered_argvs(lines):
+            if isinstance(argv, BatchResult):
+                chunk.append(argv)
+            else:
+                stdout = io.StringIO()
+                with (
+                    contextlib.redirect_stdout(stdout)
+                    if capture_output
+                    else contextlib.nullcontext()
+                ):
+                    args = parse_argv(parser, line_number, argv)
+                if isinstance(args, BatchResult):
+                    if capture_output:
+                        args = dataclasses.replace(args, stdout=stdout.getvalue())
+                    chunk.append(args)
+                else:
+                    _, positional, keyword = Clargs.bind(args)
+                    chunk.append((line_number, positional, keyword))
+            if len(chunk) >= chunksize:
+                submit()
+            while len(pending) > max_pending:
+                yield from completed()
+        if chunk:
+            submit()
+        while pending:
+            yield from completed()
+
+
+def _create_switch_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog=f"{os.path.basename(sys.argv[0])} {BATCH_SWITCH}",
+        description="Runs one invocation per line of FILE ('-' for stdin), "
+        "and writes one JSON result per line to stdout",
+    )
+    parser.add_argument(BATCH_SWITCH, metavar="FILE", required=True)
+    parser.add_argument(
+        "--clargs-jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help="Number of worker processes (default: 1, no process pool)",
+    )
+    parser.add_argument(
+        "--clargs-chunksize",
+        metavar="N",
+        type=int,
+        default=16,
+        help="Number of lines sent to a worker at once",
+    )
+    parser.add_argument(
+        "--clargs-unordered",
+        action="store_true",
+        help="Write results as they complete, instead of in input order",
+    )
+    return parser
+
+
+def is_batch_invocation(argv: t.Sequence[str]) -> bool:
+    # all batch options start with --clargs-, so they don't collide with
+    # the options of the function
+    return bool(argv) and argv[0].startswith("--clargs-")
+
+
+def run_batch_switch(clargs_obj: Clargs, func: t.Callable, argv: t.Sequence[str]):
+    options = _create_switch_parser().parse_args(argv)
+    filename = options.clargs_batch
+    with (
+        contextlib.nullcontext(sys.stdin)
+        if filename == "-"
+        else open(filename, encoding="utf-8")
+    ) as f:
+        all_ok = True
+        for result in run_many(
+            clargs_obj,
+            func,
+            f,
+            capture_output=True,
+            jobs=options.clargs_jobs,
+            chunksize=options.clargs_chunksize,
+            ordered=not options.clargs_unordered,
+        ):
+            all_ok = all_ok and result.exit_status == 0
+            print(result.to_json(), flush=True)
+    if not all_ok:
+        sys.exit(1)
@@ -0,0 +1,404 @@
+"""
+Benchmarks for parser construction, parsing and dispatch.
+
+Run as `python -m clargs.bench`. Uses synthetic functions with 10, 100 and
+1000 parameters of every supported type, with docstrings in all four
+formats, CLIs with 10, 100 and 1000 subcommands, and a CLI of 500 functions
+with 20 parameters each. Measures build time (`create_parser`, with cold
+caches, also with `lazy_help`) and its peak memory, `parse_args` time (with
+both engines), `run` overhead, and the import time of clargs. Parsing a
+response file of 5 million arguments (NUL-delimited and shell-quoted) is
+measured in a fresh interpreter, for time and peak resident memory.
+
+Results are written as JSON. With `--baseline`, the results are compared to a
+saved run, and the exit status is 1 when a benchmark is slower (or uses more
+memory) than the thresholds allow.
+"""
+
+import argparse
+import json
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing as t
+
+import clargs
+from . import __about__
+from . import aap_from_data
+from . import docsparser
+
+PARAMETER_COUNTS = (10, 100, 1000)
+SUBCOMMAND_COUNTS = (10, 100, 1000)
+QUICK_COUNTS = (10, 100)
+STYLES = ("sphynx", "epytext", "googledoc", "numpydoc")
+
+
+def _positive(value: int) -> bool:
+    return value > 0
+
+
+# annotation (source code), and the arguments for it given the option name
+TYPES: t.Sequence[t.Tuple[str, t.Callable[[str], t.List[str]]]] = [
+    ("str", lambda option: [option, "value"]),
+    ("int", lambda option: [option, "42"]),
+    ("float", lambda option: [option, "3.14"]),
+    ("pathlib.Path", lambda option: [option, "/tmp"]),
+    ("bool", lambda option: [option, "yes"]),
+    ('t.Literal["red", "green", "blue"]', lambda option: [option, "green"]),
+    ("list[int]", lambda option: [option, "1", "2", "3"]),
+    ("clargs.Flag = False", lambda option: [option]),
+    ("clargs.Count", lambda option: [option, option]),
+    (
+        't.Annotated[str, clargs.extra_info(mapping={"a": 1, "b": 2})]',
+        lambda option: [option, "a"],
+    ),
+    (
+        "t.Annotated[int, clargs.extra_info(validate=_positive)]",
+        lambda option: [option, "7"],
+    ),
+    ("clargs.ExistingDirectoryPath", lambda option: [option, "."]),
+]
+
+
+def _docstring(style: str, names: t.Sequence[str]) -> str:
+    descriptions = [f"The parameter {name}, which does something." for name in names]
+    if style == "sphynx":
+        params = [f":param {n}: {d}" for n, d in zip(names, descriptions)]
+        return "\n".join(["Synthetic command.", "", *params])
+    if style == "epytext":
+        params = [f"@param {n}: {d}" for n, d in zip(names, descriptions)]
+        return "\n".join(["Synthetic command.", "", *params])
+    if style == "googledoc":
+        params = [f"    {n}: {d}" for n, d in zip(names, descriptions)]
+        return "\n".join(["Synthetic command.", "", "Args:", *params])
+    assert style == "numpydoc"
+    params = [f"{n} : value\n    {d}" for n, d in zip(names, descriptions)]
+    return "\n".join(["Synthetic command.", "", "Parameters", "----------", *params])
+
+
+def synthetic_function(
+    name: str, parameters: int, style: str
+) -> t.Tuple[t.Callable, t.List[str]]:
+    """
+    Returns a function with the given number of parameters, and the arguments
+    to call it with
+    """
+    names = [f"p{i}" for i in range(parameters)]
+    annotations = [TYPES[i % len(TYPES)][0] for i in range(parameters)]
+    docstring = _docstring(style, names).replace("\n", "\n    ")
+    source = "\n".join(
+        [
+            f"def {name}(",
+            "    *,",
+            *(f"    {n}: {annotation}," for n, annotation in zip(names, annotations)),
+            "):",
+            f'    """\n    {docstring}\n    """',
+        ]
+    )
+    namespace: t.Dict[str, t.Any] = {
+        "__name__": __name__,
+        "clargs": clargs,
+        "t": t,
+        "pathlib": pathlib,
+        "_positive": _positive,
+    }
+    exec(source, namespace)
+    argv = [
+        arg for i, n in enumerate(names) for arg in TYPES[i % len(TYPES)][1](f"--{n}")
+    ]
+    return namespace[name], argv
+
+
+def _clear_caches():
+    docsparser._get_parameter_info_from_docstring.cache_clear()
+    aap_from_data.resolve_type.cache_clear()
+
+
+def _timed(
+    function: t.Callable[[], t.Any],
+    *,
+    repeat: int,
+    number: int = 1,
+    setup: t.Callable[[], t.Any] = lambda: None,
+) -> t.Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - start) / number)
+    return {"seconds": min(timings), "median_seconds": statistics.median(timings)}
+
+
+def _peak_memory(function: t.Callable[[], t.Any]) -> int:
+    _clear_caches()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _number(seconds: float) -> int:
+    # repeat fast operations, so that one timing takes about 10ms
+    return max(1, min(10_000, int(0.01 / max(seconds, 1e-9))))
+
+
+def bench_parameters(counts: t.Sequence[int], repeat: int) -> t.Dict[str, dict]:
+    results = {}
+    for count in counts:
+        for style in STYLES:
+            func, argv = synthetic_function(f"params_{count}_{style}", count, style)
+            results[f"build/params-{count}/{style}"] = {
+                **_timed(
+                    lambda: clargs.create_parser(func),
+                    repeat=repeat,
+                    setup=_clear_caches,
+                ),
+                "peak_bytes": _peak_memory(lambda: clargs.create_parser(func)),
+            }
+        lazy_help = clargs.Clargs(clargs.Settings(lazy_help=True))
+        results[f"build-lazy-help/params-{count}"] = _timed(
+            lambda: lazy_help.create_parser(func), repeat=repeat, setup=_clear_caches
+        )
+        parser = clargs.create_parser(func)
+        first = _timed(lambda: parser.parse_args(argv), repeat=1)["seconds"]
+        results[f"parse/params-{count}"] = _timed(
+            lambda: parser.parse_args(argv), repeat=repeat, number=_number(first)
+        )
+        fast_parser = clargs.Clargs(clargs.Settings(engine="fast")).create_parser(func)
+        results[f"parse-fast/params-{count}"] = _timed(
+            lambda: fast_parser.parse_args(argv), repeat=repeat, number=_number(first)
+        )
+        args = parser.parse_args(argv)
+        results[f"run/params-{count}"] = _timed(
+            lambda: clargs.run(args), repeat=repeat, number=_number(1e-6)
+        )
+    return results
+
+
+def _subcommand_parser(
+    functions: t.Sequence[t.Callable], lazy: bool = False
+) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+    if lazy:
+        subparsers = parser.add_subparsers(
+            required=True, action=clargs.LazySubParsersAction
+        )
+    else:
+        subparsers = parser.add_subparsers(required=True)
+    for func in functions:
+        clargs.add_subparser(subparsers, func)
+    return parser
+
+
+def bench_subcommands(counts: t.Sequence[int], repeat: int) -> t.Dict[str, dict]:
+    results = {}
+    for count in counts:
+        functions = []
+        for i in range(count):
+            func, argv = synthetic_function(f"command_{i}", 5, STYLES[i % len(STYLES)])
+            functions.append(func)
+        results[f"build/subcommands-{count}"] = {
+            **_timed(
+                lambda: _subcommand_parser(functions),
+                repeat=repeat,
+                setup=_clear_caches,
+            ),
+            "peak_bytes": _peak_memory(lambda: _subcommand_parser(functions)),
+        }
+        parser = _subcommand_parser(functions)
+        argv = [f"command-{count - 1}", *argv]
+        first = _timed(lambda: parser.parse_args(argv), repeat=1)["seconds"]
+        results[f"parse/subcommands-{count}"] = _timed(
+            lambda: parser.parse_args(argv), repeat=repeat, number=_number(first)
+        )
+        # build, and parse a single command, as a CLI does on every start
+        results[f"build-and-parse/lazy-subcommands-{count}"] = _timed(
+            lambda: _subcommand_parser(functions, lazy=True).parse_args(argv),
+            repeat=repeat,
+            setup=_clear_caches,
+        )
+    return results
+
+
+def bench_large_cli(functions: int, parameters: int, repeat: int) -> t.Dict[str, dict]:
+    """
+    A CLI with many subcommands that use the same types, built with cold caches
+    """
+    commands = [
+        synthetic_function(f"command_{i}", parameters, STYLES[i % len(STYLES)])[0]
+        for i in range(functions)
+    ]
+    return {
+        f"build/cli-{functions}x{parameters}": _timed(
+            lambda: _subcommand_parser(commands), repeat=repeat, setup=_clear_caches
+        )
+    }
+
+
+_RESPONSE_FILE_SCRIPT = """
+import resource, sys, time, typing as t
+import clargs
+
+def files(names: t.List[str]):
+    return len(names)
+
+settings = clargs.Settings(engine="fast", response_file_prefix="@")
+start = time.perf_counter()
+count = clargs.Clargs(settings).create_parser_and_run(files, ["@" + sys.argv[1]])
+seconds = time.perf_counter() - start
+# kilobytes on Linux, bytes on macOS
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(seconds, rss * (1 if sys.platform == "darwin" else 1024), count)
+"""
+
+
+def bench_response_file(tokens: int) -> t.Dict[str, dict]:
+    """
+    Parsing a response file with many arguments, in a fresh interpreter for
+    its peak resident memory
+    """
+    if sys.platform == "win32":
+        # no resource module
+        return {}
+    results = {}
+    with tempfile.TemporaryDirectory() as tempdir:
+        for kind, separator in (("nul", "\0"), ("shell", "\n")):
+            path = pathlib.Path(tempdir) / f"{kind}.txt"
+            with open(path, "w") as f:
+                for i in range(tokens):
+                    f.write(f"file-{i}.txt{separator}")
+            stdout = subprocess.run(
+                [sys.executable, "-c", _RESPONSE_FILE_SCRIPT, str(path)],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            seconds, rss, count = stdout.split()
+            assert int(count) == tokens
+            results[f"parse-fast/response-file-{kind}-{tokens}"] = {
+                "seconds": float(seconds),
+                "peak_rss_bytes": int(rss),
+            }
+    return results
+
+
+def import_time(repeat: int) -> float:
+    """
+    The cumulative import time of clargs in a fresh interpreter, in seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import clargs"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stderr
+        for line in stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            parts = [part.strip() for part in line.split("|")]
+            if len(parts) == 3 and parts[2] == "clargs":
+                timings.append(int(parts[1]) / 1e6)
+    return min(timings)
+
+
+def run_benchmarks(*, quick: bool = False, repeat: int = 5) -> dict:
+    parameter_counts = QUICK_COUNTS if quick else PARAMETER_COUNTS
+    subcommand_counts = QUICK_COUNTS if quick else SUBCOMMAND_COUNTS
+    results = {
+        **bench_parameters(parameter_counts, repeat),
+        **bench_subcommands(subcommand_counts, repeat),
+        **bench_large_cli(50 if quick else 500, 20, repeat),
+        **bench_response_file(500_000 if quick else 5_000_000),
+        "import": {"seconds": import_time(repeat)},
+    }
+    return {
+        "clargs": __about__.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    *,
+    threshold: float,
+    memory_threshold: float,
+) -> t.List[str]:
+    """
+    Returns a line for every regression
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        for metric, limit in (
+            ("seconds", threshold),
+            ("peak_bytes", memory_threshold),
+            ("peak_rss_bytes", memory_threshold),
+        ):
+            if metric not in result or metric not in old or not old[metric]:
+                continue
+            change = result[metric] / old[metric] - 1
+            if change > limit:
+                regressions.append(
+                    f"{name} {metric}: {old[metric]:.6g} -> {result[metric]:.6g} "
+                    f"(+{change:.0%}, allowed +{limit:.0%})"
+                )
+    return regressions
+
+
+def main(
+    *,
+    output: t.Optional[pathlib.Path] = None,
+    baseline: t.Optional[pathlib.Path] = None,
+    threshold: float = 0.25,
+    memory_threshold: float = 0.10,
+    repeat: int = 5,
+    quick: clargs.Flag = False,
+) -> int:
+    """
+    Runs the clargs benchmarks
+
+    :param output: Write the results (JSON) to this file (default: stdout)
+    :param baseline: Compare to the results (JSON) of an earlier run
+    :param threshold: Allowed relative increase in time (0.25 is 25%)
+    :param memory_threshold: Allowed relative increase in peak memory
+    :param repeat: Number of timings per benchmark (the fastest is used)
+    :param quick: Skip the largest (1000) parameter and subcommand counts, and
+        parse a response file of 500 thousand arguments
+    """
+    results = run_benchmarks(quick=quick, repeat=repeat)
+    text = json.dumps(results, indent=2)
+    if output is None:
+        print(text)
+    else:
+        output.write_text(text + "\n")
+    if baseline is None:
+        return 0
+    regressions = compare(
+        json.loads(baseline.read_text()),
+        results,
+        threshold=threshold,
+        memory_threshold=memory_threshold,
+    )
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(clargs.create_parser_and_run(main))
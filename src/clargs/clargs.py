@@ -3,10 +3,14 @@ import argparse
 import inspect
 import pathlib
 import logging
+import sys
 import dataclasses
 import typing as t
+import weakref
 from . import aap_from_data
 from . import docsparser
+from . import mapped
+from . import tracing
 
 logger = logging.getLogger("clargs")
 
@@ -27,6 +31,10 @@ class NOT_SET_TYPE:
     def __deepcopy__(self, *args):
         return self
 
+    def __reduce__(self):
+        # unpickle as the module level singleton (NOT_SET or UNSET)
+        return self.id.upper()
+
     def __bool__(self):
         return False
 
@@ -37,6 +45,11 @@ UNSET = NOT_SET_TYPE("unset")
 T = t.TypeVar("T")
 RET = t.TypeVar("RET")
 
+if t.TYPE_CHECKING:
+    import asyncio
+
+    from .batch import BatchResult
+
 
 class ExtraInfoException(Exception):
     pass
@@ -51,6 +64,22 @@ class Settings:
         "positional", "flag_if_default", "flag"
     ] = "positional"
     replace_underscore_with_dash: bool = True
+    engine: t.Literal["argparse", "fast"] = "argparse"
+    lazy_help: bool = False
+    response_file_prefix: t.Optional[str] = None
+    # settings that don't influence the generated parser are excluded from
+    # comparison (and therefore from the spec fingerprint)
+    spec_cache_dir: t.Optional[pathlib.Path] = dataclasses.field(
+        default=None, compare=False
+    )
+    help_cache_dir: t.Optional[pathlib.Path] = dataclasses.field(
+        default=None, compare=False
+    )
+    asyncio_debug: bool = dataclasses.field(default=False, compare=False)
+    event_loop_factory: t.Optional[t.Callable[[], asyncio.AbstractEventLoop]] = (
+        dataclasses.field(default=None, compare=False)
+    )
+    tracer: t.Optional[tracing.Tracer] = dataclasses.field(default=None, compare=False)
 
     def __post_init__(self):
         assert not (self.short_flag_prefix is None and self.generate_short_flags), (
@@ -58,7 +87,7 @@ class Settings:
         )
 
 
-@dataclasses.dataclass(frozen=True, kw_only=True)
+@dataclasses.dataclass(frozen=True, kw_only=True, slots=True)
 class AddArgumentParameters(t.Generic[T]):
     action: (
         t.Literal[
@@ -93,20 +122,65 @@ class AddArgumentParameters(t.Generic[T]):
             if isinstance(fields, AddArgumentParameters)
             else fields
         )
-        return AddArgumentParameters(
-            **{
-                **self.asdict(keep_unset=True),
-                **fieldsdict,
-            }
-        )
+        return dataclasses.replace(self, **fieldsdict)
 
     def asdict(self, keep_unset=False):
+        # not dataclasses.asdict(), since that makes a deep copy of all values
+        # (which may be large defaults or choices)
         return {
-            k: v
-            for k, v in dataclasses.asdict(self).items()
-            if v is not NOT_SET and (keep_unset or v is not UNSET)
+            name: value
+            for name in _AAP_FIELD_NAMES
+            if (value := getattr(self, name)) is not NOT_SET
+            and (keep_unset or value is not UNSET)
         }
 
+    def __reduce__(self):
+        # frozen dataclasses with slots cannot be unpickled in all python versions
+        return (_aap_from_dict, (self.asdict(keep_unset=True),))
+
+
+_AAP_FIELD_NAMES = tuple(
+    field.name for field in dataclasses.fields(AddArgumentParameters)
+)
+
+
+def _aap_from_dict(fields: dict) -> AddArgumentParameters:
+    return AddArgumentParameters(**fields)
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class ArgumentSpec(t.Generic[T]):
+    """
+    Everything needed to call `add_argument` for a single function parameter
+    """
+
+    param_name: str
+    param_kind: inspect._ParameterKind
+    names: t.Sequence[str]
+    aap: AddArgumentParameters[T]
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class CallPlan:
+    """
+    How to call a function from the parsed namespace.
+
+    `positional` are the destinations of the positional-only parameters, in
+    order; `keyword` are (parameter name, destination) pairs for the others.
+    """
+
+    positional: t.Tuple[str, ...]
+    keyword: t.Tuple[t.Tuple[str, str], ...]
+
+
+# Call plans are made in add_to_parser, and used in run. They are not stored in
+# the namespace, so that it only contains the function and its arguments. A
+# function can be added to several parsers (with different Settings), so it can
+# have several plans; run uses the one that fits the namespace.
+_CALL_PLANS: weakref.WeakKeyDictionary[t.Callable, t.List[CallPlan]] = (
+    weakref.WeakKeyDictionary()
+)
+
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class ExtraInfo(t.Generic[T]):
@@ -117,6 +191,7 @@ class ExtraInfo(t.Generic[T]):
     aliases: t.Sequence["str"] | NOT_SET_TYPE = NOT_SET
     validate: t.Callable[[T], bool] | NOT_SET_TYPE = NOT_SET
     mapping: t.Mapping[str, T] | NOT_SET_TYPE = NOT_SET
+    stream: bool = False
 
     def __post_init__(self):
         if self.mapping is not NOT_SET and self.add_argument_parameters.type:
@@ -133,6 +208,7 @@ def extra_info(
     aliases: t.Sequence["str"] | NOT_SET_TYPE = NOT_SET,
     validate: t.Callable[[T], bool] | NOT_SET_TYPE = NOT_SET,
     mapping: t.Mapping[str, T] | NOT_SET_TYPE = NOT_SET,
+    stream: bool = False,
     action: t.Literal[
         "store",
         "store_const",
@@ -161,6 +237,7 @@ def extra_info(
         aliases=aliases,
         validate=validate,
         mapping=mapping,
+        stream=stream,
         add_argument_parameters=AddArgumentParameters(
             action=action,
             choices=choices,
@@ -183,11 +260,55 @@ class Clargs:
         self.settings = settings or Settings()
 
     def create_parser(self, func: t.Callable[..., RET]) -> argparse.ArgumentParser:
-        docstring = inspect.getdoc(func) or ""
-        first_paragraph = [*[p for p in docstring.split("\n\n") if p.strip()], ""][0]
+        with tracing.span(
+            self.settings.tracer, "create_parser", function=tracing.name_of(func)
+        ):
+            kwargs: t.Dict[str, t.Any] = {}
+            if self.settings.lazy_help:
+                from . import lazyhelp
+
+                kwargs["formatter_class"] = lazyhelp.LazyHelpFormatter
+            if self.settings.response_file_prefix is not None:
+                kwargs["response_file_prefix"] = self.settings.response_file_prefix
+            parser = self._parser_class()(
+                description=self._description(func),
+                prefix_chars=self._prefix_chars(),
+                **kwargs,
+            )
+            self.add_to_parser(parser, func)
+        return parser
+
+    def build_parser(
+        self, target: t.Callable | t.Sequence[t.Callable]
+    ) -> argparse.ArgumentParser:
+        """
+        The parser for a function, or for a list of functions (which become
+        subcommands)
+        """
+        if callable(target):
+            return self.create_parser(target)
+        parser = argparse.ArgumentParser(prefix_chars=self._prefix_chars())
+        subparsers = parser.add_subparsers(required=True)
+        for func in target:
+            self.add_subparser(subparsers, func)
+        return parser
+
+    def _parser_class(self) -> t.Type[argparse.ArgumentParser]:
+        parser_class = argparse.ArgumentParser
+        if self.settings.engine == "fast":
+            from . import fastparse
+
+            parser_class = fastparse.FastArgumentParser
+        if self.settings.response_file_prefix is not None:
+            from . import responsefiles
 
-        prefix_chars = "".join(
-            set(
+            parser_class = responsefiles.parser_class(parser_class)
+        return parser_class
+
+    def _prefix_chars(self) -> str:
+        # dict.fromkeys to get unique characters in a stable order
+        return "".join(
+            dict.fromkeys(
                 self.settings.flag_prefix
                 + (
                     (self.settings.short_flag_prefix or "")
@@ -196,21 +317,106 @@ class Clargs:
                 )
             )
         )
-        parser = argparse.ArgumentParser(
-            description=first_paragraph,
-            prefix_chars=prefix_chars,
-        )
-        self.add_to_parser(parser, func)
-        return parser
+
+    @staticmethod
+    def _first_paragraph(func: t.Callable) -> str:
+        docstring = inspect.getdoc(func) or ""
+        return [*[p for p in docstring.split("\n\n") if p.strip()], ""][0]
+
+    def _description(self, func: t.Callable) -> str:
+        """
+        The first paragraph of the docstring; with `lazy_help`, a `LazyHelp`
+        """
+        if self.settings.lazy_help:
+            from . import lazyhelp
+
+            return t.cast(str, lazyhelp.LazyHelp(Clargs._first_paragraph, func))
+        return Clargs._first_paragraph(func)
 
     def add_to_parser(self, parser: argparse.ArgumentParser, func: t.Callable) -> None:
+        tracer = self.settings.tracer
+        with tracing.span(tracer, "add_to_parser", function=tracing.name_of(func)):
+            self._add_to_parser(parser, func, tracer)
+
+    def _add_to_parser(
+        self,
+        parser: argparse.ArgumentParser,
+        func: t.Callable,
+        tracer: t.Optional[tracing.Tracer],
+    ) -> None:
         parser.set_defaults(_clargs_func_=func)
-        signature = inspect.signature(func, eval_str=True)
-        docstring = inspect.getdoc(func) or ""
-        paramdescriptions = {
-            p.name: p.description
-            for p in docsparser.get_parameter_info_from_docstring(docstring)
-        }
+        positional: t.List[str] = []
+        keyword: t.List[t.Tuple[str, str]] = []
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for spec in self.get_argument_specs(func):
+            if debug:
+                logger.debug("Adding %s", repr((spec.names, spec.aap.asdict())))
+            from . import helper_types
+
+            try:
+                with tracing.span(tracer, "add_argument", parameter=spec.param_name):
+                    action = parser.add_argument(*spec.names, **spec.aap.asdict())
+            except helper_types.BooleanOptionalActionException:
+                param = inspect.signature(func, eval_str=True).parameters[
+                    spec.param_name
+                ]
+                raise aap_from_data.GetArgsFromTypeException(
+                    param,
+                    "Flag error, are you trying to use Flag in a "
+                    "positional argument?",
+                )
+            if spec.param_kind == inspect.Parameter.POSITIONAL_ONLY:
+                positional.append(action.dest)
+            else:
+                keyword.append((spec.param_name, action.dest))
+        plan = CallPlan(positional=tuple(positional), keyword=tuple(keyword))
+        try:
+            plans = _CALL_PLANS.setdefault(func, [])
+        except TypeError:
+            # not every callable can be weakly referenced
+            return
+        if plan not in plans:
+            plans.append(plan)
+
+    def get_argument_specs(self, func: t.Callable) -> t.Sequence[ArgumentSpec]:
+        with tracing.span(
+            self.settings.tracer, "get_argument_specs", function=tracing.name_of(func)
+        ) as attributes:
+            if self.settings.spec_cache_dir is None:
+                return self._build_argument_specs(func)
+
+            from . import spec_cache
+
+            key = spec_cache.function_fingerprint(func, self.settings)
+            if key is None:
+                return self._build_argument_specs(func)
+            specs = spec_cache.load(self.settings.spec_cache_dir, key)
+            attributes["cached"] = specs is not None
+            if specs is None:
+                specs = self._build_argument_specs(func)
+                spec_cache.store(self.settings.spec_cache_dir, key, specs)
+            return specs
+
+    def _build_argument_specs(self, func: t.Callable) -> t.Sequence[ArgumentSpec]:
+        tracer = self.settings.tracer
+        with tracing.span(tracer, "signature"):
+            signature = inspect.signature(func, eval_str=True)
+        with tracing.span(tracer, "docstring"):
+            docstring = inspect.getdoc(func) or ""
+            if self.settings.lazy_help:
+                from . import lazyhelp
+
+                paramdescriptions = {
+                    name: t.cast(
+                        str, lazyhelp.LazyHelp(lazyhelp.parameter_help, docstring, name)
+                    )
+                    for name in signature.parameters
+                }
+            else:
+                paramdescriptions = {
+                    p.name: p.description
+                    for p in docsparser.get_parameter_info_from_docstring(docstring)
+                }
         args_and_aap_s: t.Sequence[t.Tuple[t.Sequence[str], AddArgumentParameters]] = [
             aap_from_data.AapFromData.from_param_and_settings(
                 param, paramdescriptions.get(param.name, None), self.settings
@@ -220,31 +426,77 @@ class Clargs:
 
         args_and_aap_s = Clargs._filter_out_taken_names_from_auto_names(args_and_aap_s)
 
-        for (args, aap), param in zip(args_and_aap_s, signature.parameters.values()):
-            logger.debug("Adding %s", repr((args, aap.asdict())))
-            from . import helper_types
+        return [
+            ArgumentSpec(
+                param_name=param.name, param_kind=param.kind, names=args, aap=aap
+            )
+            for (args, aap), param in zip(args_and_aap_s, signature.parameters.values())
+        ]
 
-            try:
-                parser.add_argument(*args, **aap.asdict())
-            except helper_types.BooleanOptionalActionException:
-                raise aap_from_data.GetArgsFromTypeException(
-                    param,
-                    "Flag error, are you trying to use Flag in a "
-                    "positional argument?",
+    def add_subparser(
+        self, subparsers, func: t.Callable, *, name: t.Optional[str] = None
+    ):
+        """
+        Adds a subcommand for `func`, named after it unless `name` is given.
+
+        When `subparsers` was created with
+        `parser.add_subparsers(action=clargs.LazySubParsersAction)`, only the
+        name and help are registered now; the arguments are added when the
+        subcommand is chosen.
+        """
+        from . import lazy
+
+        name = name or self._command_name(func.__name__)
+        with tracing.span(self.settings.tracer, "add_subparser", command=name):
+            if isinstance(subparsers, lazy.LazySubParsersAction):
+                subparsers.add_lazy_parser(
+                    name,
+                    lambda subparser: self.add_to_parser(subparser, func),
+                    help=self._description(func),
                 )
+                return
+            subparser = subparsers.add_parser(name, help=self._description(func))
+            self.add_to_parser(subparser, func)
+
+    def add_lazy_subparser(
+        self,
+        subparsers,
+        target: str,
+        help: t.Optional[str] = None,
+        *,
+        name: t.Optional[str] = None,
+    ):
+        """
+        Adds a subcommand for `target` ("module:function") without importing it.
+
+        The module is imported, and the arguments are added, only when the
+        subcommand is chosen. `subparsers` should be created with
+        `parser.add_subparsers(action=clargs.LazySubParsersAction)`.
+        """
+        from . import lazy
+
+        if not isinstance(subparsers, lazy.LazySubParsersAction):
+            raise TypeError(
+                "Lazy subparsers need subparsers created with "
+                "`parser.add_subparsers(action=clargs.LazySubParsersAction)`"
+            )
+        _, qualname = lazy.split_target(target)
 
-    def add_subparser(self, subparsers, func: t.Callable):
-        docstring = inspect.getdoc(func) or ""
-        first_paragraph = [*[p for p in docstring.split("\n\n") if p.strip()], ""][0]
-        func_name_with_replacement = (
-            func.__name__.replace("_", "-")
-            if self.settings.replace_underscore_with_dash
-            else func.__name__
+        def populate(subparser: argparse.ArgumentParser) -> None:
+            self.add_to_parser(subparser, lazy.import_target(target))
+
+        subparsers.add_lazy_parser(
+            name or self._command_name(qualname.rsplit(".", 1)[-1]),
+            populate,
+            help=help,
         )
-        subparser = subparsers.add_parser(
-            func_name_with_replacement, help=first_paragraph
+
+    def _command_name(self, func_name: str) -> str:
+        return (
+            func_name.replace("_", "-")
+            if self.settings.replace_underscore_with_dash
+            else func_name
         )
-        self.add_to_parser(subparser, func)
 
     @staticmethod
     def _filter_out_taken_names_from_auto_names(args_and_aap_s):
@@ -275,10 +527,81 @@ class Clargs:
         return new_args_and_aap_s
 
     @staticmethod
-    def run(args):
+    def run(args, settings: t.Optional[Settings] = None):
+        """
+        Calls the function with the parsed args.
+
+        The coroutine of an `async def` function is run on a new event loop
+        (configured by `settings`) and its result is returned. Mapped files
+        (`clargs.MappedFile`) are closed when the function returns.
+        """
+        logger.debug("Received parsed args %s", args)
+        tracer = settings.tracer if settings else None
+        with tracing.span(tracer, "run"):
+            with tracing.span(tracer, "bind"):
+                function, positional, keyword = Clargs.bind(args)
+            try:
+                with tracing.span(tracer, "call", function=tracing.name_of(function)):
+                    result = function(*positional, **keyword)
+                    if inspect.iscoroutine(result):
+                        from . import aio
+
+                        return aio.run_coroutine(result, settings or Settings())
+                    return result
+            finally:
+                mapped.release([*positional, *keyword.values()])
+
+    @staticmethod
+    async def run_async(args):
+        """
+        Like `run`, for use in a running event loop: awaits the result of an
+        `async def` function.
+        """
         logger.debug("Received parsed args %s", args)
+        function, positional, keyword = Clargs.bind(args)
+        try:
+            result = function(*positional, **keyword)
+            if inspect.isawaitable(result):
+                return await result
+            return result
+        finally:
+            mapped.release([*positional, *keyword.values()])
+
+    @staticmethod
+    def bind(
+        args: argparse.Namespace,
+    ) -> t.Tuple[t.Callable, t.List[t.Any], t.Dict[str, t.Any]]:
+        """
+        Returns the function, and its positional and keyword arguments
+        """
         assert "_clargs_func_" in args
         function = args._clargs_func_
+        try:
+            plans = _CALL_PLANS.get(function, ())
+        except TypeError:
+            plans = ()
+        argsdict = vars(args)
+        for plan in plans:
+            try:
+                positional = [getattr(args, dest) for dest in plan.positional]
+                keyword = {name: getattr(args, dest) for name, dest in plan.keyword}
+            except AttributeError:
+                # the plan of another parser, or a suppressed default
+                continue
+            if len(argsdict) != len(positional) + len(keyword) + 1:
+                # other values in the namespace (e.g. from a parent parser) are
+                # passed as keyword arguments too
+                known = {
+                    "_clargs_func_",
+                    *plan.positional,
+                    *(d for _, d in plan.keyword),
+                }
+                keyword.update((k, v) for k, v in argsdict.items() if k not in known)
+            return function, positional, keyword
+        return Clargs._bind_without_plan(function, args)
+
+    @staticmethod
+    def _bind_without_plan(function, args):
         positional_parameters = [
             param
             for param in inspect.signature(function).parameters.values()
@@ -289,28 +612,213 @@ class Clargs:
         kwargs = {
             k: v for k, v in argsdict.items() if k != "_clargs_func_" and k not in args
         }
-        return function(*args.values(), **kwargs)
+        return function, list(args.values()), kwargs
+
+    def run_many(
+        self,
+        func: t.Callable,
+        lines: t.Iterable[str | t.Sequence[str]],
+        *,
+        capture_output: bool = False,
+        jobs: int = 1,
+        chunksize: int = 16,
+        ordered: bool = True,
+        mp_context: t.Optional[str] = None,
+    ) -> t.Iterator[BatchResult]:
+        """
+        Parses and runs every line with the same parser.
+
+        Lines are shell text or JSON arrays (see `clargs.batch`). Yields a
+        `BatchResult` per line; errors are reported in the result, and don't
+        stop the batch.
+
+        With `jobs` > 1, lines are parsed in this process, and the function is
+        called in a process pool (in chunks of `chunksize` lines). The function
+        has to be importable by its qualified name. With `ordered=False`,
+        results are yielded as they complete.
+
+        For an `async def` function, all lines run on one event loop instead,
+        with at most `jobs` running at the same time.
+        """
+        from . import batch
+
+        return batch.run_many(
+            self,
+            func,
+            lines,
+            capture_output=capture_output,
+            jobs=jobs,
+            chunksize=chunksize,
+            ordered=ordered,
+            mp_context=mp_context,
+        )
+
+    def run_many_async(
+        self,
+        func: t.Callable,
+        lines: t.Iterable[str | t.Sequence[str]],
+        *,
+        capture_output: bool = False,
+        jobs: int = 1,
+        ordered: bool = True,
+    ) -> t.AsyncIterator[BatchResult]:
+        """
+        Like `run_many`, for use in a running event loop: yields a
+        `BatchResult` per line, running at most `jobs` lines at the same time.
+        """
+        from . import aio
+
+        return aio.run_many_async(
+            self,
+            func,
+            lines,
+            capture_output=capture_output,
+            jobs=jobs,
+            ordered=ordered,
+        )
+
+    def serve(
+        self,
+        target: t.Callable | t.Sequence[t.Callable],
+        socket_path: str | pathlib.Path,
+        *,
+        concurrency: t.Literal["fork", "thread"] = "fork",
+        max_workers: t.Optional[int] = None,
+        watch: bool = True,
+    ) -> None:
+        """
+        Runs a daemon on a unix socket, that runs commands sent by
+        `python -m clargs.client SOCKET ARG...`.
+
+        The target is a function, or a list of functions (which become
+        subcommands). The parser is built once. With `concurrency="fork"`
+        every command runs in a forked child, in the working directory and
+        environment of the client; with `concurrency="thread"` commands run
+        in a thread pool of `max_workers` threads. With `watch`, the daemon
+        restarts when the source file of one of the functions changes.
+        """
+        from . import daemon
+
+        daemon.serve(
+            self,
+            target,
+            socket_path,
+            concurrency=concurrency,
+            max_workers=max_workers,
+            watch=watch,
+        )
+
+    def fork_server(
+        self,
+        target: t.Callable | t.Sequence[t.Callable],
+        socket_path: str | pathlib.Path,
+        *,
+        watch: bool = True,
+    ) -> None:
+        """
+        Runs a fork server on a unix socket, for commands sent by
+        `python -m clargs.client --pass-fds SOCKET ARG...`.
+
+        The target is a function, or a list of functions (which become
+        subcommands). The parser is built once; every command runs in a
+        forked child, with the stdin, stdout and stderr of the client, in its
+        working directory and environment. With `watch`, the server restarts
+        when the source file of one of the functions changes.
+        """
+        from . import forkserver
+
+        forkserver.fork_server(self, target, socket_path, watch=watch)
 
     def create_parser_and_run(self, func: t.Callable[..., RET], args=None) -> RET:
+        from . import batch
+
+        argv = sys.argv[1:] if args is None else args
+        if batch.is_batch_invocation(argv):
+            return batch.run_batch_switch(self, func, argv)
+        help_cache_dir = self.settings.help_cache_dir
+        help_key = None
+        if help_cache_dir is not None:
+            from . import help_cache
+
+            help_key = help_cache.help_key(
+                func, self.settings, argv, self._prefix_chars()
+            )
+            if help_key is not None:
+                text = help_cache.load(help_cache_dir, help_key)
+                if text is not None:
+                    sys.stdout.write(text)
+                    sys.exit(0)
         parser = self.create_parser(func)
-        return Clargs.run(parser.parse_args(args))
+        if help_cache_dir is not None and help_key is not None:
+            help_cache.record(parser, help_cache_dir, help_key)
+        tracer = self.settings.tracer
+        with tracing.activate(tracer):
+            with tracing.span(tracer, "parse_args", tokens=len(argv)):
+                namespace = parser.parse_args(args)
+        return Clargs.run(namespace, self.settings)
 
 
 def create_parser(func: t.Callable) -> argparse.ArgumentParser:
     return Clargs().create_parser(func)
 
 
+def build_parser(
+    target: t.Callable | t.Sequence[t.Callable],
+) -> argparse.ArgumentParser:
+    return Clargs().build_parser(target)
+
+
 def add_to_parser(parser: argparse.ArgumentParser, func: t.Callable) -> None:
     return Clargs().add_to_parser(parser, func)
 
 
-def add_subparser(subparsers, func: t.Callable) -> None:
-    return Clargs().add_subparser(subparsers, func)
+def add_subparser(
+    subparsers, func: t.Callable, *, name: t.Optional[str] = None
+) -> None:
+    return Clargs().add_subparser(subparsers, func, name=name)
+
+
+def add_lazy_subparser(
+    subparsers, target: str, help: t.Optional[str] = None, *, name=None
+) -> None:
+    return Clargs().add_lazy_subparser(subparsers, target, help, name=name)
 
 
 def run(args):
     return Clargs.run(args)
 
 
+async def run_async(args):
+    return await Clargs.run_async(args)
+
+
+def run_many(
+    func: t.Callable, lines: t.Iterable[str | t.Sequence[str]], **kwargs
+) -> t.Iterator[BatchResult]:
+    return Clargs().run_many(func, lines, **kwargs)
+
+
+def run_many_async(
+    func: t.Callable, lines: t.Iterable[str | t.Sequence[str]], **kwargs
+) -> t.AsyncIterator[BatchResult]:
+    return Clargs().run_many_async(func, lines, **kwargs)
+
+
+def serve(
+    target: t.Callable | t.Sequence[t.Callable],
+    socket_path: str | pathlib.Path,
+    **kwargs,
+) -> None:
+    return Clargs().serve(target, socket_path, **kwargs)
+
+
+def fork_server(
+    target: t.Callable | t.Sequence[t.Callable],
+    socket_path: str | pathlib.Path,
+    **kwargs,
+) -> None:
+    return Clargs().fork_server(target, socket_path, **kwargs)
+
+
 def create_parser_and_run(func: t.Callable[..., RET], args=None) -> RET:
     return Clargs().create_parser_and_run(func, args)
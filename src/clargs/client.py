@@ -0,0 +1,122 @@
+"""
+Thin client for a `clargs.serve` daemon or a `clargs.fork_server`.
+
+Sends argv, the current directory and the environment over the unix socket.
+For a daemon, it writes the stdout / stderr that come back to its own stdout /
+stderr. For a fork server (`--pass-fds`), it passes its stdin, stdout and
+stderr along, so the command uses them directly. Exits with the exit status
+of the command.
+
+Use as `python -m clargs.client [--pass-fds] SOCKET [ARG ...]`. This module
+only uses the standard library (and nothing from clargs), so that it can also
+be written out as a standalone script, see `clargs.daemon.write_client_script`.
+
+Protocol: the request is a single line of JSON. The response is a sequence
+of frames: one byte channel, four bytes (big endian) payload length, payload.
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+import time
+
+EXIT = 0
+STDOUT = 1
+STDERR = 2
+# the daemon is restarting; connect again
+RETRY = 3
+
+FRAME_HEADER = struct.Struct("!BI")
+EXIT_STATUS = struct.Struct("!i")
+
+RETRY_TIMEOUT = 10.0
+
+
+def _request(argv):
+    request = {"argv": list(argv), "cwd": os.getcwd(), "env": dict(os.environ)}
+    return json.dumps(request).encode() + b"\n"
+
+
+class _NotDelivered(Exception):
+    """
+    The request was not read by the daemon (it was restarting)
+    """
+
+
+def _read_frames(sock, stdout, stderr):
+    with sock.makefile("rb") as reader:
+        try:
+            header = reader.read(FRAME_HEADER.size)
+        except ConnectionResetError:
+            # closed with the request unread
+            raise _NotDelivered()
+        while True:
+            if len(header) < FRAME_HEADER.size:
+                raise ConnectionError("Daemon closed the connection")
+            channel, length = FRAME_HEADER.unpack(header)
+            payload = reader.read(length)
+            if channel == EXIT:
+                return EXIT_STATUS.unpack(payload)[0]
+            if channel == RETRY:
+                raise _NotDelivered()
+            stream = stdout if channel == STDOUT else stderr
+            stream.write(payload)
+            stream.flush()
+            header = reader.read(FRAME_HEADER.size)
+
+
+def _call_once(socket_path, argv, stdout, stderr, fds):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        data = _request(argv)
+        try:
+            if fds:
+                # the file descriptors go with the first part of the request
+                sent = socket.send_fds(sock, [data], list(fds))
+                data = data[sent:]
+            sock.sendall(data)
+        except (BrokenPipeError, ConnectionResetError):
+            raise _NotDelivered()
+        return _read_frames(sock, stdout, stderr)
+
+
+def call(socket_path, argv, *, stdout=None, stderr=None, fds=None):
+    """
+    Runs argv in the daemon; returns the exit status
+
+    With fds (stdin, stdout and stderr file descriptors; for a fork server),
+    the command uses these directly, and stdout / stderr are not used.
+    """
+    stdout = stdout or sys.stdout.buffer
+    stderr = stderr or sys.stderr.buffer
+    deadline = time.monotonic() + RETRY_TIMEOUT
+    while True:
+        try:
+            return _call_once(socket_path, argv, stdout, stderr, fds)
+        except (ConnectionRefusedError, FileNotFoundError, _NotDelivered):
+            # daemon is (re)starting
+            if time.monotonic() > deadline:
+                raise
+        time.sleep(0.05)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    fds = None
+    if argv[:1] == ["--pass-fds"]:
+        argv = argv[1:]
+        fds = (0, 1, 2)
+    if not argv:
+        print(
+            "usage: python -m clargs.client [--pass-fds] SOCKET [ARG ...]",
+            file=sys.stderr,
+        )
+        return 2
+    sys.stdout.flush()
+    return call(argv[0], argv[1:], fds=fds)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Ahead-of-time generation of a static argparse module for a function.
+
+The generated module contains the literal `ArgumentParser(...)` and
+`add_argument(...)` calls that `Clargs.create_parser` would make, so that it
+can be used as entry point without any introspection, docstring parsing or
+type evaluation at startup. Types, actions and validators are referenced by
+import path, so they have to be importable (no lambdas or local functions).
+"""
+
+from __future__ import annotations
+import ast
+import functools
+import pathlib
+import typing as t
+
+from . import __about__
+from . import aap_from_data
+from . import lazy
+from . import spec_cache
+
+if t.TYPE_CHECKING:
+    from .clargs import Clargs
+
+
+class CodegenException(Exception):
+    pass
+
+
+class _Renderer:
+    def __init__(self):
+        self.imports: t.Set[str] = set()
+
+    def render(self, value: t.Any) -> str:
+        if isinstance(value, functools.partial):
+            self.imports.add("functools")
+            args = [self.render(value.func), *map(self.render, value.args)]
+            args += [f"{k}={self.render(v)}" for k, v in value.keywords.items()]
+            return f"functools.partial({', '.join(args)})"
+        if isinstance(value, aap_from_data.MappingLookup):
+            return (
+                f"{self.render(aap_from_data.MappingLookup)}"
+                f"({self.render(value.mapping)})"
+            )
+        if isinstance(value, aap_from_data.ValidatedType):
+            return (
+                f"{self.render(aap_from_data.ValidatedType)}"
+                f"({self.render(value.originaltype)}, {self.render(value.validate)})"
+            )
+        if isinstance(value, pathlib.PurePath):
+            self.imports.add("pathlib")
+            # PosixPath / WindowsPath are platform specific
+            name = "Path" if isinstance(value, pathlib.Path) else type(value).__name__
+            return f"pathlib.{name}({str(value)!r})"
+        if isinstance(value, (list, tuple, set, frozenset)):
+            items = [self.render(v) for v in value]
+            if isinstance(value, list):
+                return f"[{', '.join(items)}]"
+            if isinstance(value, tuple):
+                return f"({', '.join(items)}{',' if len(items) == 1 else ''})"
+            return f"{type(value).__name__}([{', '.join(items)}])"
+        if isinstance(value, dict):
+            items = [f"{self.render(k)}: {self.render(v)}" for k, v in value.items()]
+            return f"{{{', '.join(items)}}}"
+        if callable(value):
+            return self.render_reference(value)
+        text = repr(value)
+        try:
+            if ast.literal_eval(text) == value:
+                return text
+        except (ValueError, SyntaxError):
+            pass
+        raise CodegenException(f"Cannot generate code for value {value!r}")
+
+    def render_reference(self, value: t.Any) -> str:
+        module = getattr(value, "__module__", None)
+        qualname = getattr(value, "__qualname__", None)
+        if module == "builtins":
+            return t.cast(str, qualname)
+        if not module or not qualname or "<" in qualname:
+            raise CodegenException(
+                f"{value!r} cannot be referenced by import path; "
+                "use a module level function or class"
+            )
+        try:
+            found = lazy.import_target(f"{module}:{qualname}")
+        except (ImportError, AttributeError):
+            found = None
+        if found is not value:
+            raise CodegenException(f"{value!r} cannot be found at {module}.{qualname}")
+        self.imports.add(module)
+        return f"{module}.{qualname}"
+
+
+def generate_module(clargs_obj: Clargs, target: str) -> str:
+    func = lazy.import_target(target)
+    module_name, qualname = lazy.split_target(target)
+    renderer = _Renderer()
+
+    lines = []
+    for spec in clargs_obj.get_argument_specs(func):
+        args = [renderer.render(name) for name in spec.names]
+        args += [f"{k}={renderer.render(v)}" for k, v in spec.aap.asdict().items()]
+        lines.append(f"    parser.add_argument({', '.join(args)})")
+
+    imports = sorted(renderer.imports - {"argparse", "clargs", module_name})
+    return "\n".join(
+        [
+            f"# Generated by `python -m clargs compile {target}` "
+            f"(clargs {__about__.__version__}).",
+            "# Do not edit; regenerate when the function changes.",
+            "# clargs-fingerprint: "
+            f"{spec_cache.function_fingerprint(func, clargs_obj.settings)}",
+            "import argparse",
+            "import clargs",
+            *[f"import {module}" for module in imports],
+            f"import {module_name}",
+            "",
+            "",
+            "def create_parser() -> argparse.ArgumentParser:",
+            "    parser = argparse.ArgumentParser(",
+            f"        description={clargs_obj._first_paragraph(func)!r},",
+            f"        prefix_chars={clargs_obj._prefix_chars()!r},",
+            "    )",
+            f"    parser.set_defaults(_clargs_func_={module_name}.{qualname})",
+            *lines,
+            "    return parser",
+            "",
+            "",
+            "def main(args=None):",
+            "    return clargs.run(create_parser().parse_args(args))",
+            "",
+            "",
+            'if __name__ == "__main__":',
+            "    main()",
+            "",
+        ]
+    )
@@ -0,0 +1,488 @@
+"""
+Static shell completion scripts, for `python -m clargs completion`.
+
+The script is generated from the parser (as built by `create_parser` /
+`add_subparser`), and runs in the shell alone: completing a word does not
+start python. It completes option strings (including the `--no-...` options
+of `clargs.Flag`), the choices of `Literal`s and mappings, subcommand names,
+and files or directories for `pathlib.Path`, `clargs.ExistingFilePath`,
+`clargs.ExistingDirectoryPath` and `clargs.MappedFile` (also in lists).
+Regenerate the script when the command line interface changes.
+
+Values given as `--name=value` are not completed.
+"""
+
+from __future__ import annotations
+import argparse
+import dataclasses
+import pathlib
+import re
+import shlex
+import typing as t
+
+from . import aap_from_data
+from . import exists
+from . import helper_types
+from . import mapped
+
+Shell = t.Literal["bash", "zsh", "fish"]
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Values:
+    """
+    How to complete a value: from a list of choices, as file or directory
+    name, or not at all
+    """
+
+    choices: t.Sequence[str] = ()
+    kind: t.Optional[t.Literal["file", "directory"]] = None
+    # takes any number of values (e.g. lists), instead of one
+    many: bool = False
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Option:
+    strings: t.Sequence[str]
+    help: str
+    # None for options that take no value (flags, counts)
+    values: t.Optional[Values]
+    repeatable: bool
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Positional:
+    name: str
+    help: str
+    values: Values
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Command:
+    path: t.Tuple[str, ...]
+    help: str
+    options: t.Sequence[Option]
+    positionals: t.Sequence[Positional]
+    # subcommands are chosen by the positional after `positionals`
+    subcommands: t.Sequence[Command]
+
+
+def _help(action: argparse.Action) -> str:
+    help = action.help or ""
+    return " ".join(help.replace("%%", "%").split())
+
+
+def _metavar(action: argparse.Action) -> str:
+    # a tuple metavar names each of the nargs values
+    if isinstance(action.metavar, tuple):
+        return " ".join(action.metavar)
+    return action.metavar or action.dest
+
+
+def _values(action: argparse.Action) -> Values:
+    typ = action.type
+    validate = None
+    if isinstance(typ, aap_from_data.ValidatedType):
+        validate = typ.validate
+        typ = typ.originaltype
+    find_failures = getattr(action, "find_failures", None)
+
+    choices: t.Sequence[str] = ()
+    if isinstance(typ, aap_from_data.MappingLookup):
+        choices = [str(key) for key in typ.mapping]
+    elif action.choices is not None:
+        choices = [str(choice) for choice in action.choices]
+
+    kind: t.Optional[t.Literal["file", "directory"]] = None
+    if validate is helper_types._is_dir or find_failures is exists.missing_directories:
+        kind = "directory"
+    elif (
+        validate is helper_types._is_file
+        or find_failures is exists.missing_files
+        or typ is mapped.map_file
+        or aap_from_data.issubclass_rugged(typ, pathlib.PurePath)
+    ):
+        kind = "file"
+    many = action.nargs in (argparse.ZERO_OR_MORE, argparse.ONE_OR_MORE) or (
+        isinstance(action.nargs, int) and action.nargs > 1
+    )
+    return Values(choices=choices, kind=kind, many=many)
+
+
+def command_from_parser(
+    parser: argparse.ArgumentParser,
+    path: t.Tuple[str, ...] = (),
+    help: str = "",
+) -> Command:
+    options = []
+    positionals = []
+    subcommands: t.List[Command] = []
+    for action in parser._actions:
+        if action.help == argparse.SUPPRESS:
+            continue
+        if isinstance(action, argparse._SubParsersAction):
+            helps = {choice.dest: _help(choice) for choice in action._choices_actions}
+            subcommands.extend(
+                command_from_parser(subparser, (*path, name), helps.get(name, ""))
+                for name, subparser in action.choices.items()
+            )
+            # nothing after the subcommand belongs to this parser
+            break
+        if not action.option_strings:
+            positionals.append(
+                Positional(
+                    name=_metavar(action),
+                    help=_help(action),
+                    values=_values(action),
+                )
+            )
+            continue
+        options.append(
+            Option(
+                strings=list(action.option_strings),
+                help=_help(action),
+                values=None if action.nargs == 0 else _values(action),
+                repeatable=isinstance(
+                    action, (argparse._AppendAction, argparse._CountAction)
+                ),
+            )
+        )
+    return Command(
+        path=path,
+        help=help,
+        options=options,
+        positionals=positionals,
+        subcommands=subcommands,
+    )
+
+
+def _commands(command: Command) -> t.Iterator[Command]:
+    yield command
+    for subcommand in command.subcommands:
+        yield from _commands(subcommand)
+
+
+def _identifier(*parts: str) -> str:
+    return re.sub(r"\W", "_", "_".join(parts))
+
+
+def _key(command: Command) -> str:
+    return " ".join(command.path)
+
+
+def _bash_values(values: t.Optional[Values]) -> str:
+    if values is None:
+        return "COMPREPLY=()"
+    if values.choices:
+        words = " ".join(shlex.quote(choice) for choice in values.choices)
+        return f'COMPREPLY=($(compgen -W {shlex.quote(words)} -- "$cur"))'
+    if values.kind == "file":
+        return 'COMPREPLY=($(compgen -f -- "$cur"))'
+    if values.kind == "directory":
+        return 'COMPREPLY=($(compgen -d -- "$cur"))'
+    return "COMPREPLY=()"
+
+
+def bash(root: Command, prog: str, source: str) -> str:
+    function = _identifier("_clargs", prog)
+    walk = []
+    option_values = []
+    option_strings = []
+    positionals = []
+    for command in _commands(root):
+        key = _key(command)
+        for option in command.options:
+            if option.values is None:
+                continue
+            patterns = "|".join(shlex.quote(f"{key}:{s}") for s in option.strings)
+            many = 1 if option.values.many else 0
+            walk.append(f'{patterns}) option="$command:$word"; many={many} ;;')
+            option_values.append(f"{patterns}) {_bash_values(option.values)} ;;")
+        for subcommand in command.subcommands:
+            walk.append(
+                f"{shlex.quote(key + ':' + subcommand.path[-1])}) "
+                f"command={shlex.quote(_key(subcommand))}; npos=0 ;;"
+            )
+        words = " ".join(s for option in command.options for s in option.strings)
+        option_strings.append(
+            f"{shlex.quote(key)}) "
+            f'COMPREPLY=($(compgen -W {shlex.quote(words)} -- "$cur")) ;;'
+        )
+        cases = [
+            f"{index}) {_bash_values(positional.values)} ;;"
+            for index, positional in enumerate(command.positionals)
+        ]
+        if command.subcommands:
+            names = Values(choices=[sub.path[-1] for sub in command.subcommands])
+            cases.append(f"{len(command.positionals)}) {_bash_values(names)} ;;")
+        elif command.positionals and command.positionals[-1].values.many:
+            cases.append(f"*) {_bash_values(command.positionals[-1].values)} ;;")
+        if cases:
+            positionals.append(
+                f"{shlex.quote(key)})\n"
+                "            case $npos in\n"
+                + "".join(f"                {case}\n" for case in cases)
+                + "            esac ;;"
+            )
+
+    def indent(lines: t.Sequence[str], depth: int) -> str:
+        return "".join(" " * depth + line + "\n" for line in lines)
+
+    return (
+        f"# bash completion for {prog}, generated by `{source}`.\n"
+        "# Regenerate when the command line interface changes.\n"
+        f"{function}() {{\n"
+        '    local cur=${COMP_WORDS[COMP_CWORD]} command="" option="" word\n'
+        "    local -i i npos=0 many=0\n"
+        "    for ((i = 1; i < COMP_CWORD; i++)); do\n"
+        "        word=${COMP_WORDS[i]}\n"
+        "        if [[ -n $option ]]; then\n"
+        "            if ((!many)); then\n"
+        '                option=""\n'
+        "                continue\n"
+        "            elif [[ $word != -* ]]; then\n"
+        "                continue\n"
+        "            fi\n"
+        '            option=""\n'
+        "        fi\n"
+        '        case "$command:$word" in\n'
+        + indent(walk, 12)
+        + "            *)\n"
+        + "                if [[ $word != -* ]]; then\n"
+        + "                    npos+=1\n"
+        + "                fi ;;\n"
+        + "        esac\n"
+        "    done\n"
+        "    if [[ -n $option && ( $many == 0 || $cur != -* ) ]]; then\n"
+        '        case "$option" in\n' + indent(option_values, 12) + "        esac\n"
+        "        return\n"
+        "    fi\n"
+        "    if [[ $cur == -* ]]; then\n"
+        '        case "$command" in\n' + indent(option_strings, 12) + "        esac\n"
+        "        return\n"
+        "    fi\n"
+        '    case "$command" in\n' + indent(positionals, 8) + "    esac\n"
+        "}\n"
+        f"complete -o filenames -F {function} {shlex.quote(prog)}\n"
+    )
+
+
+def _zsh_escape(text: str) -> str:
+    # for text between [] or after : in an _arguments spec
+    return re.sub(r"([\[\]:\\])", r"\\\1", text)
+
+
+def _zsh_action(values: Values) -> str:
+    if values.choices:
+        words = " ".join(re.sub(r"([\s()\\:])", r"\\\1", c) for c in values.choices)
+        return f"({words})"
+    if values.kind == "file":
+        return "_files"
+    if values.kind == "directory":
+        return "_files -/"
+    return " "
+
+
+def _zsh_pattern(word: str) -> str:
+    return re.sub(r"([^\w-])", r"\\\1", word)
+
+
+def _zsh_quote(spec: str) -> str:
+    return "'" + spec.replace("'", "'\\''") + "'"
+
+
+def zsh(root: Command, prog: str, source: str) -> str:
+    functions = []
+    for command in _commands(root):
+        function = _identifier("_clargs", prog, *command.path)
+        specs = []
+        for option in command.options:
+            repeat = "*" if option.repeatable else ""
+            for string in option.strings:
+                spec = f"{repeat}{string}"
+                if option.values is not None:
+                    # `--name=value` or `--name value`; `-n value` or `-nvalue`
+                    spec += "+" if len(string) == 2 else "="
+                spec += f"[{_zsh_escape(option.help)}]"
+                if option.values is not None:
+                    spec += f":value:{_zsh_action(option.values)}"
+                specs.append(spec)
+        for index, positional in enumerate(command.positionals, 1):
+            position = "*" if positional.values.many else str(index)
+            specs.append(
+                f"{position}:{_zsh_escape(positional.name)}:"
+                f"{_zsh_action(positional.values)}"
+            )
+        lines = [f"{function}() {{"]
+        if command.subcommands:
+            lines.append('    local curcontext="$curcontext" state line')
+            specs += [": :->command", "*:: :->arguments"]
+        lines.append("    _arguments -s \\")
+        lines += [f"        {_zsh_quote(spec)} \\" for spec in specs]
+        lines.append("        && return 0")
+        if command.subcommands:
+            subcommands = " ".join(
+                _zsh_quote(sub.path[-1].replace(":", "\\:") + ":" + sub.help)
+                for sub in command.subcommands
+            )
+            lines += [
+                "    case $state in",
+                "        (command)",
+                f"            local -a commands=({subcommands})",
+                "            _describe -t commands command commands",
+                "            ;;",
+                "        (arguments)",
+                f"            case $line[{len(command.positionals) + 1}] in",
+                *(
+                    f"                ({_zsh_pattern(sub.path[-1])}) "
+                    f"{_identifier('_clargs', prog, *sub.path)} ;;"
+                    for sub in command.subcommands
+                ),
+                "            esac",
+                "            ;;",
+                "    esac",
+            ]
+        lines.append("}")
+        functions.append("\n".join(lines) + "\n")
+
+    function = _identifier("_clargs", prog)
+    return (
+        f"#compdef {prog}\n"
+        f"# zsh completion for {prog}, generated by `{source}`.\n"
+        "# Regenerate when the command line interface changes.\n"
+        + "\n".join(functions)
+        + "\n"
+        "if [[ $zsh_eval_context[-1] == loadautofunc ]]; then\n"
+        f'    {function} "$@"\n'
+        "else\n"
+        f"    compdef {function} {prog}\n"
+        "fi\n"
+    )
+
+
+_FISH_DIRECTORIES = "-a '(__fish_complete_directories (commandline -ct))'"
+
+
+def _fish_quote(text: str) -> str:
+    return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def _fish_values(values: Values) -> str:
+    if values.choices:
+        return f"-x -a {_fish_quote(' '.join(values.choices))}"
+    if values.kind == "file":
+        return "-r -F"
+    if values.kind == "directory":
+        return f"-x {_FISH_DIRECTORIES}"
+    return "-x"
+
+
+def _fish_option(string: str) -> t.Optional[str]:
+    if re.fullmatch(r"--[^-].*", string):
+        return f"-l {_fish_quote(string[2:])}"
+    if re.fullmatch(r"-[^-]", string):
+        return f"-s {_fish_quote(string[1:])}"
+    if re.fullmatch(r"-[^-].+", string):
+        return f"-o {_fish_quote(string[1:])}"
+    # fish only knows options starting with -
+    return None
+
+
+def fish(root: Command, prog: str, source: str) -> str:
+    current = _identifier("__clargs", prog, "command_is")
+    quoted_prog = _fish_quote(prog)
+    cases = []
+    completions = []
+    for command in _commands(root):
+        key = _key(command)
+        condition = f"-n {_fish_quote(f'{current} {shlex.quote(key)}')}"
+        for option in command.options:
+            names = [name for s in option.strings if (name := _fish_option(s))]
+            if not names:
+                continue
+            if option.values is not None:
+                patterns = " ".join(_fish_quote(f"{key}:{s}") for s in option.strings)
+                cases.append(
+                    f"            case {patterns}\n"
+                    f"                set option {'many' if option.values.many else 1}"
+                )
+            completion = [f"complete -c {quoted_prog}", condition, *names]
+            if option.help:
+                completion.append(f"-d {_fish_quote(option.help)}")
+            if option.values is not None:
+                completion.append(_fish_values(option.values))
+            completions.append(" ".join(completion))
+        for subcommand in command.subcommands:
+            name = subcommand.path[-1]
+            cases.append(
+                f"            case {_fish_quote(f'{key}:{name}')}\n"
+                f"                set command {_fish_quote(_key(subcommand))}"
+            )
+            completion = [
+                f"complete -c {quoted_prog}",
+                condition,
+                f"-f -a {_fish_quote(name)}",
+            ]
+            if subcommand.help:
+                completion.append(f"-d {_fish_quote(subcommand.help)}")
+            completions.append(" ".join(completion))
+        files = False
+        for positional in command.positionals:
+            completion = [f"complete -c {quoted_prog}", condition]
+            if positional.values.choices:
+                completion.append(
+                    f"-a {_fish_quote(' '.join(positional.values.choices))}"
+                )
+            elif positional.values.kind == "directory":
+                completion.append(_FISH_DIRECTORIES)
+            elif positional.values.kind == "file":
+                completion.append("-F")
+                files = True
+            else:
+                continue
+            completions.append(" ".join(completion))
+        if not files:
+            completions.append(f"complete -c {quoted_prog} {condition} -f")
+
+    return (
+        f"# fish completion for {prog}, generated by `{source}`.\n"
+        "# Regenerate when the command line interface changes.\n"
+        f"function {current}\n"
+        "    # whether the words before the cursor select the subcommand $argv[1]\n"
+        "    set -l command ''\n"
+        "    set -l option ''\n"
+        "    for word in (commandline -opc)[2..-1]\n"
+        '        if test -n "$option"\n'
+        '            if test "$option" = 1\n'
+        "                set option ''\n"
+        "                continue\n"
+        "            else if not string match -q -- '-*' $word\n"
+        "                continue\n"
+        "            end\n"
+        "            set option ''\n"
+        "        end\n"
+        '        switch "$command:$word"\n'
+        + "".join(case + "\n" for case in cases)
+        + "        end\n"
+        "    end\n"
+        '    test "$command" = "$argv[1]"\n'
+        "end\n"
+        "\n" + "".join(completion + "\n" for completion in completions)
+    )
+
+
+GENERATORS: t.Mapping[str, t.Callable[[Command, str, str], str]] = {
+    "bash": bash,
+    "zsh": zsh,
+    "fish": fish,
+}
+
+
+def generate(
+    parser: argparse.ArgumentParser, shell: Shell, prog: str, source: str
+) -> str:
+    """
+    Returns the completion script for the parser, for the command `prog`;
+    `source` is mentioned in the script as the way to regenerate it
+    """
+    return GENERATORS[shell](command_from_parser(parser), prog, source)
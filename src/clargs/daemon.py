@@ -0,0 +1,354 @@
+"""
+Resident daemon: keeps a warm process with the parser built once, and runs
+commands sent by `clargs.client` over a unix socket.
+
+With `concurrency="fork"` (the default), every request is handled in a forked
+child, which changes to the client's working directory and uses the client's
+environment. With `concurrency="thread"`, requests are handled in a thread
+pool; all requests then share the working directory and environment of the
+daemon.
+
+Only what is written to `sys.stdout` / `sys.stderr` is sent to the client;
+output of subprocesses that write to the file descriptors directly is not.
+
+When `watch` is set, the daemon restarts itself (by exec-ing the same command
+line) when a source file of one of the functions changes.
+"""
+
+from __future__ import annotations
+import argparse
+import concurrent.futures
+import contextlib
+import inspect
+import io
+import json
+import logging
+import os
+import pathlib
+import socket
+import sys
+import threading
+import time
+import traceback
+import typing as t
+
+from . import batch
+from . import client
+
+if t.TYPE_CHECKING:
+    from .clargs import Clargs
+
+logger = logging.getLogger("clargs")
+
+Target = t.Union[t.Callable, t.Sequence[t.Callable]]
+
+# how often to check for changed sources and finished children when idle
+IDLE_TIMEOUT = 1.0
+# how long a client may take to send its request, once it connected
+REQUEST_TIMEOUT = 5.0
+
+
+def functions(target: Target) -> t.Sequence[t.Callable]:
+    return [target] if callable(target) else list(target)
+
+
+def source_files(funcs: t.Sequence[t.Callable]) -> t.List[str]:
+    filenames = []
+    for func in funcs:
+        try:
+            filename = inspect.getsourcefile(inspect.unwrap(func))
+        except TypeError:
+            filename = None
+        if filename is not None and filename not in filenames:
+            filenames.append(filename)
+    return filenames
+
+
+def source_fingerprint(filenames: t.Sequence[str]) -> t.Tuple:
+    fingerprint: t.List[t.Tuple[str, t.Optional[int], t.Optional[int]]] = []
+    for filename in filenames:
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            fingerprint.append((filename, None, None))
+        else:
+            fingerprint.append((filename, stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+class SourceWatcher:
+    """
+    Tells whether the source files of the functions changed; the files are
+    checked at most once every `IDLE_TIMEOUT` seconds, also when busy
+    """
+
+    def __init__(self, funcs: t.Sequence[t.Callable]):
+        self.filenames = source_files(funcs)
+        self.fingerprint = source_fingerprint(self.filenames)
+        self.checked = time.monotonic()
+
+    def changed(self) -> bool:
+        now = time.monotonic()
+        if now - self.checked < IDLE_TIMEOUT:
+            return False
+        self.checked = now
+        return source_fingerprint(self.filenames) != self.fingerprint
+
+
+class _ChannelWriter(io.RawIOBase):
+    def __init__(self, conn: socket.socket, channel: int, lock: threading.Lock):
+        self.conn = conn
+        self.channel = channel
+        self.lock = lock
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        send_frame(self.conn, self.channel, bytes(data), self.lock)
+        return len(data)
+
+
+def send_frame(
+    conn: socket.socket,
+    channel: int,
+    payload: bytes,
+    lock: t.Optional[threading.Lock] = None,
+):
+    with lock or contextlib.nullcontext():
+        conn.sendall(client.FRAME_HEADER.pack(channel, len(payload)) + payload)
+
+
+def _text_stream(conn: socket.socket, channel: int, lock: threading.Lock):
+    return io.TextIOWrapper(
+        io.BufferedWriter(_ChannelWriter(conn, channel, lock)),
+        encoding="utf-8",
+        errors="replace",
+        line_buffering=True,
+    )
+
+
+class _ThreadLocalStream:
+    """
+    Stands in for sys.stdout / sys.stderr in thread mode, so that every
+    request thread writes to its own connection.
+    """
+
+    def __init__(self, default):
+        self._default = default
+        self._local = threading.local()
+
+    def set(self, stream):
+        self._local.stream = stream
+
+    def __getattr__(self, name):
+        return getattr(getattr(self._local, "stream", None) or self._default, name)
+
+
+@contextlib.contextmanager
+def _thread_local_streams() -> (
+    t.Iterator[t.Tuple[_ThreadLocalStream, _ThreadLocalStream]]
+):
+    """
+    Replaces sys.stdout / sys.stderr by thread local streams, until exit
+    """
+    stdout, stderr = sys.stdout, sys.stderr
+    local_stdout = _ThreadLocalStream(stdout)
+    local_stderr = _ThreadLocalStream(stderr)
+    sys.stdout = t.cast(t.Any, local_stdout)
+    sys.stderr = t.cast(t.Any, local_stderr)
+    try:
+        yield local_stdout, local_stderr
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+
+
+def read_request(conn: socket.socket) -> dict:
+    with conn.makefile("rb") as reader:
+        return json.loads(reader.readline())
+
+
+def run_request(
+    parser: argparse.ArgumentParser, argv: t.Sequence[str], stdout, stderr
+) -> int:
+    from .clargs import Clargs
+
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            Clargs.run(parser.parse_args(argv))
+    except SystemExit as e:
+        if not isinstance(e.code, (int, type(None))):
+            print(e.code, file=stderr)
+        return batch.exit_status(e)
+    except Exception:
+        traceback.print_exc(file=stderr)
+        return 1
+    finally:
+        stdout.flush()
+        stderr.flush()
+    return 0
+
+
+def _handle_in_child(conn: socket.socket, parser: argparse.ArgumentParser) -> int:
+    request = read_request(conn)
+    conn.settimeout(None)
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    lock = threading.Lock()
+    status = run_request(
+        parser,
+        request["argv"],
+        _text_stream(conn, client.STDOUT, lock),
+        _text_stream(conn, client.STDERR, lock),
+    )
+    send_frame(conn, client.EXIT, client.EXIT_STATUS.pack(status), lock)
+    return status
+
+
+def _handle_in_thread(
+    conn: socket.socket,
+    parser: argparse.ArgumentParser,
+    stdout: _ThreadLocalStream,
+    stderr: _ThreadLocalStream,
+):
+    with conn:
+        try:
+            request = read_request(conn)
+            conn.settimeout(None)
+            lock = threading.Lock()
+            request_stdout = _text_stream(conn, client.STDOUT, lock)
+            request_stderr = _text_stream(conn, client.STDERR, lock)
+            stdout.set(request_stdout)
+            stderr.set(request_stderr)
+            try:
+                # sys.stdout / sys.stderr are the thread local streams already
+                status = run_request(
+                    parser,
+                    request["argv"],
+                    t.cast(t.Any, stdout),
+                    t.cast(t.Any, stderr),
+                )
+            finally:
+                stdout.set(None)
+                stderr.set(None)
+            send_frame(conn, client.EXIT, client.EXIT_STATUS.pack(status), lock)
+        except Exception:
+            logger.exception("Failed to handle request")
+
+
+def _restart():
+    logger.info("Sources changed, restarting daemon")
+    os.execv(sys.executable, [sys.executable, *sys.orig_argv[1:]])
+
+
+def serve(
+    clargs_obj: Clargs,
+    target: Target,
+    socket_path: str | os.PathLike,
+    *,
+    concurrency: t.Literal["fork", "thread"] = "fork",
+    max_workers: t.Optional[int] = None,
+    watch: bool = True,
+) -> None:
+    parser = clargs_obj.build_parser(target)
+    watcher = SourceWatcher(functions(target)) if watch else None
+    max_workers = max_workers or os.cpu_count() or 1
+    socket_path = pathlib.Path(socket_path)
+    with contextlib.suppress(FileNotFoundError):
+        socket_path.unlink()
+
+    children: t.Set[int] = set()
+
+    def reap(block: bool):
+        while children:
+            pid, _ = os.waitpid(-1, 0 if block else os.WNOHANG)
+            if pid == 0:
+                return
+            children.discard(pid)
+            block = False
+
+    # on exit (to restart, or on an error), in reverse: wait for the running
+    # requests, remove and close the socket, and restore sys.stdout / sys.stderr
+    with contextlib.ExitStack() as stack:
+        if concurrency == "thread":
+            stdout, stderr = stack.enter_context(_thread_local_streams())
+        server = stack.enter_context(socket.socket(socket.AF_UNIX, socket.SOCK_STREAM))
+        server.bind(str(socket_path))
+        stack.callback(socket_path.unlink, missing_ok=True)
+        server.listen()
+        server.settimeout(IDLE_TIMEOUT)
+        executor: t.Optional[concurrent.futures.ThreadPoolExecutor] = None
+        if concurrency == "thread":
+            # reading a request times out, so a silent client doesn't keep the
+            # shutdown waiting
+            executor = stack.enter_context(
+                concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+            )
+        logger.info("Serving on %s", socket_path)
+        while True:
+            reap(block=False)
+            try:
+                conn, _ = server.accept()
+            except TimeoutError:
+                conn = None
+            if watcher and watcher.changed():
+                if conn is not None:
+                    _retry(conn)
+                break
+            if conn is None:
+                continue
+            conn.settimeout(REQUEST_TIMEOUT)
+            if executor:
+                executor.submit(_handle_in_thread, conn, parser, stdout, stderr)
+                continue
+            if len(children) >= max_workers:
+                reap(block=True)
+            pid = os.fork()
+            if pid == 0:
+                status = 1
+                try:
+                    server.close()
+                    status = _handle_in_child(conn, parser)
+                finally:
+                    os._exit(status)
+            children.add(pid)
+            conn.close()
+    reap(block=True)
+    _restart()
+
+
+def _retry(conn: socket.socket):
+    """
+    Tells the client to send its request again (to the restarted daemon)
+    """
+    with conn:
+        try:
+            conn.settimeout(REQUEST_TIMEOUT)
+            # read the request, so the client doesn't get a broken pipe
+            read_request(conn)
+            send_frame(conn, client.RETRY, b"")
+        except (OSError, ValueError):
+            logger.warning("Dropped a client that didn't send its request")
+
+
+def write_client_script(
+    path: str | os.PathLike,
+    socket_path: str | os.PathLike,
+    *,
+    pass_fds: bool = False,
+):
+    """
+    Writes a standalone python script that runs commands in the daemon (or,
+    with `pass_fds`, in the fork server)
+    """
+    fds = ", fds=(0, 1, 2)" if pass_fds else ""
+    source = pathlib.Path(client.__file__).read_text()
+    source = source.replace(
+        '\nif __name__ == "__main__":\n    sys.exit(main())\n',
+        '\nif __name__ == "__main__":\n'
+        f"    sys.exit(call({os.fspath(socket_path)!r}, sys.argv[1:]{fds}))\n",
+    )
+    path = pathlib.Path(path)
+    path.write_text(f"#!{sys.executable}\n{source}")
+    path.chmod(0o755)
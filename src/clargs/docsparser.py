@@ -1,6 +1,7 @@
 import re
 import textwrap
 import dataclasses
+import functools
 import typing as t
 
 """
@@ -137,35 +138,86 @@ def _get_section_paragraph_regex(
     )
 
 
-FORMAT_PARSERS = {
-    "sphynx": FormatParser(
-        param_extractor_re=_get_keyword_start_parser_regex(":param ")
-    ),
-    "epytext": FormatParser(
-        param_extractor_re=_get_keyword_start_parser_regex("@param ")
-    ),
-    "googledoc": FormatParser(
-        section_extractor_re=_get_section_paragraph_regex(
-            "Args:\n", no_indent_ends_section=True
+# The regexes are only compiled when the first docstring is parsed (or
+# FORMAT_PARSERS is used), so that importing this module is cheap.
+@functools.cache
+def _format_parsers() -> t.Dict[str, FormatParser]:
+    return {
+        "sphynx": FormatParser(
+            param_extractor_re=_get_keyword_start_parser_regex(":param ")
         ),
-        param_extractor_re=_get_keyword_start_parser_regex(""),
-    ),
-    "numpydoc": FormatParser(
-        section_extractor_re=_get_section_paragraph_regex(
-            "Parameters:?\n-+\n", no_indent_ends_section=False
+        "epytext": FormatParser(
+            param_extractor_re=_get_keyword_start_parser_regex("@param ")
         ),
-        param_extractor_re=_get_numpy_param_parser_regex(),
-    ),
-}
+        "googledoc": FormatParser(
+            section_extractor_re=_get_section_paragraph_regex(
+                "Args:\n", no_indent_ends_section=True
+            ),
+            param_extractor_re=_get_keyword_start_parser_regex(""),
+        ),
+        "numpydoc": FormatParser(
+            section_extractor_re=_get_section_paragraph_regex(
+                "Parameters:?\n-+\n", no_indent_ends_section=False
+            ),
+            param_extractor_re=_get_numpy_param_parser_regex(),
+        ),
+    }
 
 
-def get_parameter_info_from_docstring(docstring: str) -> t.Sequence[Param]:
+# A format can only give results if the start of its section / param line is
+# present, so a single scan for these markers tells which parsers to run.
+@functools.cache
+def _format_detection_re() -> t.Pattern:
+    return re.compile(
+        r"^(?:"
+        r"(?P<sphynx>:param )"
+        r"|(?P<epytext>@param )"
+        r"|(?P<googledoc>Args:\n)"
+        r"|(?P<numpydoc>Parameters:?\n-+\n)"
+        r")",
+        re.MULTILINE,
+    )
+
+
+def __getattr__(name: str) -> t.Any:
+    # FORMAT_PARSERS is built on first use; it's the dict that is used for
+    # parsing, so formats that are added to it are used too
+    if name != "FORMAT_PARSERS":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = _format_parsers()
+    return globals()[name]
+
+
+def __dir__():
+    return sorted({*globals(), "FORMAT_PARSERS"})
+
+
+# the formats that detect_formats knows; other formats are always tried
+_DETECTED_FORMATS = frozenset(["sphynx", "epytext", "googledoc", "numpydoc"])
+
+
+def detect_formats(docstring: str) -> t.Set[str]:
+    return {
+        t.cast(str, match.lastgroup)
+        for match in _format_detection_re().finditer(docstring)
+    }
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_parameter_info_from_docstring(docstring: str) -> t.Tuple[Param, ...]:
+    formats = detect_formats(docstring)
     results: t.Sequence[Param] = []
-    for parser in FORMAT_PARSERS.values():
+    for name, parser in _format_parsers().items():
+        if name in _DETECTED_FORMATS and name not in formats:
+            continue
         parser_results = parser.extract_parameters(docstring)
         if len(parser_results) > len(results):
             results = parser_results
-    return results
+    return tuple(results)
+
+
+def get_parameter_info_from_docstring(docstring: str) -> t.Sequence[Param]:
+    return list(_get_parameter_info_from_docstring(docstring))
 
 
 if __name__ == "__main__":
@@ -208,5 +260,5 @@ if __name__ == "__main__":
          long param description
          """
     )
-    for name, parser in FORMAT_PARSERS.items():
+    for name, parser in _format_parsers().items():
         print(f"{name}: {parser.extract_parameters(docstring)}")
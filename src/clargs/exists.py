@@ -0,0 +1,92 @@
+"""
+Batched existence checks, for lists of `clargs.ExistingFilePath` and
+`clargs.ExistingDirectoryPath`.
+
+Checking paths one `stat` at a time is slow on network filesystems. Here
+paths are deduplicated and grouped by parent directory; a directory with
+several paths to check is listed once with `os.scandir` (whose entries
+usually know their type without a `stat`), and everything else is checked in
+a thread pool. Paths that are not in the listing are checked with a `stat`
+as well (e.g. for case-insensitive filesystems), so only the paths that are
+really missing cost an extra call.
+"""
+
+from __future__ import annotations
+import collections
+import concurrent.futures
+import os
+import pathlib
+import typing as t
+
+# list a directory when at least this many of its entries are checked
+SCANDIR_MIN_PATHS = 4
+MAX_WORKERS = 32
+
+Kind = t.Literal["file", "directory"]
+
+_STAT_CHECKS: t.Mapping[Kind, t.Callable[[pathlib.Path], bool]] = {
+    "file": os.path.isfile,
+    "directory": os.path.isdir,
+}
+
+
+def _entry_check(entry: os.DirEntry, kind: Kind) -> bool:
+    return entry.is_file() if kind == "file" else entry.is_dir()
+
+
+def _failures_in_directory(
+    kind: Kind, parent: pathlib.Path, paths: t.Sequence[pathlib.Path]
+) -> t.List[pathlib.Path]:
+    entries: t.Mapping[str, os.DirEntry] = {}
+    if len(paths) >= SCANDIR_MIN_PATHS:
+        try:
+            with os.scandir(parent) as it:
+                entries = {entry.name: entry for entry in it}
+        except OSError:
+            pass
+    stat_check = _STAT_CHECKS[kind]
+    failures = []
+    for path in paths:
+        entry = entries.get(path.name)
+        if not (_entry_check(entry, kind) if entry else stat_check(path)):
+            failures.append(path)
+    return failures
+
+
+def find_missing(paths: t.Iterable[pathlib.Path], kind: Kind) -> t.List[pathlib.Path]:
+    """
+    Returns the paths that are not an existing file / directory, in order and
+    without duplicates
+    """
+    unique = list(dict.fromkeys(paths))
+    by_parent: t.DefaultDict[pathlib.Path, t.List[pathlib.Path]] = (
+        collections.defaultdict(list)
+    )
+    for path in unique:
+        by_parent[path.parent].append(path)
+    tasks: t.List[t.Tuple[pathlib.Path, t.List[pathlib.Path]]] = []
+    for parent, children in by_parent.items():
+        if len(children) >= SCANDIR_MIN_PATHS:
+            tasks.append((parent, children))
+        else:
+            tasks.extend((parent, [child]) for child in children)
+
+    if len(tasks) < SCANDIR_MIN_PATHS:
+        results = [_failures_in_directory(kind, *task) for task in tasks]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(MAX_WORKERS, len(tasks))
+        ) as executor:
+            results = list(
+                executor.map(lambda task: _failures_in_directory(kind, *task), tasks)
+            )
+    failures = {path for result in results for path in result}
+    return [path for path in unique if path in failures]
+
+
+def missing_files(paths: t.Iterable[pathlib.Path]) -> t.List[pathlib.Path]:
+    return find_missing(paths, "file")
+
+
+def missing_directories(paths: t.Iterable[pathlib.Path]) -> t.List[pathlib.Path]:
+    return find_missing(paths, "directory")
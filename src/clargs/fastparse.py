@@ -0,0 +1,260 @@
+"""
+A faster argument parser for the common case, for `Settings(engine="fast")`.
+
+`FastArgumentParser` is an `argparse.ArgumentParser` that first tries to parse
+the arguments in a single pass, with a table from option string to action. It
+only does so when the result is sure to be the same as argparse's: options are
+given by their full name (`--name value` or `--name=value`), every positional
+takes exactly one value, and only argparse's own store / extend / count /
+flag actions are used. Anything else (help, abbreviations, negative numbers,
+`--`, a missing or invalid value, subparsers, ...) is parsed by argparse
+itself, so that results and error messages stay identical.
+
+The arguments are first matched to the actions, without converting any value;
+only when all arguments match are the values converted and the actions called.
+A value that turns out to be invalid is still parsed again by argparse, so
+parsers with types that do more than convert (map or open a file, or read
+stdin) are always parsed by argparse.
+"""
+
+from __future__ import annotations
+import argparse
+import dataclasses
+import sys
+import typing as t
+
+from . import aap_from_data
+
+# actions that are called like argparse calls them; their exact type is
+# checked, since subclasses may do anything (like reading stdin)
+SUPPORTED_ACTIONS: t.Tuple[t.Type[argparse.Action], ...] = (
+    argparse._StoreAction,
+    argparse._StoreConstAction,
+    argparse._StoreTrueAction,
+    argparse._StoreFalseAction,
+    argparse._AppendAction,
+    argparse._AppendConstAction,
+    argparse._ExtendAction,
+    argparse._CountAction,
+    argparse.BooleanOptionalAction,
+    aap_from_data.BatchValidatedExtendAction,
+)
+
+# actions that end parsing (they print and exit); when one of their option
+# strings is given, argparse parses the arguments
+EXIT_ACTIONS: t.Tuple[t.Type[argparse.Action], ...] = (
+    argparse._HelpAction,
+    argparse._VersionAction,
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class _Table:
+    # option string -> action, for the actions in SUPPORTED_ACTIONS
+    options: t.Mapping[str, argparse.Action]
+    positionals: t.Tuple[argparse.Action, ...]
+    required: t.Tuple[argparse.Action, ...]
+
+
+def _supported_nargs(nargs: t.Any) -> bool:
+    return nargs in (
+        None,
+        argparse.OPTIONAL,
+        argparse.ZERO_OR_MORE,
+        argparse.ONE_OR_MORE,
+    ) or isinstance(nargs, int)
+
+
+def _converts_with_side_effects(typ: t.Any) -> bool:
+    """
+    Whether converting a value does something that shouldn't happen twice
+    """
+    from . import mapped
+
+    if isinstance(typ, aap_from_data.ValidatedType):
+        typ = typ.originaltype
+    return typ is mapped.map_file or isinstance(typ, argparse.FileType)
+
+
+def _compile(parser: argparse.ArgumentParser) -> t.Optional[_Table]:
+    if parser.fromfile_prefix_chars is not None or parser._mutually_exclusive_groups:
+        return None
+    options: t.Dict[str, argparse.Action] = {}
+    positionals = []
+    for action in parser._actions:
+        if type(action) in EXIT_ACTIONS:
+            continue
+        if type(action) not in SUPPORTED_ACTIONS or not _supported_nargs(action.nargs):
+            return None
+        if _converts_with_side_effects(action.type):
+            return None
+        if action.option_strings:
+            options.update(dict.fromkeys(action.option_strings, action))
+        elif action.nargs is None:
+            positionals.append(action)
+        else:
+            # positionals that take a variable number of values are matched
+            # with a regex by argparse, which has surprising corner cases
+            return None
+    return _Table(
+        options=options,
+        positionals=tuple(positionals),
+        required=tuple(
+            action
+            for action in parser._actions
+            if action.required and action.option_strings
+        ),
+    )
+
+
+def _match(
+    table: _Table, args: t.Sequence[str], prefix_chars: str
+) -> t.Optional[t.List[t.Tuple[argparse.Action, t.List[str], t.Optional[str]]]]:
+    """
+    Returns (action, strings, option string) in the order argparse would take
+    them, or None if argparse should parse the arguments
+    """
+
+    def is_option_like(token: str) -> bool:
+        return bool(token) and token[0] in prefix_chars
+
+    matched: t.List[t.Tuple[argparse.Action, t.List[str], t.Optional[str]]] = []
+    positionals = iter(table.positionals)
+    index = 0
+    while index < len(args):
+        token = args[index]
+        index += 1
+        if not is_option_like(token):
+            positional = next(positionals, None)
+            if positional is None:
+                return None
+            matched.append((positional, [token], None))
+            continue
+
+        option_string = token
+        explicit: t.Optional[str] = None
+        action = table.options.get(token)
+        if action is None:
+            option_string, equals, explicit = token.partition("=")
+            action = table.options.get(option_string) if equals else None
+            if action is None:
+                return None
+        nargs = action.nargs
+        if explicit is not None:
+            # `--name=value` gives a single value
+            if nargs == 0 or (isinstance(nargs, int) and nargs > 1):
+                return None
+            matched.append((action, [explicit], option_string))
+            continue
+
+        # the values up to the next option (inlined: there may be millions)
+        end = index
+        while end < len(args):
+            value = args[end]
+            if value and value[0] in prefix_chars:
+                break
+            end += 1
+        available = end - index
+        if nargs is None:
+            count = 1
+        elif nargs == argparse.OPTIONAL:
+            count = min(available, 1)
+        elif nargs == argparse.ZERO_OR_MORE:
+            count = available
+        elif nargs == argparse.ONE_OR_MORE:
+            count = available or 1
+        else:
+            count = t.cast(int, nargs)
+        if count > available:
+            return None
+        matched.append((action, list(args[index : index + count]), option_string))
+        index += count
+
+    if next(positionals, None) is not None:
+        return None
+    seen = {action for action, _, _ in matched}
+    if any(action not in seen for action in table.required):
+        return None
+    return matched
+
+
+def _unconverted_list(action: argparse.Action) -> bool:
+    """
+    Whether the values of the action are a list of the given strings
+    """
+    return (
+        action.type in (None, str)
+        and action.choices is None
+        and (
+            action.nargs in (argparse.ZERO_OR_MORE, argparse.ONE_OR_MORE)
+            or (isinstance(action.nargs, int) and action.nargs > 1)
+        )
+    )
+
+
+class FastArgumentParser(argparse.ArgumentParser):
+    """
+    `argparse.ArgumentParser` with a single pass parser for the common case;
+    see the module documentation
+    """
+
+    _fast_table: t.Tuple[int, t.Optional[_Table]] = (-1, None)
+
+    def _table(self) -> t.Optional[_Table]:
+        # actions are only ever added, so their number tells if the table is
+        # still up to date
+        count, table = self._fast_table
+        if count != len(self._actions):
+            table = _compile(self)
+            self._fast_table = (len(self._actions), table)
+        return table
+
+    def parse_known_args(self, args=None, namespace=None):
+        table = self._table() if namespace is None else None
+        if table is not None:
+            arg_list = sys.argv[1:] if args is None else list(args)
+            matched = _match(table, arg_list, self.prefix_chars)
+            if matched is not None:
+                try:
+                    return self._fast_parse(matched), []
+                except argparse.ArgumentError:
+                    # let argparse report the error
+                    pass
+        return super().parse_known_args(args, namespace)
+
+    def _fast_parse(
+        self,
+        matched: t.Sequence[t.Tuple[argparse.Action, t.List[str], t.Optional[str]]],
+    ) -> argparse.Namespace:
+        # the same steps as argparse's parse_known_args, for matched arguments
+        namespace = argparse.Namespace()
+        for action in self._actions:
+            if action.dest is not argparse.SUPPRESS:
+                if not hasattr(namespace, action.dest):
+                    if action.default is not argparse.SUPPRESS:
+                        setattr(namespace, action.dest, action.default)
+        for dest in self._defaults:
+            if not hasattr(namespace, dest):
+                setattr(namespace, dest, self._defaults[dest])
+
+        seen = set()
+        for action, strings, option_string in matched:
+            seen.add(action)
+            if _unconverted_list(action):
+                # what _get_values returns, without a call per value
+                values = strings
+            else:
+                values = self._get_values(action, strings)
+            if values is not argparse.SUPPRESS:
+                action(self, namespace, values, option_string)
+
+        for action in self._actions:
+            if (
+                action not in seen
+                and action.default is not None
+                and isinstance(action.default, str)
+                and hasattr(namespace, action.dest)
+                and action.default is getattr(namespace, action.dest)
+            ):
+                setattr(namespace, action.dest, self._get_value(action, action.default))
+        return namespace
@@ -0,0 +1,228 @@
+"""
+Fork server: imports the functions and builds the parser once, and then forks
+a child for every command sent by `clargs.client --pass-fds`.
+
+Every command runs in a fresh copy-on-write copy of the server, so nothing a
+command does (global state, caches, threads) leaks into the next one. The
+client passes its stdin, stdout and stderr over the unix socket (SCM_RIGHTS),
+so the child reads and writes the client's terminal, pipes or files directly
+(also from subprocesses). The server only sends back the exit status.
+
+The server is single threaded; it waits for new connections, requests,
+finished children and closed connections (the client is gone: the child is
+terminated) in one `select` loop.
+"""
+
+from __future__ import annotations
+import contextlib
+import json
+import logging
+import os
+import pathlib
+import select
+import signal
+import socket
+import sys
+import typing as t
+
+from . import client
+from . import daemon
+
+if t.TYPE_CHECKING:
+    import argparse
+
+    from .clargs import Clargs
+
+logger = logging.getLogger("clargs")
+
+# how often to check for changed sources when idle
+IDLE_TIMEOUT = 1.0
+# how long a client may take to send the rest of its request, once it started
+REQUEST_TIMEOUT = 5.0
+
+
+def receive_request(conn: socket.socket) -> t.Tuple[dict, t.List[int]]:
+    data, fds, _, _ = socket.recv_fds(conn, 65536, 3)
+    while not data.endswith(b"\n"):
+        more = conn.recv(65536)
+        if not more:
+            break
+        data += more
+    return json.loads(data), fds
+
+
+def _peek(conn: socket.socket) -> bytes:
+    try:
+        return conn.recv(1, socket.MSG_PEEK)
+    except ConnectionResetError:
+        return b""
+
+
+def exit_status(wait_status: int) -> int:
+    status = os.waitstatus_to_exitcode(wait_status)
+    # like a shell: killed by signal N gives 128 + N
+    return 128 - status if status < 0 else status
+
+
+def _run_child(
+    parser: argparse.ArgumentParser, request: dict, fds: t.Sequence[int]
+) -> int:
+    for fd, target in zip(fds, (0, 1, 2)):
+        os.dup2(fd, target)
+        os.close(fd)
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    return daemon.run_request(parser, request["argv"], sys.stdout, sys.stderr)
+
+
+class _Server:
+    def __init__(self, parser: argparse.ArgumentParser, listener: socket.socket):
+        self.parser = parser
+        self.listener = listener
+        # pid -> connection to send the exit status to
+        self.children: t.Dict[int, socket.socket] = {}
+        # accepted connections, waiting for their request
+        self.pending: t.List[socket.socket] = []
+        self.wakeup_read, self.wakeup_write = os.pipe()
+        os.set_blocking(self.wakeup_write, False)
+
+    def __enter__(self):
+        # SIGCHLD wakes up the select loop
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.set_wakeup_fd(self.wakeup_write)
+        return self
+
+    def __exit__(self, *exc_info):
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        os.close(self.wakeup_read)
+        os.close(self.wakeup_write)
+
+    def wait(self, timeout: t.Optional[float]) -> t.List[t.Any]:
+        waiting_for: t.List[t.Union[int, socket.socket]] = [
+            self.listener,
+            self.wakeup_read,
+            *self.children.values(),
+            *self.pending,
+        ]
+        readable, _, _ = select.select(waiting_for, [], [], timeout)
+        if self.wakeup_read in readable:
+            os.read(self.wakeup_read, 512)
+        return readable
+
+    def reap(self):
+        while self.children:
+            pid, wait_status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            conn = self.children.pop(pid, None)
+            if conn is None:
+                continue
+            status = exit_status(wait_status)
+            with conn, contextlib.suppress(OSError):
+                daemon.send_frame(conn, client.EXIT, client.EXIT_STATUS.pack(status))
+
+    def terminate_abandoned(self, readable: t.Sequence[t.Any]):
+        for pid, conn in list(self.children.items()):
+            if conn in readable and not _peek(conn):
+                logger.debug("Client of %d went away, terminating", pid)
+                with contextlib.suppress(ProcessLookupError):
+                    os.kill(pid, signal.SIGTERM)
+
+    def accept(self):
+        # the request is read when it arrives, so that a client that doesn't
+        # send anything doesn't block the others
+        conn, _ = self.listener.accept()
+        self.pending.append(conn)
+
+    def receive(self, readable: t.Sequence[t.Any]):
+        for conn in [conn for conn in self.pending if conn in readable]:
+            self.pending.remove(conn)
+            self.start(conn)
+
+    def start(self, conn: socket.socket):
+        try:
+            conn.settimeout(REQUEST_TIMEOUT)
+            request, fds = receive_request(conn)
+            conn.settimeout(None)
+        except (OSError, ValueError):
+            logger.exception("Failed to read request")
+            conn.close()
+            return
+        if len(fds) != 3:
+            for fd in fds:
+                os.close(fd)
+            with conn:
+                message = b"Fork server needs stdin, stdout and stderr\n"
+                daemon.send_frame(conn, client.STDERR, message)
+                daemon.send_frame(conn, client.EXIT, client.EXIT_STATUS.pack(2))
+            return
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                signal.set_wakeup_fd(-1)
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                self.listener.close()
+                for other in [*self.children.values(), *self.pending]:
+                    other.close()
+                conn.close()
+                status = _run_child(self.parser, request, fds)
+            except Exception:
+                logger.exception("Failed to run request")
+            finally:
+                os._exit(status)
+        for fd in fds:
+            os.close(fd)
+        self.children[pid] = conn
+
+    def retry_and_restart(self):
+        # finish running commands first; their connections don't survive exec
+        while self.children:
+            self.wait(None)
+            self.reap()
+        self.listener.setblocking(False)
+        with contextlib.suppress(BlockingIOError):
+            while True:
+                conn, _ = self.listener.accept()
+                self.pending.append(conn)
+        for conn in self.pending:
+            with conn, contextlib.suppress(OSError, ValueError):
+                conn.settimeout(REQUEST_TIMEOUT)
+                _, fds = receive_request(conn)
+                for fd in fds:
+                    os.close(fd)
+                daemon.send_frame(conn, client.RETRY, b"")
+        daemon._restart()
+
+
+def fork_server(
+    clargs_obj: Clargs,
+    target: daemon.Target,
+    socket_path: str | os.PathLike,
+    *,
+    watch: bool = True,
+) -> None:
+    parser = clargs_obj.build_parser(target)
+    watcher = daemon.SourceWatcher(daemon.functions(target)) if watch else None
+    socket_path = pathlib.Path(socket_path)
+    with contextlib.suppress(FileNotFoundError):
+        socket_path.unlink()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(str(socket_path))
+        listener.listen()
+        logger.info("Fork server on %s", socket_path)
+        with _Server(parser, listener) as server:
+            while True:
+                readable = server.wait(IDLE_TIMEOUT)
+                server.reap()
+                server.terminate_abandoned(readable)
+                if watcher and watcher.changed():
+                    server.retry_and_restart()
+                server.receive(readable)
+                if listener in readable:
+                    server.accept()
@@ -0,0 +1,104 @@
+"""
+On-disk cache for the `--help` output of `create_parser_and_run`.
+
+Printing help means building the whole parser and formatting it, for a text
+that only changes when the function (or the settings) change. When the help
+option is in the arguments, the help text is looked up before the parser is
+built, keyed by the function fingerprint (see `spec_cache`), the settings, the
+program name, the terminal width, the python version and the arguments before
+the help option (argparse acts on those first, e.g. by failing on an invalid
+value). On a miss, the parser is built as usual, and the help text is stored
+when argparse prints it.
+
+Only the exact help options (`-h` and `--help`, with the prefix argparse uses)
+are recognised; abbreviations such as `--hel` are handled by argparse without
+the cache.
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import logging
+import os
+import pathlib
+import shutil
+import sys
+import typing as t
+
+from . import spec_cache
+
+if t.TYPE_CHECKING:
+    from .clargs import Settings
+
+logger = logging.getLogger("clargs")
+
+
+def help_options(prefix_chars: str) -> t.Tuple[str, str]:
+    # the same as argparse.ArgumentParser(add_help=True) uses
+    prefix = "-" if "-" in prefix_chars else prefix_chars[0]
+    return prefix + "h", prefix * 2 + "help"
+
+
+def help_key(
+    func: t.Callable, settings: Settings, argv: t.Sequence[str], prefix_chars: str
+) -> t.Optional[str]:
+    """
+    Returns the cache key for the help output, or None if the arguments
+    don't ask for help (or the function cannot be fingerprinted)
+    """
+    options = help_options(prefix_chars)
+    for index, arg in enumerate(argv):
+        if arg == "--":
+            return None
+        if arg in options:
+            break
+    else:
+        return None
+    fingerprint = spec_cache.function_fingerprint(func, settings)
+    if fingerprint is None:
+        return None
+    parts = (
+        fingerprint,
+        sys.version_info[:2],
+        # argparse's default prog, and the width its HelpFormatter uses
+        os.path.basename(sys.argv[0]),
+        shutil.get_terminal_size().columns,
+        list(argv[:index]),
+    )
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def _cache_file(cache_dir: pathlib.Path, key: str) -> pathlib.Path:
+    return pathlib.Path(cache_dir) / f"{key}.help"
+
+
+def load(cache_dir: pathlib.Path, key: str) -> t.Optional[str]:
+    try:
+        text = _cache_file(cache_dir, key).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.debug("Could not load help cache %s", key, exc_info=True)
+        return None
+    logger.debug("Loaded help from help cache %s", key)
+    return text
+
+
+def store(cache_dir: pathlib.Path, key: str, text: str):
+    try:
+        spec_cache.write_atomically(_cache_file(cache_dir, key), text.encode())
+    except OSError:
+        logger.debug("Could not write help cache %s", key, exc_info=True)
+
+
+def record(parser: argparse.ArgumentParser, cache_dir: pathlib.Path, key: str):
+    """
+    Makes the parser store its help text in the cache when it prints it
+    """
+
+    def print_help(file: t.Optional[t.TextIO] = None) -> None:
+        text = parser.format_help()
+        store(cache_dir, key, text)
+        parser._print_message(text, file or sys.stdout)
+
+    parser.print_help = print_help  # type: ignore[assignment]
@@ -1,6 +1,11 @@
 import argparse
+import array
 import pathlib
+from . import aap_from_data
+from . import arrays
 from . import clargs
+from . import exists
+from . import mapped
 import typing as t
 
 
@@ -38,19 +43,55 @@ Count = t.Annotated[
     ),
 ]
 
+
+def _is_dir(p: pathlib.Path) -> bool:
+    return p.is_dir()
+
+
+def _is_file(p: pathlib.Path) -> bool:
+    return p.is_file()
+
+
+# lists of these paths are checked all at once
+aap_from_data.BATCH_VALIDATORS[_is_dir] = exists.missing_directories
+aap_from_data.BATCH_VALIDATORS[_is_file] = exists.missing_files
+
+
 ExistingDirectoryPath = t.Annotated[
     pathlib.Path,
     clargs.extra_info(
-        validate=lambda p: p.is_dir(),
+        validate=_is_dir,
     ),
 ]
 
 ExistingFilePath = t.Annotated[
     pathlib.Path,
     clargs.extra_info(
-        validate=lambda p: p.is_file(),
+        validate=_is_file,
+    ),
+]
+
+MappedFile = t.Annotated[
+    memoryview,
+    clargs.extra_info(
+        type=mapped.map_file,
+    ),
+]
+
+IntArray = t.Annotated[
+    array.array,
+    clargs.extra_info(
+        action=arrays.IntArrayAction,
+    ),
+]
+
+FloatArray = t.Annotated[
+    array.array,
+    clargs.extra_info(
+        action=arrays.FloatArrayAction,
     ),
 ]
 
 TYPE = t.TypeVar("TYPE")
 ListOfAtLeastOne = t.Annotated[list[TYPE], clargs.extra_info(nargs="+")]
+StreamedList = t.Annotated[list[TYPE], clargs.extra_info(stream=True)]
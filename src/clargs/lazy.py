@@ -0,0 +1,108 @@
+"""
+Lazy subcommands.
+
+A subcommand is registered with only its name and help text; the function is
+imported and its arguments are added to the subparser when the subcommand is
+actually chosen on the command line (which includes `mytool subcommand --help`).
+"""
+
+from __future__ import annotations
+import argparse
+import importlib
+import typing as t
+
+
+def split_target(target: str) -> t.Tuple[str, str]:
+    module_name, sep, qualname = target.partition(":")
+    if not sep or not module_name or not qualname:
+        raise ValueError(f"Target should be in the form 'module:function': {target!r}")
+    return module_name, qualname
+
+
+def import_target(target: str) -> t.Any:
+    module_name, qualname = split_target(target)
+    obj: t.Any = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+class _Pending:
+    """
+    A subparser that is created when it's first looked up
+    """
+
+    def __init__(self, create: t.Callable[[], argparse.ArgumentParser]):
+        self.create = create
+        self.parser: t.Optional[argparse.ArgumentParser] = None
+
+    def get(self) -> argparse.ArgumentParser:
+        if self.parser is None:
+            self.parser = self.create()
+        return self.parser
+
+
+class _LazyParserMap(dict):
+    """
+    The name -> subparser map of `LazySubParsersAction` (which argparse also
+    uses as its choices); subparsers of lazy subcommands are created when
+    they are looked up
+    """
+
+    def __getitem__(self, name):
+        value = super().__getitem__(name)
+        if isinstance(value, _Pending):
+            value = value.get()
+            self[name] = value
+        return value
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def values(self):
+        return [self[name] for name in self]
+
+    def items(self):
+        return [(name, self[name]) for name in self]
+
+
+class LazySubParsersAction(argparse._SubParsersAction):
+    """
+    Subparsers action that creates and populates a subparser only when it's
+    chosen.
+
+    Use as `parser.add_subparsers(action=clargs.LazySubParsersAction)`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._name_parser_map = self.choices = _LazyParserMap(self._name_parser_map)
+
+    def add_lazy_parser(
+        self,
+        name: str,
+        populate: t.Callable[[argparse.ArgumentParser], None],
+        **kwargs,
+    ) -> None:
+        """
+        Registers a subcommand like `add_parser`; the parser is only created
+        (and passed to `populate`) when the subcommand is chosen
+        """
+        if kwargs.get("prog") is None:
+            kwargs["prog"] = f"{self._prog_prefix} {name}"
+        aliases = kwargs.pop("aliases", ())
+        for command in (name, *aliases):
+            if command in self._name_parser_map:
+                raise argparse.ArgumentError(self, f"conflicting subparser: {command}")
+        if "help" in kwargs:
+            help = kwargs.pop("help")
+            self._choices_actions.append(self._ChoicesPseudoAction(name, aliases, help))
+
+        def create() -> argparse.ArgumentParser:
+            parser = self._parser_class(**kwargs)
+            populate(parser)
+            return parser
+
+        pending = _Pending(create)
+        for command in (name, *aliases):
+            self._name_parser_map[command] = pending
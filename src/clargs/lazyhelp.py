@@ -0,0 +1,105 @@
+"""
+Help texts that are only computed when they are shown, for
+`Settings(lazy_help=True)`.
+
+Parsing a docstring for the help of the parameters is only needed when the
+help (or an error with the help) is printed, which most runs don't do.
+`LazyHelp` stands in for the help string of an argument (or a subcommand),
+and computes it when argparse's formatter uses it. Help formatters only call
+a handful of `str` operations on the help, which `LazyHelp` supports.
+
+The description of a parser is passed through a regex by the formatter, so a
+`LazyHelp` description needs `LazyHelpFormatter`.
+"""
+
+from __future__ import annotations
+import argparse
+import functools
+import typing as t
+
+from . import docsparser
+
+_UNRESOLVED = object()
+
+
+class LazyHelp:
+    """
+    The help text `compute(*args)`, computed when it's first used
+    """
+
+    __slots__ = ("compute", "args", "_text")
+
+    def __init__(self, compute: t.Callable[..., t.Optional[str]], *args: t.Any):
+        self.compute = compute
+        self.args = args
+        self._text: t.Any = _UNRESOLVED
+
+    def resolve(self) -> t.Optional[str]:
+        if self._text is _UNRESOLVED:
+            self._text = self.compute(*self.args)
+        return self._text
+
+    def __str__(self) -> str:
+        return self.resolve() or ""
+
+    def __repr__(self) -> str:
+        return repr(self.resolve())
+
+    def __bool__(self) -> bool:
+        return bool(self.resolve())
+
+    def __len__(self) -> int:
+        return len(str(self))
+
+    def __contains__(self, part: str) -> bool:
+        return part in str(self)
+
+    def __mod__(self, values: t.Any) -> str:
+        return str(self) % values
+
+    def __add__(self, other: str) -> str:
+        return str(self) + other
+
+    def __radd__(self, other: str) -> str:
+        return other + str(self)
+
+    def __eq__(self, other: t.Any) -> bool:
+        if isinstance(other, LazyHelp):
+            other = other.resolve()
+        return self.resolve() == other
+
+    def __hash__(self) -> int:
+        return hash(self.resolve())
+
+    def __getattr__(self, name: str) -> t.Any:
+        # the other str methods (strip, splitlines, ...)
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(str(self), name)
+
+    def __reduce__(self):
+        return (LazyHelp, (self.compute, *self.args))
+
+
+@functools.lru_cache(maxsize=256)
+def _parameter_descriptions(docstring: str) -> t.Mapping[str, t.Optional[str]]:
+    return {
+        p.name: p.description
+        for p in docsparser.get_parameter_info_from_docstring(docstring)
+    }
+
+
+def parameter_help(docstring: str, name: str) -> t.Optional[str]:
+    return _parameter_descriptions(docstring).get(name)
+
+
+class LazyHelpFormatter(argparse.HelpFormatter):
+    """
+    `argparse.HelpFormatter` that also accepts a `LazyHelp` as description
+    (or epilog)
+    """
+
+    def add_text(self, text: t.Optional[str]) -> None:
+        if isinstance(text, LazyHelp):
+            text = text.resolve()
+        super().add_text(text)
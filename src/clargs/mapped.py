@@ -0,0 +1,54 @@
+"""
+Read-only memory mapped files, for `clargs.MappedFile`.
+
+The file is mapped while parsing, and the function gets a read-only
+`memoryview` of the mapping. `Clargs.run` closes the mappings of its arguments
+after the function returns (when the function still holds views into it, the
+mapping is left to the garbage collector).
+
+`-` reads stdin, which usually cannot be mapped (e.g. a pipe); it is read
+into memory instead.
+"""
+
+import argparse
+import contextlib
+import mmap
+import os
+import sys
+import typing as t
+import weakref
+
+# mappings made by map_file, that are closed by release
+_open_maps: weakref.WeakSet[mmap.mmap] = weakref.WeakSet()
+
+
+def map_file(value: str) -> memoryview:
+    if value == "-":
+        return memoryview(sys.stdin.buffer.read())
+    if not os.path.isfile(value):
+        raise argparse.ArgumentTypeError(f"{value!r} is not an existing file")
+    try:
+        f = open(value, "rb")
+    except OSError as e:
+        raise argparse.ArgumentTypeError(f"can't open {value!r}: {e.strerror}")
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # empty files cannot be mapped
+            return memoryview(b"")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _open_maps.add(mapped)
+    return memoryview(mapped)
+
+
+def release(values: t.Iterable[t.Any]) -> None:
+    if not _open_maps:
+        return
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            # e.g. list[MappedFile]
+            release(value)
+        elif isinstance(value, memoryview) and value.obj in _open_maps:
+            mapped = t.cast(mmap.mmap, value.obj)
+            with contextlib.suppress(BufferError):
+                value.release()
+                mapped.close()
@@ -0,0 +1,169 @@
+"""
+Response files (`@args.txt`), for `Settings(response_file_prefix="@")`.
+
+An argument that starts with the prefix is replaced by the arguments in the
+file. A file with a NUL character in its first chunk contains NUL-delimited
+arguments (as written by `find -print0` or `printf '%s\\0'`); any other file
+contains shell-quoted arguments, split like `shlex.split` does (POSIX quoting,
+no comments), so arguments can span lines.
+
+The file is read in chunks and tokenized per chunk, straight into the list of
+arguments, so that millions of arguments don't need a copy of the whole file
+(or a list of lines) next to them. Unlike argparse's `fromfile_prefix_chars`,
+arguments from a response file are not expanded again.
+"""
+
+from __future__ import annotations
+import argparse
+import codecs
+import functools
+import re
+import sys
+import typing as t
+
+from . import tracing
+
+CHUNK_SIZE = 1 << 20
+
+# a shell word: unquoted characters, backslash escapes, and quoted strings
+# (which may be unterminated at the end of a chunk)
+_WORD_RE = re.compile(
+    r"""(?:[^ \t\r\n'"\\]+|\\.?|'[^']*'?|"(?:[^"\\]|\\.?)*"?)+""", re.DOTALL
+)
+_PART_RE = re.compile(
+    r"""[^'"\\]+"""
+    r"""|\\(?P<escaped>.?)"""
+    r"""|'(?P<single>[^']*)(?P<single_end>'?)"""
+    r"""|"(?P<double>(?:[^"\\]|\\.?)*)(?P<double_end>"?)""",
+    re.DOTALL,
+)
+_DOUBLE_QUOTED_ESCAPE_RE = re.compile(r'\\([\\"])')
+# text without these can be split with str.split(): no quoting, and no
+# whitespace that str.split() splits on but a shell does not
+_NOT_PLAIN_RE = re.compile(
+    r"""['"\\\x0b\x0c\x1c-\x1f\x85\xa0\u1680\u2000-\u200a"""
+    r"""\u2028\u2029\u202f\u205f\u3000]"""
+)
+
+
+class ResponseFileException(ValueError):
+    pass
+
+
+def _chunks(path: str) -> t.Iterator[str]:
+    # the same encoding that argv is decoded with
+    decoder = codecs.getincrementaldecoder(sys.getfilesystemencoding())(
+        sys.getfilesystemencodeerrors()
+    )
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def _nul_delimited(chunks: t.Iterable[str]) -> t.Iterator[t.List[str]]:
+    rest = ""
+    for chunk in chunks:
+        tokens = (rest + chunk).split("\0")
+        rest = tokens.pop()
+        yield tokens
+    if rest:
+        yield [rest]
+
+
+def _unquote(word: str) -> str:
+    if "\\" not in word and "'" not in word and '"' not in word:
+        return word
+    parts = []
+    for match in _PART_RE.finditer(word):
+        kind = match.group()[0]
+        if kind == "'":
+            if not match.group("single_end"):
+                raise ResponseFileException("No closing quotation")
+            parts.append(match.group("single"))
+        elif kind == '"':
+            if not match.group("double_end"):
+                raise ResponseFileException("No closing quotation")
+            parts.append(_DOUBLE_QUOTED_ESCAPE_RE.sub(r"\1", match.group("double")))
+        elif kind == "\\":
+            if not match.group("escaped"):
+                raise ResponseFileException("No escaped character")
+            parts.append(match.group("escaped"))
+        else:
+            parts.append(match.group())
+    return "".join(parts)
+
+
+def _shell_quoted(chunks: t.Iterable[str]) -> t.Iterator[t.List[str]]:
+    rest = ""
+    for chunk in chunks:
+        text = rest + chunk
+        plain = _NOT_PLAIN_RE.search(text) is None
+        words = text.split() if plain else _WORD_RE.findall(text)
+        rest = ""
+        if words and text.endswith(words[-1]):
+            # the last word may continue in the next chunk
+            rest = words.pop()
+        yield words if plain else [_unquote(word) for word in words]
+    if rest:
+        yield [_unquote(rest)]
+
+
+def read_response_file(path: str) -> t.List[str]:
+    chunks = _chunks(path)
+    first = next(chunks)
+    tokenize = _nul_delimited if "\0" in first else _shell_quoted
+    tokens: t.List[str] = []
+    for part in tokenize(_prepend(first, chunks)):
+        tokens.extend(part)
+    return tokens
+
+
+def _prepend(first: str, chunks: t.Iterator[str]) -> t.Iterator[str]:
+    yield first
+    yield from chunks
+
+
+def expand(args: t.Sequence[str], prefix: str) -> t.List[str]:
+    expanded: t.List[str] = []
+    for arg in args:
+        if not arg.startswith(prefix) or len(arg) == len(prefix):
+            expanded.append(arg)
+            continue
+        path = arg[len(prefix) :]
+        with tracing.span(tracing.active(), "response_file") as attributes:
+            tokens = read_response_file(path)
+            attributes["tokens"] = len(tokens)
+        expanded.extend(tokens)
+    return expanded
+
+
+class ResponseFileMixin(argparse.ArgumentParser):
+    """
+    Expands response files before parsing; subparsers get the arguments
+    expanded already
+    """
+
+    def __init__(self, *args, response_file_prefix: t.Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.response_file_prefix = response_file_prefix
+
+    def parse_known_args(self, args=None, namespace=None):
+        if self.response_file_prefix is not None:
+            try:
+                args = expand(
+                    sys.argv[1:] if args is None else args, self.response_file_prefix
+                )
+            except (OSError, ResponseFileException) as err:
+                self.error(str(err))
+        return super().parse_known_args(args, namespace)
+
+
+@functools.cache
+def parser_class(
+    base: t.Type[argparse.ArgumentParser],
+) -> t.Type[argparse.ArgumentParser]:
+    """
+    `base` (`argparse.ArgumentParser` or a subclass) with response files
+    """
+    return type(f"ResponseFile{base.__name__}", (ResponseFileMixin, base), {})
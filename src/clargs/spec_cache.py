@@ -0,0 +1,141 @@
+"""
+On-disk cache for the argument specs of a function.
+
+Building the argument specs means evaluating the signature, parsing the
+docstring and resolving all types. The result only changes when the function
+(or the settings) change, so it's stored as a pickle, keyed by a fingerprint of
+the function's code, docstring, annotations, defaults and the settings.
+
+Callables (types, validators, actions) are pickled by reference, so only
+functions that are importable by name can be cached. If the specs cannot be
+pickled (e.g. because a lambda is used as validator), nothing is cached and the
+specs are built every time.
+
+Loading a pickle can run any code, so cache files that are not owned by the
+current user, or that are writable by group or others, are ignored.
+"""
+
+from __future__ import annotations
+import dataclasses
+import hashlib
+import inspect
+import logging
+import os
+import pathlib
+import pickle
+import re
+import tempfile
+import typing as t
+
+from . import __about__
+
+if t.TYPE_CHECKING:
+    from .clargs import ArgumentSpec, Settings
+
+logger = logging.getLogger("clargs")
+
+# reprs of functions and objects contain their memory address, which is
+# different on every run
+_ADDRESS_RE = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+def _stable_repr(obj: t.Any) -> str:
+    return _ADDRESS_RE.sub("", repr(obj))
+
+
+def _get_annotations(func: t.Callable) -> t.Mapping[str, t.Any]:
+    annotations = getattr(func, "__annotations__", None) or {}
+    if any(isinstance(annotation, str) for annotation in annotations.values()):
+        # with `from __future__ import annotations` the annotations are strings;
+        # evaluate them so that a change in an imported alias is noticed
+        try:
+            return inspect.get_annotations(func, eval_str=True)
+        except Exception:
+            logger.debug("Could not evaluate annotations of %r", func)
+    return annotations
+
+
+def function_fingerprint(func: t.Callable, settings: Settings) -> t.Optional[str]:
+    func = inspect.unwrap(func)
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return None
+    parts = (
+        __about__.__version__,
+        func.__module__,
+        func.__qualname__,
+        code.co_argcount,
+        code.co_posonlyargcount,
+        code.co_kwonlyargcount,
+        code.co_varnames,
+        code.co_code,
+        _get_annotations(func),
+        func.__defaults__,
+        func.__kwdefaults__,
+        func.__doc__,
+        [
+            (field.name, getattr(settings, field.name))
+            for field in dataclasses.fields(settings)
+            if field.compare
+        ],
+    )
+    return hashlib.sha256(_stable_repr(parts).encode()).hexdigest()
+
+
+def _cache_file(cache_dir: pathlib.Path, key: str) -> pathlib.Path:
+    return pathlib.Path(cache_dir) / f"{key}.pickle"
+
+
+def is_trusted(f: t.BinaryIO) -> bool:
+    """
+    Unpickling runs code, so only files that no one else could have written are
+    loaded: owned by the current user, and not writable by group or others
+    """
+    stat = os.fstat(f.fileno())
+    if hasattr(os, "getuid") and stat.st_uid != os.getuid():
+        return False
+    return not stat.st_mode & 0o022
+
+
+def load(cache_dir: pathlib.Path, key: str) -> t.Optional[t.Sequence[ArgumentSpec]]:
+    try:
+        with _cache_file(cache_dir, key).open("rb") as f:
+            if not is_trusted(f):
+                logger.warning(
+                    "Ignoring spec cache %s: not owned by the current user, "
+                    "or writable by others",
+                    f.name,
+                )
+                return None
+            specs = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # a broken or outdated cache file should never break the cli
+        logger.debug("Could not load spec cache %s", key, exc_info=True)
+        return None
+    logger.debug("Loaded specs from spec cache %s", key)
+    return specs
+
+
+def store(cache_dir: pathlib.Path, key: str, specs: t.Sequence[ArgumentSpec]):
+    try:
+        data = pickle.dumps(list(specs))
+    except Exception:
+        logger.debug("Specs for %s cannot be cached", key, exc_info=True)
+        return
+    try:
+        write_atomically(_cache_file(cache_dir, key), data)
+    except OSError:
+        logger.debug("Could not write spec cache %s", key, exc_info=True)
+
+
+def write_atomically(path: pathlib.Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write to a temporary file first, so that a concurrent reader never sees a
+    # half-written cache file
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f".{path.stem}.", delete=False
+    ) as f:
+        f.write(data)
+    os.replace(f.name, path)
@@ -0,0 +1,128 @@
+"""
+List arguments that can be read from files or stdin.
+
+Every value of a streamed list argument is either an element, `@FILE` (the
+elements in FILE) or `-` (the elements on stdin). Files have an element per
+line, or are NUL-delimited when the first block contains a NUL character.
+
+Elements are converted (and checked against the choices) by the action, not
+by argparse, since argparse would try to convert `@FILE` itself.
+`StreamingListAction` reads everything while parsing; `StreamingIterAction`
+(for `Iterator[X]` / `Iterable[X]` parameters) gives the function an iterator
+that reads and converts the elements as they are used.
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import itertools
+import sys
+import typing as t
+
+BLOCKSIZE = 1 << 16
+
+
+def split_stream(f: t.TextIO) -> t.Iterator[str]:
+    buffer = ""
+    separator = None
+    while block := f.read(BLOCKSIZE):
+        buffer += block
+        if separator is None:
+            separator = "\0" if "\0" in buffer else "\n"
+        *items, buffer = buffer.split(separator)
+        if separator == "\n":
+            # skip empty lines, and allow \r\n
+            items = [item.rstrip("\r") for item in items if item.strip()]
+        yield from items
+    if buffer.strip() if separator == "\n" else buffer:
+        yield buffer.rstrip("\r") if separator == "\n" else buffer
+
+
+def is_source(value: str) -> bool:
+    return value == "-" or value.startswith("@")
+
+
+def open_source(
+    action: argparse.Action, value: str
+) -> t.Tuple[str, t.ContextManager[t.TextIO]]:
+    """
+    Returns the name, and the opened file, for `-` or `@FILE`
+    """
+    if value == "-":
+        return "<stdin>", contextlib.nullcontext(sys.stdin)
+    name = value[1:]
+    try:
+        # the items replace arguments, so they are decoded like argv (and like
+        # response files)
+        return name, open(
+            name,
+            encoding=sys.getfilesystemencoding(),
+            errors=sys.getfilesystemencodeerrors(),
+        )
+    except OSError as e:
+        raise argparse.ArgumentError(action, f"can't open {name!r}: {e}")
+
+
+class StreamingListAction(argparse.Action):
+    def __init__(
+        self,
+        option_strings,
+        dest,
+        *,
+        type: t.Optional[t.Callable[[str], t.Any]] = None,
+        choices: t.Optional[t.Collection[t.Any]] = None,
+        metavar=None,
+        **kwargs,
+    ):
+        if metavar is None and choices is not None:
+            metavar = "{" + ",".join(map(str, choices)) + "}"
+        # argparse should pass the strings (including @FILE) unchanged
+        super().__init__(option_strings, dest, metavar=metavar, **kwargs)
+        self.converter = type or str
+        self.element_choices = choices
+
+    def _convert(self, value: str, location: t.Optional[str]) -> t.Any:
+        where = f" ({location})" if location else ""
+        try:
+            result = self.converter(value)
+        except (TypeError, ValueError):
+            name = getattr(self.converter, "__name__", repr(self.converter))
+            raise argparse.ArgumentError(
+                self, f"invalid {name} value: {value!r}{where}"
+            )
+        if self.element_choices is not None and result not in self.element_choices:
+            choices = ", ".join(map(repr, self.element_choices))
+            raise argparse.ArgumentError(
+                self, f"invalid choice: {result!r}{where} (choose from {choices})"
+            )
+        return result
+
+    def _from_source(self, value: str) -> t.Iterator[t.Any]:
+        if not is_source(value):
+            yield self._convert(value, None)
+            return
+        name, opener = open_source(self, value)
+        with opener as f:
+            for index, item in enumerate(split_stream(f), 1):
+                yield self._convert(item, f"{name}, item {index}")
+
+    def items(self, values: t.Sequence[str]) -> t.Iterator[t.Any]:
+        return itertools.chain.from_iterable(map(self._from_source, values))
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        items = list(getattr(namespace, self.dest, None) or [])
+        items.extend(self.items(values))
+        setattr(namespace, self.dest, items)
+
+
+class StreamingIterAction(StreamingListAction):
+    def __call__(self, parser, namespace, values, option_string=None):
+        previous = getattr(namespace, self.dest, None) or ()
+        setattr(namespace, self.dest, itertools.chain(previous, self._lazy(values)))
+
+    def _lazy(self, values: t.Sequence[str]) -> t.Iterator[t.Any]:
+        try:
+            yield from self.items(values)
+        except argparse.ArgumentError as e:
+            # parsing is done, so this is a normal exception for the function
+            raise ValueError(str(e)) from None
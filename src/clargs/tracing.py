@@ -0,0 +1,178 @@
+"""
+Timing of the phases of building a parser and running a function, to find
+out what makes a CLI slow to start.
+
+Pass a tracer as `Settings(tracer=...)`; `Clargs` then opens a span for every
+phase: `create_parser`, `add_subparser`, `add_to_parser`, `signature`,
+`docstring`, `resolve_type` (per parameter, with the `handler` of
+`AapFromData` that matched), `add_argument`, `parse_args` (with the number of
+`tokens`; only in `create_parser_and_run`), `validate` (inside `parse_args`),
+`run`, `bind` and `call`. Spans get attributes such as `function` and
+`parameter`.
+
+A tracer is any object with a `span(name, attributes)` method that returns a
+context manager; the attributes dict may still get entries while the span is
+open. `FlameTracer` collects the spans, and prints a summary tree.
+"""
+
+from __future__ import annotations
+import contextlib
+import contextvars
+import dataclasses
+import sys
+import time
+import typing as t
+
+
+class Tracer(t.Protocol):
+    def span(
+        self, name: str, attributes: t.Dict[str, t.Any]
+    ) -> t.ContextManager[t.Any]: ...
+
+
+# the tracer for spans in code that gets no settings (e.g. validation while
+# parsing), set by `activate`
+_active: contextvars.ContextVar[t.Optional[Tracer]] = contextvars.ContextVar(
+    "clargs_tracer", default=None
+)
+
+
+def active() -> t.Optional[Tracer]:
+    return _active.get()
+
+
+@contextlib.contextmanager
+def activate(tracer: t.Optional[Tracer]) -> t.Iterator[None]:
+    token = _active.set(tracer)
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def span(
+    tracer: t.Optional[Tracer], name: str, **attributes: t.Any
+) -> t.ContextManager[t.Dict[str, t.Any]]:
+    """
+    Opens a span on the tracer (if any); gives the attributes dict, to add
+    attributes that are only known later
+    """
+    if tracer is None:
+        return contextlib.nullcontext(attributes)
+    return _span(tracer, name, attributes)
+
+
+@contextlib.contextmanager
+def _span(
+    tracer: Tracer, name: str, attributes: t.Dict[str, t.Any]
+) -> t.Iterator[t.Dict[str, t.Any]]:
+    with tracer.span(name, attributes):
+        yield attributes
+
+
+def name_of(func: t.Callable) -> str:
+    return getattr(func, "__qualname__", None) or repr(func)
+
+
+@dataclasses.dataclass(kw_only=True)
+class Span:
+    name: str
+    attributes: t.Dict[str, t.Any]
+    depth: int
+    start: float
+    duration: float = 0.0
+
+
+class FlameTracer:
+    """
+    Records all spans. `summary()` (or `print_summary()`) shows the total time
+    and count per stack of spans, as an indented tree, slowest first;
+    `folded()` gives the stacks in the "folded" format of flame graph tools.
+
+    Spans with the same name (and values for the attributes in `group_by`)
+    under the same parent are added up.
+    """
+
+    def __init__(self, *, group_by: t.Sequence[str] = ("handler",)):
+        self.group_by = group_by
+        self.spans: t.List[Span] = []
+        self._depth = 0
+
+    @contextlib.contextmanager
+    def span(self, name: str, attributes: t.Dict[str, t.Any]) -> t.Iterator[None]:
+        record = Span(
+            name=name,
+            attributes=attributes,
+            depth=self._depth,
+            start=time.perf_counter(),
+        )
+        self.spans.append(record)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            record.duration = time.perf_counter() - record.start
+
+    def _label(self, span: Span) -> str:
+        groups = [
+            str(span.attributes[key]) for key in self.group_by if key in span.attributes
+        ]
+        return f"{span.name} ({', '.join(groups)})" if groups else span.name
+
+    def stacks(self) -> t.Dict[t.Tuple[str, ...], t.Tuple[float, int]]:
+        """
+        Returns (total seconds, count) per stack of labels, in order of first
+        occurrence
+        """
+        stacks: t.Dict[t.Tuple[str, ...], t.Tuple[float, int]] = {}
+        path: t.List[str] = []
+        for span in self.spans:
+            del path[span.depth :]
+            path.append(self._label(span))
+            seconds, count = stacks.get(tuple(path), (0.0, 0))
+            stacks[tuple(path)] = (seconds + span.duration, count + 1)
+        return stacks
+
+    def folded(self) -> str:
+        """
+        One line per stack: the labels separated by `;`, and the time spent in
+        the stack itself (not in its children) in microseconds
+        """
+        stacks = self.stacks()
+        own = {stack: seconds for stack, (seconds, _) in stacks.items()}
+        for stack, (seconds, _) in stacks.items():
+            if len(stack) > 1:
+                own[stack[:-1]] -= seconds
+        return "".join(
+            f"{';'.join(stack)} {max(0, round(seconds * 1e6))}\n"
+            for stack, seconds in own.items()
+        )
+
+    def summary(self) -> str:
+        stacks = self.stacks()
+        total = sum(
+            seconds for stack, (seconds, _) in stacks.items() if len(stack) == 1
+        )
+        children: t.Dict[t.Tuple[str, ...], t.List[t.Tuple[str, ...]]] = {}
+        for stack in stacks:
+            children.setdefault(stack[:-1], []).append(stack)
+
+        lines = []
+
+        def add(stack: t.Tuple[str, ...]) -> None:
+            seconds, count = stacks[stack]
+            label = "  " * (len(stack) - 1) + stack[-1]
+            share = seconds / total if total else 0
+            lines.append(
+                f"{label:<50} {seconds * 1e3:>10.3f}ms {share:>7.1%} {count:>6}x"
+            )
+            for child in sorted(children.get(stack, []), key=lambda s: -stacks[s][0]):
+                add(child)
+
+        for root in sorted(children.get((), []), key=lambda s: -stacks[s][0]):
+            add(root)
+        return "".join(line + "\n" for line in lines)
+
+    def print_summary(self, file: t.Optional[t.TextIO] = None) -> None:
+        (file or sys.stderr).write(self.summary())
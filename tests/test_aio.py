@@ -0,0 +1,123 @@
+import asyncio
+import clargs
+import io
+import json
+import time
+import unittest.mock
+from .test_simple import Base
+
+
+async def fetch(key: str, *, delay: float = 0.0):
+    await asyncio.sleep(delay)
+    print(f"fetched {key}")
+    if key == "missing":
+        raise KeyError(key)
+    return key.upper()
+
+
+class TestRunCoroutine(Base):
+    def test_run_awaits(self):
+        parser = clargs.create_parser(fetch)
+        self.assertEqual(clargs.run(parser.parse_args(["abc"])), "ABC")
+
+    def test_create_parser_and_run(self):
+        with unittest.mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            result = clargs.create_parser_and_run(fetch, ["abc"])
+        self.assertEqual(result, "ABC")
+        self.assertEqual(stdout.getvalue(), "fetched abc\n")
+
+    def test_event_loop_settings(self):
+        loops = []
+
+        def factory():
+            loops.append(asyncio.new_event_loop())
+            return loops[-1]
+
+        async def function():
+            loop = asyncio.get_running_loop()
+            return loop is loops[0], loop.get_debug()
+
+        settings = clargs.Settings(event_loop_factory=factory, asyncio_debug=True)
+        result = clargs.Clargs(settings=settings).create_parser_and_run(function, [])
+        self.assertEqual(result, (True, True))
+        self.assertTrue(loops[0].is_closed())
+
+    def test_event_loop_of_the_thread_is_kept(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        asyncio.set_event_loop(loop)
+        self.addCleanup(asyncio.set_event_loop, None)
+        self.assertEqual(clargs.create_parser_and_run(fetch, ["abc"]), "ABC")
+        self.assertIs(asyncio.get_event_loop_policy().get_event_loop(), loop)
+        self.assertEqual(len(list(clargs.run_many(fetch, ["abc", "def"]))), 2)
+        self.assertIs(asyncio.get_event_loop_policy().get_event_loop(), loop)
+
+    def test_run_async(self):
+        def double(number: int):
+            return 2 * number
+
+        async def main():
+            return [
+                await clargs.run_async(clargs.create_parser(fetch).parse_args(["a"])),
+                await clargs.run_async(clargs.create_parser(double).parse_args(["2"])),
+            ]
+
+        self.assertEqual(asyncio.run(main()), ["A", 4])
+
+
+class TestRunManyAsync(Base):
+    def test_concurrent(self):
+        lines = [f"key{i} --delay 0.2" for i in range(20)]
+        start = time.monotonic()
+        results = list(clargs.run_many(fetch, lines, jobs=20, capture_output=True))
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual([r.result for r in results], [f"KEY{i}" for i in range(20)])
+        self.assertEqual(
+            [r.stdout for r in results], [f"fetched key{i}\n" for i in range(20)]
+        )
+
+    def test_semaphore_limits_concurrency(self):
+        running = []
+        most = []
+
+        async def function(i: int):
+            running.append(i)
+            most.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(i)
+            return i
+
+        results = list(clargs.run_many(function, map(str, range(20)), jobs=3))
+        self.assertEqual([r.result for r in results], list(range(20)))
+        self.assertEqual(max(most), 3)
+
+    def test_errors_per_line(self):
+        results = list(
+            clargs.run_many(fetch, ["a", "missing", "--delay x", "b"], jobs=2)
+        )
+        self.assertEqual([r.exit_status for r in results], [0, 1, 2, 0])
+        self.assertEqual(results[1].error, "KeyError: 'missing'")
+
+    def test_unordered(self):
+        lines = ["slow --delay 0.3", "fast"]
+        results = list(clargs.run_many(fetch, lines, jobs=2, ordered=False))
+        self.assertEqual([r.line_number for r in results], [2, 1])
+
+    def test_in_running_loop(self):
+        async def main():
+            return [
+                result.result
+                async for result in clargs.run_many_async(fetch, ["a", "b"], jobs=2)
+            ]
+
+        self.assertEqual(asyncio.run(main()), ["A", "B"])
+
+    def test_batch_switch(self):
+        with unittest.mock.patch("sys.stdin", io.StringIO("a\nb --delay 0.1\n")):
+            with unittest.mock.patch("sys.stdout", new_callable=io.StringIO) as out:
+                clargs.create_parser_and_run(
+                    fetch, ["--clargs-batch", "-", "--clargs-jobs", "2"]
+                )
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r["result"] for r in results], ["A", "B"])
+        self.assertEqual(results[1]["stdout"], "fetched b\n")
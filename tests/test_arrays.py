@@ -0,0 +1,63 @@
+import array
+import clargs
+import pathlib
+import tempfile
+import typing as t
+from .test_simple import Base
+
+
+class TestArrays(Base):
+    def test_int_array(self):
+        def function(
+            numbers: clargs.IntArray, *, weights: t.Optional[clargs.FloatArray] = None
+        ):
+            pass
+
+        parser = clargs.create_parser(function)
+        args = parser.parse_args(["1", "-2", "3", "--weights", "0.5", "1e3"])
+        self.assertEqual(args.numbers, array.array("q", [1, -2, 3]))
+        self.assertEqual(args.weights, array.array("d", [0.5, 1000.0]))
+        args = parser.parse_args([])
+        self.assertEqual(
+            vars(args),
+            {
+                "_clargs_func_": function,
+                "numbers": array.array("q"),
+                "weights": None,
+            },
+        )
+
+    def test_repeated_flag_and_files(self):
+        def function(*, numbers: clargs.IntArray):
+            pass
+
+        parser = clargs.create_parser(function)
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = pathlib.Path(tempdir) / "numbers.txt"
+            path.write_text("3\n4\n")
+            args = parser.parse_args(
+                ["--numbers", "1", "2", f"@{path}", "5", "--numbers", "6"]
+            )
+            self.assertEqual(args.numbers, array.array("q", [1, 2, 3, 4, 5, 6]))
+            path.write_text("3\nfour\n")
+            with self.assertExit(msg=f"invalid int value: 'four' ({path}, item 2)"):
+                parser.parse_args(["--numbers", f"@{path}"])
+
+    def test_errors(self):
+        def function(numbers: clargs.IntArray):
+            pass
+
+        parser = clargs.create_parser(function)
+        with self.assertExit(msg="argument numbers: invalid int value: 'x'"):
+            parser.parse_args(["1", "x"])
+        with self.assertExit(msg="invalid int value: '100000000000000000000' (out"):
+            parser.parse_args(["1", "1" + "0" * 20])
+
+    def test_plain_array_not_supported(self):
+        def function(numbers: array.array):
+            pass
+
+        with self.assertRaisesRegex(
+            clargs.GetArgsFromTypeException, "Use clargs.IntArray"
+        ):
+            clargs.create_parser(function)
@@ -0,0 +1,136 @@
+import clargs
+import contextlib
+import io
+import json
+import pathlib
+import sys
+import tempfile
+import typing as t
+import unittest.mock
+from .test_simple import Base
+
+
+def divide(a: int, b: int, *, verbose: clargs.Flag = False):
+    if verbose:
+        print(f"dividing {a} by {b}")
+    if b == 42:
+        sys.exit(3)
+    return a // b
+
+
+class TestRunMany(Base):
+    def test_results_per_line(self):
+        lines = [
+            "10 2",
+            "",
+            '["9", "3", "--verbose"]',
+            "1 0",
+            "one 2",
+            "1 42",
+            "'unclosed",
+        ]
+        results = list(clargs.run_many(divide, lines, capture_output=True))
+        self.assertEqual(
+            [(r.line_number, r.exit_status, r.result) for r in results],
+            [
+                (1, 0, 5),
+                (3, 0, 3),
+                (4, 1, None),
+                (5, 2, None),
+                (6, 3, None),
+                (7, 2, None),
+            ],
+        )
+        self.assertEqual(results[1].stdout, "dividing 9 by 3\n")
+        self.assertEqual(
+            results[2].error, "ZeroDivisionError: integer division or modulo by zero"
+        )
+        self.assertIn("invalid int value: 'one'", results[3].error)
+        self.assertIn("Cannot read line", results[5].error)
+
+    def test_help_does_not_stop_batch(self):
+        results = list(clargs.run_many(divide, ["--help", "4 2"], capture_output=True))
+        self.assertEqual([r.exit_status for r in results], [0, 0])
+        self.assertIn("usage:", results[0].stdout)
+        self.assertEqual(results[1].result, 2)
+
+    def test_batch_switch(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            batch_file = pathlib.Path(tempdir) / "batch.txt"
+            batch_file.write_text("10 2\n1 0\n")
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                with self.assertRaises(SystemExit) as cm:
+                    clargs.create_parser_and_run(
+                        divide, ["--clargs-batch", str(batch_file)]
+                    )
+        self.assertEqual(cm.exception.code, 1)
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([(r["line"], r["status"]) for r in records], [(1, 0), (2, 1)])
+        self.assertEqual(records[0]["result"], 5)
+
+    def test_batch_switch_all_ok(self):
+        stdout = io.StringIO()
+        with unittest.mock.patch("sys.stdin", io.StringIO("4 2\n6 3\n")):
+            with contextlib.redirect_stdout(stdout):
+                clargs.create_parser_and_run(divide, ["--clargs-batch=-"])
+        self.assertEqual(len(stdout.getvalue().splitlines()), 2)
+
+
+def square(number: int) -> int:
+    if number < 0:
+        raise ValueError("negative")
+    print(f"squaring {number}")
+    return number * number
+
+
+def mapped_size(data: clargs.MappedFile) -> int:
+    return len(data)
+
+
+def iterated_sum(numbers: t.Iterator[int]) -> int:
+    return sum(numbers)
+
+
+class TestRunManyInPool(Base):
+    def test_ordered(self):
+        lines = [str(i) for i in range(50)] + ["-3", "x"]
+        results = list(
+            clargs.run_many(square, lines, jobs=2, chunksize=4, capture_output=True)
+        )
+        self.assertEqual([r.line_number for r in results], list(range(1, 53)))
+        self.assertEqual([r.result for r in results[:50]], [i * i for i in range(50)])
+        self.assertEqual(results[3].stdout, "squaring 3\n")
+        self.assertEqual(results[50].error, "ValueError: negative")
+        self.assertEqual(results[51].exit_status, 2)
+
+    def test_unordered(self):
+        lines = [str(i) for i in range(20)]
+        results = list(clargs.run_many(square, lines, jobs=3, ordered=False))
+        self.assertEqual(
+            sorted((r.line_number, r.result) for r in results),
+            [(i + 1, i * i) for i in range(20)],
+        )
+
+    def test_not_importable(self):
+        def local_square(number: int) -> int:
+            return number * number
+
+        with self.assertRaisesRegex(ValueError, "must be importable"):
+            clargs.run_many(local_square, ["1"], jobs=2)
+
+    def test_not_sendable(self):
+        for func in [mapped_size, iterated_sum]:
+            with self.subTest(func=func.__name__):
+                with self.assertRaisesRegex(ValueError, "cannot be a MappedFile"):
+                    clargs.run_many(func, ["1"], jobs=2)
+
+    def test_batch_switch_with_jobs(self):
+        stdout = io.StringIO()
+        with unittest.mock.patch("sys.stdin", io.StringIO("2\n3\n")):
+            with contextlib.redirect_stdout(stdout):
+                clargs.create_parser_and_run(
+                    square, ["--clargs-batch", "-", "--clargs-jobs", "2"]
+                )
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([r["result"] for r in records], [4, 9])
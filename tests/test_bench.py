@@ -0,0 +1,46 @@
+import clargs
+import json
+import pathlib
+import tempfile
+from .test_simple import Base
+
+from clargs import bench
+
+
+class TestBench(Base):
+    def test_synthetic_function_parses_its_arguments(self):
+        for style in bench.STYLES:
+            func, argv = bench.synthetic_function("f", len(bench.TYPES), style)
+            parser = clargs.create_parser(func)
+            args = parser.parse_args(argv)
+            self.assertEqual(args.p1, 42)
+            self.assertEqual(args.p6, [1, 2, 3])
+            self.assertEqual(args.p8, 2)
+            self.assertIn("The parameter p0", parser.format_help())
+
+    def test_compare(self):
+        baseline = {"results": {"a": {"seconds": 1.0, "peak_bytes": 100}}}
+        current = {"results": {"a": {"seconds": 1.2, "peak_bytes": 100}}}
+        kwargs = {"threshold": 0.25, "memory_threshold": 0.1}
+        self.assertEqual(bench.compare(baseline, current, **kwargs), [])
+        current["results"]["a"]["seconds"] = 1.5
+        current["results"]["b"] = {"seconds": 100.0}
+        [regression] = bench.compare(baseline, current, **kwargs)
+        self.assertIn("a seconds", regression)
+
+    def test_main_with_baseline(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            output = pathlib.Path(tempdir) / "results.json"
+            baseline = pathlib.Path(tempdir) / "baseline.json"
+            self.assertEqual(bench.main(output=output, quick=True, repeat=1), 0)
+            results = json.loads(output.read_text())
+            self.assertIn("build/params-100/numpydoc", results["results"])
+            self.assertGreater(results["results"]["import"]["seconds"], 0)
+            response_file = results["results"]["parse-fast/response-file-nul-500000"]
+            self.assertGreater(response_file["peak_rss_bytes"], 0)
+            for result in results["results"].values():
+                result["seconds"] /= 10
+            baseline.write_text(json.dumps(results))
+            self.assertEqual(
+                bench.main(output=output, baseline=baseline, quick=True, repeat=1), 1
+            )
@@ -0,0 +1,102 @@
+import clargs
+import contextlib
+import io
+import pathlib
+import tempfile
+import typing as t
+from clargs import __main__ as clargs_main
+from clargs import codegen
+from .test_simple import Base
+
+
+def is_even(n: int) -> bool:
+    return n % 2 == 0
+
+
+def compiled_func(
+    word: t.Literal["foo", "bar"],
+    numbers: list[int],
+    *,
+    even: t.Annotated[int, clargs.extra_info(validate=is_even)] = 2,
+    path: pathlib.Path = pathlib.Path("/tmp"),
+    color: t.Annotated[
+        str, clargs.extra_info(mapping={"red": "#f00", "green": "#0f0"})
+    ] = "#f00",
+    flag: clargs.Flag = False,
+    verbose: clargs.Count,
+):
+    """
+    A function to compile
+
+    :param word: A word
+    :param numbers: Some numbers
+    """
+    return (word, numbers, even, path, color, flag, verbose)
+
+
+def lambda_func(*, number: t.Annotated[int, clargs.extra_info(validate=lambda n: n)]):
+    return number
+
+
+TARGET = "tests.test_codegen:compiled_func"
+
+
+class TestCodegen(Base):
+    def load(self, code):
+        namespace: dict = {}
+        exec(compile(code, "_cli.py", "exec"), namespace)
+        return namespace["create_parser"]()
+
+    def test_same_result_as_create_parser(self):
+        generated = self.load(codegen.generate_module(clargs.Clargs(), TARGET))
+        created = clargs.create_parser(compiled_func)
+        for argv in [
+            ["foo"],
+            ["bar", "1", "2", "--even", "4", "-p", "/etc", "--flag", "-vv"],
+            ["foo", "--color", "green", "--no-flag"],
+        ]:
+            with self.subTest(argv=argv):
+                self.assertEqual(
+                    vars(generated.parse_args(argv)), vars(created.parse_args(argv))
+                )
+        self.assertEqual(generated.format_help(), created.format_help())
+        with self.assertExit(msg="invalid int-validation value: '3'"):
+            generated.parse_args(["foo", "--even", "3"])
+
+    def test_unreferencable_values(self):
+        with self.assertRaisesRegex(codegen.CodegenException, "lambda"):
+            codegen.generate_module(clargs.Clargs(), "tests.test_codegen:lambda_func")
+
+    def test_bad_target(self):
+        for target, msg in [
+            ("tests.no_such_module:main", "No module named"),
+            ("tests.test_codegen:no_such_func", "no attribute 'no_such_func'"),
+            ("tests.test_codegen", "module:function"),
+        ]:
+            with self.subTest(target=target):
+                with self.assertExit(msg=f"error: cannot import {target}: "):
+                    clargs_main.main(["compile", target])
+                with self.assertExit(msg=msg):
+                    clargs_main.main(["completion", "bash", target])
+
+    def test_check(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            output = pathlib.Path(tempdir) / "_cli.py"
+            capture = io.StringIO()
+            with contextlib.redirect_stderr(capture):
+                self.assertEqual(
+                    clargs_main.main(["compile", TARGET, "-o", str(output), "-c"]), 1
+                )
+                self.assertEqual(
+                    clargs_main.main(["compile", TARGET, "-o", str(output)]), 0
+                )
+                self.assertEqual(
+                    clargs_main.main(["compile", TARGET, "-o", str(output), "--check"]),
+                    0,
+                )
+                output.write_text(output.read_text().replace("A word", "A verb"))
+                self.assertEqual(
+                    clargs_main.main(["compile", TARGET, "-o", str(output), "--check"]),
+                    1,
+                )
+            self.assertIn("is not up to date", capture.getvalue())
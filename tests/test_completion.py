@@ -0,0 +1,224 @@
+import argparse
+import clargs
+import contextlib
+import io
+import pathlib
+import shlex
+import shutil
+import subprocess
+import tempfile
+import typing as t
+import unittest
+from clargs import __main__ as clargs_main
+from clargs import completion
+from .test_simple import Base
+
+
+def build(
+    source: clargs.ExistingDirectoryPath,
+    *,
+    level: t.Literal["low", "high"] = "low",
+    output: pathlib.Path = pathlib.Path("out"),
+    inputs: list[clargs.ExistingFilePath] = [],
+    verbose: clargs.Count = 0,
+    fancy: clargs.Flag = False,
+    jobs: int = 1,
+):
+    """
+    Builds [things]: fast
+
+    :param level: The level, it's 'low' by default
+    """
+
+
+def clean(what: t.Literal["all", "some"], *, force: clargs.Flag = False):
+    """
+    Cleans up
+    """
+
+
+COMMANDS = [build, clean]
+
+
+def parser():
+    parser = clargs.create_parser(build)
+    parser.prog = "tool"
+    return parser
+
+
+def subcommands_parser():
+    return clargs.build_parser(COMMANDS)
+
+
+class TestCommandFromParser(Base):
+    def test_options(self):
+        command = completion.command_from_parser(parser())
+        options = {option.strings[0]: option for option in command.options}
+        self.assertEqual(options["--fancy"].strings, ["--fancy", "--no-fancy", "-f"])
+        self.assertIsNone(options["--fancy"].values)
+        self.assertTrue(options["--verbose"].repeatable)
+        self.assertEqual(options["--level"].values.choices, ["low", "high"])
+        self.assertEqual(options["--output"].values.kind, "file")
+        self.assertEqual(options["--inputs"].values.kind, "file")
+        self.assertTrue(options["--inputs"].values.many)
+        self.assertEqual(options["--jobs"].values, completion.Values())
+        [source] = command.positionals
+        self.assertEqual(source.values.kind, "directory")
+
+    def test_subcommands(self):
+        command = completion.command_from_parser(subcommands_parser())
+        self.assertEqual(
+            [(sub.path, sub.help) for sub in command.subcommands],
+            [(("build",), "Builds [things]: fast"), (("clean",), "Cleans up")],
+        )
+        [what] = command.subcommands[1].positionals
+        self.assertEqual(what.values.choices, ["all", "some"])
+
+    def test_lazy_subcommands(self):
+        lazy = argparse.ArgumentParser()
+        subparsers = lazy.add_subparsers(action=clargs.LazySubParsersAction)
+        for func in COMMANDS:
+            clargs.add_subparser(subparsers, func)
+        self.assertEqual(
+            completion.command_from_parser(lazy),
+            completion.command_from_parser(subcommands_parser()),
+        )
+
+
+@unittest.skipIf(shutil.which("bash") is None, "needs bash")
+class TestBash(Base):
+    def complete(self, script: str, *words: str) -> t.List[str]:
+        with tempfile.TemporaryDirectory() as tempdir:
+            directory = pathlib.Path(tempdir)
+            (directory / "subdir").mkdir()
+            (directory / "file.txt").write_text("")
+            result = subprocess.run(
+                [
+                    "bash",
+                    "-c",
+                    f"{script}\n"
+                    f"COMP_WORDS=({shlex.join(words)})\n"
+                    "COMP_CWORD=$((${#COMP_WORDS[@]} - 1))\n"
+                    "_clargs_tool\n"
+                    'printf "%s\\n" "${COMPREPLY[@]}"\n',
+                ],
+                cwd=directory,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        return sorted(filter(None, result.stdout.splitlines()))
+
+    def test_single_function(self):
+        script = completion.generate(parser(), "bash", "tool", "test")
+        self.assertEqual(self.complete(script, "tool", "--f"), ["--fancy"])
+        self.assertEqual(self.complete(script, "tool", "--n"), ["--no-fancy"])
+        self.assertEqual(self.complete(script, "tool", "-l", ""), ["high", "low"])
+        self.assertEqual(self.complete(script, "tool", "--level", "h"), ["high"])
+        self.assertEqual(self.complete(script, "tool", "--jobs", ""), [])
+        self.assertEqual(
+            self.complete(script, "tool", "--output", ""), ["file.txt", "subdir"]
+        )
+        self.assertEqual(
+            self.complete(script, "tool", "-i", "file.txt", ""), ["file.txt", "subdir"]
+        )
+        self.assertEqual(
+            self.complete(script, "tool", "-i", "file.txt", "--le"), ["--level"]
+        )
+        self.assertEqual(self.complete(script, "tool", "-vv", ""), ["subdir"])
+        self.assertEqual(self.complete(script, "tool", "subdir", ""), [])
+
+    def test_subcommands(self):
+        script = completion.generate(subcommands_parser(), "bash", "tool", "test")
+        self.assertEqual(self.complete(script, "tool", ""), ["build", "clean"])
+        self.assertEqual(self.complete(script, "tool", "--"), ["--help"])
+        self.assertEqual(self.complete(script, "tool", "clean", ""), ["all", "some"])
+        self.assertEqual(
+            self.complete(script, "tool", "clean", "--force", "s"), ["some"]
+        )
+        self.assertEqual(self.complete(script, "tool", "clean", "--f"), ["--force"])
+        self.assertEqual(
+            self.complete(script, "tool", "build", "--level", "low", "-"),
+            sorted(
+                "-h --help --level -l --output -o --inputs -i --verbose -v "
+                "--fancy --no-fancy -f --jobs -j".split()
+            ),
+        )
+
+
+class TestScripts(Base):
+    def test_zsh(self):
+        script = completion.generate(subcommands_parser(), "zsh", "tool", "test")
+        self.assertTrue(script.startswith("#compdef tool\n"))
+        self.assertIn("'--level=[The level, it'\\''s '\\''low'\\'' by default]", script)
+        self.assertIn(":value:(low high)'", script)
+        self.assertIn("'*--verbose[", script)
+        self.assertIn("'--no-fancy[", script)
+        self.assertIn("'1:source:_files -/'", script)
+        self.assertIn(":value:_files'", script)
+        self.assertIn("'build:Builds [things]: fast'", script)
+        self.assertIn("'-l+[The level", script)
+        self.assertIn("(clean) _clargs_tool_clean ;;", script)
+
+    def test_fish(self):
+        script = completion.generate(subcommands_parser(), "fish", "tool", "test")
+        self.assertIn(
+            "complete -c 'tool' -n '__clargs_tool_command_is build' "
+            "-l 'level' -s 'l' -d 'The level, it\\'s \\'low\\' by default' "
+            "-x -a 'low high'",
+            script,
+        )
+        self.assertIn("-l 'no-fancy'", script)
+        self.assertIn("-l 'output' -s 'o' -r -F", script)
+        self.assertIn(
+            "complete -c 'tool' -n '__clargs_tool_command_is \\'\\'' "
+            "-f -a 'clean' -d 'Cleans up'",
+            script,
+        )
+        self.assertIn("-a '(__fish_complete_directories (commandline -ct))'", script)
+
+    def test_syntax(self):
+        for shell in ["bash", "zsh", "fish"]:
+            if shutil.which(shell) is None:
+                continue
+            with self.subTest(shell=shell):
+                script = completion.generate(subcommands_parser(), shell, "tool", "t")
+                subprocess.run([shell, "-n"], input=script, text=True, check=True)
+
+
+class TestMain(Base):
+    def test_main(self):
+        capture = io.StringIO()
+        with contextlib.redirect_stdout(capture):
+            self.assertEqual(
+                clargs_main.main(
+                    ["completion", "bash", "tests.test_completion:COMMANDS"]
+                ),
+                0,
+            )
+        script = capture.getvalue()
+        self.assertIn(
+            "generated by `python -m clargs completion bash "
+            "tests.test_completion:COMMANDS --prog tests`",
+            script,
+        )
+        self.assertIn("complete -o filenames -F _clargs_tests tests", script)
+
+    def test_parser_target(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            output = pathlib.Path(tempdir) / "tool.fish"
+            clargs_main.main(
+                [
+                    "completion",
+                    "fish",
+                    "tests.test_completion:PARSER",
+                    "--prog",
+                    "tool",
+                    "-o",
+                    str(output),
+                ]
+            )
+            self.assertIn("complete -c 'tool'", output.read_text())
+
+
+PARSER = parser()
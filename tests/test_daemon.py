@@ -0,0 +1,148 @@
+import io
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from .test_simple import Base
+
+from clargs import client
+from clargs import daemon
+
+SRC = pathlib.Path(__file__).parent.parent / "src"
+
+COMMANDS = textwrap.dedent(
+    """
+    import clargs
+    import os
+    import sys
+
+
+    def greet(name: str, *, shout: clargs.Flag = False):
+        text = f"hello {name}"
+        print(text.upper() if shout else text)
+
+
+    def where():
+        print(os.getcwd())
+        print(os.environ.get("CLARGS_TEST_VALUE"))
+
+
+    def fail(code: int):
+        print("failing", file=sys.stderr)
+        sys.exit(code)
+
+
+    def crash():
+        raise RuntimeError("boom")
+    """
+)
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "needs fork and unix sockets")
+class TestDaemon(Base):
+    concurrency = "fork"
+
+    def setUp(self):
+        super().setUp()
+        self.tempdir = pathlib.Path(tempfile.mkdtemp())
+        self.module = self.tempdir / "daemon_commands.py"
+        self.module.write_text(COMMANDS)
+        self.socket = self.tempdir / "clargs.sock"
+        code = (
+            "import clargs, clargs.daemon, daemon_commands as m; "
+            "clargs.daemon.REQUEST_TIMEOUT = 0.5; "
+            "clargs.serve([m.greet, m.where, m.fail, m.crash], "
+            f"{str(self.socket)!r}, concurrency={self.concurrency!r})"
+        )
+        env = dict(
+            os.environ, PYTHONPATH=os.pathsep.join([str(SRC), str(self.tempdir)])
+        )
+        self.server = subprocess.Popen([sys.executable, "-c", code], env=env)
+        self.addCleanup(self.server.wait)
+        self.addCleanup(self.server.kill)
+
+    def call(self, *argv):
+        stdout, stderr = io.BytesIO(), io.BytesIO()
+        status = client.call(str(self.socket), argv, stdout=stdout, stderr=stderr)
+        return status, stdout.getvalue().decode(), stderr.getvalue().decode()
+
+    def test_output_and_exit_status(self):
+        self.assertEqual(self.call("greet", "world"), (0, "hello world\n", ""))
+        self.assertEqual(
+            self.call("greet", "world", "--shout"), (0, "HELLO WORLD\n", "")
+        )
+        self.assertEqual(self.call("fail", "3"), (3, "", "failing\n"))
+        status, _, stderr = self.call("crash")
+        self.assertEqual(status, 1)
+        self.assertIn("RuntimeError: boom", stderr)
+        status, _, stderr = self.call("greet")
+        self.assertEqual(status, 2)
+        self.assertIn("the following arguments are required: name", stderr)
+
+    def test_cwd_and_environment(self):
+        os.environ["CLARGS_TEST_VALUE"] = "from client"
+        self.addCleanup(os.environ.pop, "CLARGS_TEST_VALUE")
+        cwd = os.getcwd()
+        os.chdir(self.tempdir)
+        self.addCleanup(os.chdir, cwd)
+        self.assertEqual(
+            self.call("where"),
+            (0, f"{os.path.realpath(self.tempdir)}\nfrom client\n", ""),
+        )
+
+    def test_restart_on_source_change(self):
+        self.assertEqual(self.call("greet", "world"), (0, "hello world\n", ""))
+        self.module.write_text(COMMANDS.replace("hello", "goodbye"))
+        # sources are checked at most once per IDLE_TIMEOUT
+        time.sleep(daemon.IDLE_TIMEOUT * 1.2)
+        self.assertEqual(self.call("greet", "world"), (0, "goodbye world\n", ""))
+
+    def test_silent_client_does_not_block_restart(self):
+        self.assertEqual(self.call("greet", "world"), (0, "hello world\n", ""))
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as silent:
+            silent.connect(str(self.socket))
+            self.module.write_text(COMMANDS.replace("hello", "goodbye"))
+            time.sleep(daemon.IDLE_TIMEOUT * 1.2)
+            self.assertEqual(self.call("greet", "world"), (0, "goodbye world\n", ""))
+            self.assertEqual(self.call("greet", "world"), (0, "goodbye world\n", ""))
+
+
+class TestDaemonThreads(TestDaemon):
+    concurrency = "thread"
+
+    def test_cwd_and_environment(self):
+        # threads share the working directory and environment of the daemon
+        self.assertEqual(self.call("where")[0], 0)
+
+
+class TestThreadLocalStreams(Base):
+    def test_restored(self):
+        stdout, stderr = sys.stdout, sys.stderr
+        with self.assertRaises(RuntimeError):
+            with daemon._thread_local_streams() as (local_stdout, local_stderr):
+                self.assertIs(sys.stdout, local_stdout)
+                self.assertIs(sys.stderr, local_stderr)
+                raise RuntimeError
+        self.assertIs(sys.stdout, stdout)
+        self.assertIs(sys.stderr, stderr)
+
+
+class TestClientScript(Base):
+    def test_write_client_script(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            script = pathlib.Path(tempdir) / "client"
+            daemon.write_client_script(script, "/tmp/some.sock")
+            self.assertTrue(os.access(script, os.X_OK))
+            source = script.read_text()
+            self.assertIn("sys.exit(call('/tmp/some.sock', sys.argv[1:]))", source)
+            self.assertNotIn("clargs import", source)
+            daemon.write_client_script(script, "/tmp/some.sock", pass_fds=True)
+            self.assertIn(
+                "sys.exit(call('/tmp/some.sock', sys.argv[1:], fds=(0, 1, 2)))",
+                script.read_text(),
+            )
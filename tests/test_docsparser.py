@@ -271,3 +271,47 @@ class TestNumpyDocParser(DocParserBase):
                 Param(name="bar", typeinfo="some weird type", description="My bar"),
             ],
         )
+
+
+class TestFormatDetection(DocParserBase):
+    def test_detect(self):
+        from clargs.docsparser import detect_formats
+
+        docstring = textwrap.dedent(
+            """\
+            Some text that mentions :param foo: but not at the start of a line
+
+            Args:
+                foo: My foo
+
+            Parameters
+            ----------
+            bar : int
+                My bar
+            """
+        )
+        self.assertEqual(detect_formats(docstring), {"googledoc", "numpydoc"})
+        self.assertEqual(detect_formats("Just some text"), set())
+
+    def test_memoized_result_is_a_fresh_list(self):
+        docstring = ":param foo: My foo\n"
+        first = get_parameter_info_from_docstring(docstring)
+        first.append(Param(name="bar", description="My bar"))
+        self.assertParse(docstring, [Param(name="foo", description="My foo")])
+
+    def test_added_format_is_used(self):
+        import re
+        from clargs import docsparser
+
+        self.assertIn("sphynx", docsparser.FORMAT_PARSERS)
+        self.assertIn("FORMAT_PARSERS", dir(docsparser))
+        docsparser.FORMAT_PARSERS["arg"] = docsparser.FormatParser(
+            param_extractor_re=re.compile(
+                r"^:arg (?P<name>\w+): (?P<description>.*)$", re.MULTILINE
+            )
+        )
+        self.addCleanup(docsparser.FORMAT_PARSERS.pop, "arg")
+        self.assertParse(
+            ":arg foo: My custom foo\n",
+            [Param(name="foo", description="My custom foo")],
+        )
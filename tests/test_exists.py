@@ -0,0 +1,76 @@
+import clargs
+import pathlib
+import tempfile
+import typing as t
+import unittest.mock
+from .test_simple import Base
+
+from clargs import exists
+
+
+class TestExistingPathLists(Base):
+    def setUp(self):
+        super().setUp()
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.tempdir = pathlib.Path(tempdir.name)
+        for i in range(10):
+            (self.tempdir / f"file{i}.txt").write_text("")
+        (self.tempdir / "subdir").mkdir()
+
+    def test_list_of_existing_files(self):
+        def function(paths: list[clargs.ExistingFilePath]):
+            pass
+
+        parser = clargs.create_parser(function)
+        paths = [str(self.tempdir / f"file{i}.txt") for i in range(10)]
+        args = parser.parse_args(paths)
+        self.assertEqual(args.paths, [pathlib.Path(p) for p in paths])
+
+    def test_all_failures_in_one_error(self):
+        def function(*, paths: clargs.ListOfAtLeastOne[clargs.ExistingFilePath]):
+            pass
+
+        parser = clargs.create_parser(function)
+        argv = [
+            "--paths",
+            *(str(self.tempdir / f"file{i}.txt") for i in range(10)),
+            str(self.tempdir / "missing.txt"),
+            str(self.tempdir / "subdir"),
+            str(self.tempdir / "missing.txt"),
+        ]
+        with self.assertExit(
+            msg="Problem with validation of 2 value(s): "
+            f"'{self.tempdir / 'missing.txt'}', '{self.tempdir / 'subdir'}'"
+        ):
+            parser.parse_args(argv)
+
+    def test_list_of_existing_directories(self):
+        def function(paths: t.List[clargs.ExistingDirectoryPath]):
+            pass
+
+        parser = clargs.create_parser(function)
+        args = parser.parse_args([str(self.tempdir), str(self.tempdir / "subdir")])
+        self.assertEqual(len(args.paths), 2)
+        with self.assertExit(msg="Problem with validation of 1 value(s)"):
+            parser.parse_args([str(self.tempdir / "file1.txt")])
+
+    def test_streamed_list_validates_per_item(self):
+        def function(paths: clargs.StreamedList[clargs.ExistingFilePath]):
+            pass
+
+        parser = clargs.create_parser(function)
+        with self.assertExit(msg="invalid Path-validation value"):
+            parser.parse_args([str(self.tempdir / "missing.txt")])
+
+    def test_one_scandir_per_directory(self):
+        paths = [self.tempdir / f"file{i}.txt" for i in range(10)]
+        with unittest.mock.patch("os.scandir", wraps=exists.os.scandir) as scandir:
+            with unittest.mock.patch("os.stat", wraps=exists.os.stat) as stat:
+                missing = exists.missing_files(
+                    [*paths, self.tempdir / "missing.txt", *paths]
+                )
+        self.assertEqual(missing, [self.tempdir / "missing.txt"])
+        self.assertEqual(scandir.call_count, 1)
+        # only the path that is not in the listing is checked with a stat
+        self.assertEqual(stat.call_count, 1)
@@ -0,0 +1,245 @@
+import argparse
+import clargs
+import contextlib
+import io
+import random
+import sys
+import typing as t
+import unittest.mock
+from .test_simple import Base
+
+from clargs import fastparse
+from clargs import mapped
+from . import test_simple
+
+
+def outcome(parse: t.Callable[[], t.Any]) -> t.Tuple[str, t.Any, str, str]:
+    """
+    Returns ("result", namespace and extras, stdout, stderr), or ("exit", exit
+    code, stdout, stderr)
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            result = parse()
+        except SystemExit as e:
+            return ("exit", e.code, stdout.getvalue(), stderr.getvalue())
+    return ("result", result, stdout.getvalue(), stderr.getvalue())
+
+
+def comparable(outcome: t.Tuple[str, t.Any, str, str]) -> t.Tuple[str, t.Any, str, str]:
+    kind, value, stdout, stderr = outcome
+    if kind == "result":
+        namespace, extras = value
+        value = (vars(namespace), extras)
+    return (kind, value, stdout, stderr)
+
+
+class DifferentialParser(fastparse.FastArgumentParser):
+    """
+    Parses with argparse and with the fast engine, and fails if the results
+    differ
+    """
+
+    fast_parses = 0
+
+    def parse_known_args(self, args=None, namespace=None):
+        expected = outcome(
+            lambda: argparse.ArgumentParser.parse_known_args(self, args, namespace)
+        )
+        actual = outcome(
+            lambda: super(DifferentialParser, self).parse_known_args(args, namespace)
+        )
+        assert comparable(actual) == comparable(expected), (args, actual, expected)
+        kind, value, stdout, stderr = actual
+        sys.stdout.write(stdout)
+        sys.stderr.write(stderr)
+        if kind == "exit":
+            raise SystemExit(value)
+        return value
+
+    def _fast_parse(self, matched):
+        DifferentialParser.fast_parses += 1
+        return super()._fast_parse(matched)
+
+
+class Differential:
+    """
+    Runs the tests of test_simple with parsers that compare the fast engine
+    with argparse
+    """
+
+    def setUp(self):
+        super().setUp()
+        patcher = unittest.mock.patch.object(
+            clargs.Clargs, "_parser_class", lambda self: DifferentialParser
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestSimpleCasesDifferential(Differential, test_simple.TestSimpleCases):
+    pass
+
+
+class TestBooleansDifferential(Differential, test_simple.TestBooleans):
+    pass
+
+
+class TestFlagsDifferential(Differential, test_simple.TestFlags):
+    pass
+
+
+class TestOptionalDifferential(Differential, test_simple.TestOptional):
+    pass
+
+
+class TestListDifferential(Differential, test_simple.TestList):
+    pass
+
+
+class TestLiteralDifferential(Differential, test_simple.TestLiteral):
+    pass
+
+
+class TestCountDifferential(Differential, test_simple.TestCount):
+    pass
+
+
+class TestSettingsDifferential(Differential, test_simple.TestSettings):
+    pass
+
+
+class TestListOfOneDifferential(Differential, test_simple.TestListOfOne):
+    pass
+
+
+class TestFlagShorteningDifferential(Differential, test_simple.TestFlagShortening):
+    pass
+
+
+class TestRunDifferential(Differential, test_simple.TestRun):
+    pass
+
+
+def function(
+    number: int,
+    word: str,
+    /,
+    *,
+    count: int = 1,
+    values: list[int] = [],
+    flag: clargs.Flag = False,
+    verbose: clargs.Count,
+    level: t.Literal["low", "high"] = "low",
+    ratio: t.Optional[float] = None,
+):
+    pass
+
+
+TOKENS = [
+    "1",
+    "-1",
+    "2.5",
+    "word",
+    "low",
+    "high",
+    "",
+    "-",
+    "--",
+    "--count",
+    "--count=3",
+    "--count=",
+    "--cou",
+    "-c",
+    "--values",
+    "--values=4",
+    "--flag",
+    "--no-flag",
+    "--flag=yes",
+    "--verbose",
+    "-v",
+    "-vv",
+    "--level",
+    "--level=high",
+    "--ratio",
+    "--unknown",
+    "-h",
+]
+
+
+class TestFastEngine(Base):
+    def test_randomized_argv(self):
+        fast = clargs.Clargs(clargs.Settings(engine="fast")).create_parser(function)
+        slow = clargs.create_parser(function)
+        self.assertIsInstance(fast, fastparse.FastArgumentParser)
+        rng = random.Random(0)
+        with unittest.mock.patch.object(
+            fastparse.FastArgumentParser,
+            "_fast_parse",
+            autospec=True,
+            side_effect=fastparse.FastArgumentParser._fast_parse,
+        ) as fast_parse:
+            for _ in range(2000):
+                argv = ["1", "word"] if rng.random() < 0.7 else []
+                argv += rng.choices(TOKENS, k=rng.randrange(8))
+                if rng.random() < 0.2:
+                    rng.shuffle(argv)
+                self.assertEqual(
+                    comparable(outcome(lambda: fast.parse_known_args(argv))),
+                    comparable(outcome(lambda: slow.parse_known_args(argv))),
+                    argv,
+                )
+            fast_parses = fast_parse.call_count
+        # a good part of the cases is parsed by the fast path
+        self.assertGreater(fast_parses, 200)
+
+    def test_fast_path_used(self):
+        DifferentialParser.fast_parses = 0
+        with unittest.mock.patch.object(
+            clargs.Clargs, "_parser_class", lambda self: DifferentialParser
+        ):
+            parser = clargs.create_parser(function)
+        args = parser.parse_args(
+            ["3", "w", "--values", "1", "2", "--verbose", "--verbose", "--count=4"]
+        )
+        self.assertEqual(DifferentialParser.fast_parses, 1)
+        self.assertEqual(args.values, [1, 2])
+        self.assertEqual(args.verbose, 2)
+        self.assertEqual(args.count, 4)
+
+    def test_large_defaults_are_not_copied(self):
+        ids = list(range(500_000))
+
+        def large(*, ids: list[int] = ids, flag: clargs.Flag = False):
+            pass
+
+        parser = clargs.Clargs(clargs.Settings(engine="fast")).create_parser(large)
+        self.assertIs(parser.parse_args(["--flag"]).ids, ids)
+
+    def test_unsupported_parsers_use_argparse(self):
+        parser = fastparse.FastArgumentParser()
+        parser.add_argument("files", nargs="*")
+        with unittest.mock.patch.object(
+            fastparse.FastArgumentParser, "_fast_parse"
+        ) as fast_parse:
+            self.assertEqual(parser.parse_args(["a", "b"]).files, ["a", "b"])
+        fast_parse.assert_not_called()
+
+    def test_types_with_side_effects_use_argparse(self):
+        def mapped_func(data: clargs.MappedFile, *, count: int = 0):
+            pass
+
+        parser = clargs.Clargs(clargs.Settings(engine="fast")).create_parser(
+            mapped_func
+        )
+        with unittest.mock.patch.object(
+            mapped.mmap, "mmap", wraps=mapped.mmap.mmap
+        ) as mmap:
+            # the invalid count would make the fast path fall back to argparse
+            with self.assertExit(msg="invalid int value: 'x'"):
+                parser.parse_args([__file__, "--count", "x"])
+        self.assertEqual(mmap.call_count, 1)
+        parser = fastparse.FastArgumentParser()
+        parser.add_argument("--output", type=argparse.FileType("w"))
+        self.assertIsNone(parser._table())
@@ -0,0 +1,130 @@
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from .test_simple import Base
+
+from clargs import client
+from clargs import daemon
+
+SRC = pathlib.Path(__file__).parent.parent / "src"
+
+COMMANDS = textwrap.dedent(
+    """
+    import os
+    import signal
+    import subprocess
+    import sys
+
+    calls = 0
+
+
+    def count():
+        global calls
+        calls += 1
+        print(calls)
+
+
+    def shell(command: str):
+        subprocess.run(command, shell=True, check=True)
+
+
+    def upper():
+        print(sys.stdin.read().upper(), end="")
+
+
+    def where():
+        print(os.getcwd())
+        print(os.environ.get("CLARGS_TEST_VALUE"))
+
+
+    def fail(code: int):
+        print("failing", file=sys.stderr)
+        sys.exit(code)
+
+
+    def kill():
+        os.kill(os.getpid(), signal.SIGKILL)
+
+
+    def version():
+        print("one")
+    """
+)
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "needs fork and unix sockets")
+class TestForkServer(Base):
+    def setUp(self):
+        super().setUp()
+        self.tempdir = pathlib.Path(tempfile.mkdtemp())
+        self.module = self.tempdir / "forkserver_commands.py"
+        self.module.write_text(COMMANDS)
+        self.socket = self.tempdir / "clargs.sock"
+        code = (
+            "import clargs, forkserver_commands as m; "
+            "clargs.fork_server([m.count, m.shell, m.upper, m.where, m.fail, "
+            f"m.kill, m.version], {str(self.socket)!r})"
+        )
+        env = dict(
+            os.environ, PYTHONPATH=os.pathsep.join([str(SRC), str(self.tempdir)])
+        )
+        self.server = subprocess.Popen([sys.executable, "-c", code], env=env)
+        self.addCleanup(self.server.wait)
+        self.addCleanup(self.server.kill)
+
+    def call(self, *argv, stdin=b""):
+        with tempfile.TemporaryFile() as fin, tempfile.TemporaryFile() as fout:
+            with tempfile.TemporaryFile() as ferr:
+                fin.write(stdin)
+                fin.seek(0)
+                fds = (fin.fileno(), fout.fileno(), ferr.fileno())
+                status = client.call(str(self.socket), argv, fds=fds)
+                fout.seek(0)
+                ferr.seek(0)
+                return status, fout.read().decode(), ferr.read().decode()
+
+    def test_every_command_gets_a_fresh_process(self):
+        self.assertEqual(self.call("count"), (0, "1\n", ""))
+        self.assertEqual(self.call("count"), (0, "1\n", ""))
+
+    def test_stdio_file_descriptors(self):
+        self.assertEqual(self.call("upper", stdin=b"abc\n"), (0, "ABC\n", ""))
+        # output of subprocesses goes to the client's stdout as well
+        self.assertEqual(self.call("shell", "echo hi"), (0, "hi\n", ""))
+
+    def test_exit_status(self):
+        self.assertEqual(self.call("fail", "3"), (3, "", "failing\n"))
+        self.assertEqual(self.call("kill"), (137, "", ""))
+        status, _, stderr = self.call("fail")
+        self.assertEqual(status, 2)
+        self.assertIn("the following arguments are required: code", stderr)
+
+    def test_cwd_and_environment(self):
+        os.environ["CLARGS_TEST_VALUE"] = "from client"
+        self.addCleanup(os.environ.pop, "CLARGS_TEST_VALUE")
+        cwd = os.getcwd()
+        os.chdir(self.tempdir)
+        self.addCleanup(os.chdir, cwd)
+        self.assertEqual(
+            self.call("where"),
+            (0, f"{os.path.realpath(self.tempdir)}\nfrom client\n", ""),
+        )
+
+    def test_restart_on_source_change(self):
+        self.assertEqual(self.call("version"), (0, "one\n", ""))
+        self.module.write_text(COMMANDS.replace('"one"', '"two!"'))
+        # sources are checked at most once per IDLE_TIMEOUT
+        time.sleep(daemon.IDLE_TIMEOUT * 1.2)
+        self.assertEqual(self.call("version"), (0, "two!\n", ""))
+
+    def test_silent_client_does_not_block(self):
+        self.assertEqual(self.call("count"), (0, "1\n", ""))
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as silent:
+            silent.connect(str(self.socket))
+            self.assertEqual(self.call("count"), (0, "1\n", ""))
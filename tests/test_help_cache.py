@@ -0,0 +1,92 @@
+import clargs
+import contextlib
+import io
+import os
+import pathlib
+import tempfile
+import unittest.mock
+from clargs import help_cache
+from .test_simple import Base
+
+
+def helped_func(foo: str, *, number: int = 3, flag: clargs.Flag = False):
+    """
+    A function with help
+
+    :param foo: The foo
+    :param number: A number
+    """
+    return (foo, number, flag)
+
+
+def other_func(foo: str):
+    """
+    Another function
+    """
+    return foo
+
+
+class TestHelpCache(Base):
+    def setUp(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.cache_dir = pathlib.Path(tempdir.name)
+        self.clargs = clargs.Clargs(clargs.Settings(help_cache_dir=self.cache_dir))
+
+    def run_help(self, clargs_obj, func, args):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout), self.assertRaises(SystemExit) as cm:
+            clargs_obj.create_parser_and_run(func, args)
+        self.assertEqual(cm.exception.code, 0)
+        return stdout.getvalue()
+
+    def test_cache_hit_skips_parser(self):
+        text = self.run_help(self.clargs, helped_func, ["--help"])
+        self.assertIn("The foo", text)
+        self.assertEqual(len(list(self.cache_dir.glob("*.help"))), 1)
+        with unittest.mock.patch.object(
+            clargs.Clargs,
+            "create_parser",
+            side_effect=AssertionError("should not be called"),
+        ):
+            self.assertEqual(self.run_help(self.clargs, helped_func, ["--help"]), text)
+
+    def test_same_output_as_without_cache(self):
+        for args in [["-h"], ["bar", "-h"], ["--number", "4", "--help", "junk"]]:
+            with self.subTest(args=args):
+                expected = self.run_help(clargs.Clargs(), helped_func, args)
+                for _ in range(2):
+                    self.assertEqual(
+                        self.run_help(self.clargs, helped_func, args), expected
+                    )
+
+    def test_key(self):
+        def key(func, argv, prefix_chars="-"):
+            return help_cache.help_key(func, clargs.Settings(), argv, prefix_chars)
+
+        help_key = key(helped_func, ["-h"])
+        self.assertIsNotNone(help_key)
+        self.assertEqual(key(helped_func, ["--help"]), help_key)
+        self.assertNotIn(key(helped_func, ["bar", "-h"]), (None, help_key))
+        self.assertNotIn(key(other_func, ["-h"]), (None, help_key))
+        for argv in [[], ["bar"], ["--he"], ["--", "-h"]]:
+            self.assertIsNone(key(helped_func, argv))
+        self.assertIsNone(key(helped_func, ["-h"], "+"))
+        self.assertIsNotNone(key(helped_func, ["++help"], "+"))
+        with unittest.mock.patch(
+            "shutil.get_terminal_size", return_value=os.terminal_size((40, 24))
+        ):
+            self.assertNotIn(key(helped_func, ["-h"]), (None, help_key))
+
+    def test_errors_are_not_cached(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertExit(msg="invalid int value: 'x'"):
+                self.clargs.create_parser_and_run(helped_func, ["-n", "x", "-h"])
+        self.assertEqual(list(self.cache_dir.glob("*.help")), [])
+
+    def test_no_help(self):
+        self.assertEqual(
+            self.clargs.create_parser_and_run(helped_func, ["bar", "--flag"]),
+            ("bar", 3, True),
+        )
+        self.assertEqual(list(self.cache_dir.glob("*.help")), [])
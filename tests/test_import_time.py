@@ -0,0 +1,70 @@
+import subprocess
+import sys
+from .test_simple import Base
+
+import clargs
+
+# budgets for the import time of the package's own modules, relative to the
+# (cumulative) import time of argparse in the same interpreter, so that they
+# hold on slow or busy machines too
+IMPORT_CLARGS_BUDGET = 1.0
+FULL_IMPORT_BUDGET = 10.0
+
+
+def own_import_times(code: str) -> dict[str, int]:
+    """
+    Runs code (and `import argparse`) in a fresh interpreter, returns the self
+    import time (in microseconds) of every clargs module that it imported, and
+    the cumulative import time of argparse as "argparse"
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{code}; import argparse"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) != 3 or not parts[0].startswith("import time:"):
+            continue
+        module = parts[2]
+        if module == "clargs" or module.startswith("clargs."):
+            times[module] = int(parts[0].removeprefix("import time:"))
+        elif module == "argparse":
+            times[module] = int(parts[1])
+    return times
+
+
+class TestImportTime(Base):
+    def test_import_clargs_imports_nothing_else(self):
+        times = own_import_times("import clargs")
+        self.assertEqual(list(times), ["clargs", "argparse"])
+        self.assertLess(times["clargs"], IMPORT_CLARGS_BUDGET * times["argparse"])
+
+    def test_full_import_budget(self):
+        # argparse is imported first here, so that it's measured on its own
+        times = own_import_times(
+            "import argparse, clargs; [getattr(clargs, n) for n in clargs.__all__]"
+        )
+        for name in clargs.__all__:
+            module = f"clargs.{clargs._EXPORTS[name]}"
+            self.assertIn(module, times)
+        argparse_time = times.pop("argparse")
+        self.assertLess(sum(times.values()), FULL_IMPORT_BUDGET * argparse_time, times)
+
+    def test_docsparser_compiles_regexes_on_first_use(self):
+        code = (
+            "import clargs.docsparser as d; "
+            "assert d._format_parsers.cache_info().currsize == 0"
+        )
+        own_import_times(code)
+
+    def test_lazy_attributes(self):
+        self.assertIs(clargs.Clargs, clargs.clargs.Clargs)
+        self.assertIn("Flag", dir(clargs))
+        self.assertNotIn("TYPE_CHECKING", dir(clargs))
+        self.assertEqual(sorted(clargs.__all__), sorted(clargs._EXPORTS))
+        with self.assertRaises(AttributeError):
+            clargs.does_not_exist
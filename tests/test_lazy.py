@@ -0,0 +1,120 @@
+import argparse
+import clargs
+import contextlib
+import io
+import pathlib
+import sys
+import tempfile
+import textwrap
+from .test_simple import Base
+
+MODULE_SOURCE = textwrap.dedent(
+    '''\
+    def heavy_command(number: int, *, times: int = 2):
+        """
+        Multiplies things
+
+        :param number: The number to multiply
+        """
+        return number * times
+    '''
+)
+
+
+class TestLazySubparsers(Base):
+    def setUp(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        pathlib.Path(tempdir.name, "clargs_lazy_target.py").write_text(MODULE_SOURCE)
+        sys.path.insert(0, tempdir.name)
+        self.addCleanup(sys.path.remove, tempdir.name)
+        self.addCleanup(sys.modules.pop, "clargs_lazy_target", None)
+
+    def create_parser(self):
+        def small_command(word: str):
+            return word
+
+        parser = argparse.ArgumentParser(prog="mytool")
+        subparsers = parser.add_subparsers(
+            required=True, action=clargs.LazySubParsersAction
+        )
+        clargs.add_subparser(subparsers, small_command)
+        clargs.add_lazy_subparser(
+            subparsers, "clargs_lazy_target:heavy_command", "Multiplies things"
+        )
+        return parser
+
+    def test_not_imported_unless_chosen(self):
+        parser = self.create_parser()
+        self.assertEqual(clargs.run(parser.parse_args(["small-command", "hi"])), "hi")
+        capture = io.StringIO()
+        with self.assertRaises(SystemExit), contextlib.redirect_stdout(capture):
+            parser.parse_args(["--help"])
+        self.assertIn("heavy-command", capture.getvalue())
+        self.assertIn("Multiplies things", capture.getvalue())
+        self.assertNotIn("clargs_lazy_target", sys.modules)
+
+        args = parser.parse_args(["heavy-command", "3", "--times", "5"])
+        self.assertIn("clargs_lazy_target", sys.modules)
+        self.assertEqual(clargs.run(args), 15)
+
+    def test_subcommand_help(self):
+        parser = self.create_parser()
+        capture = io.StringIO()
+        with self.assertRaises(SystemExit), contextlib.redirect_stdout(capture):
+            parser.parse_args(["heavy-command", "--help"])
+        self.assertIn("The number to multiply", capture.getvalue())
+
+    def test_needs_lazy_action(self):
+        parser = argparse.ArgumentParser()
+        subparsers = parser.add_subparsers()
+        with self.assertRaises(TypeError):
+            clargs.add_lazy_subparser(subparsers, "clargs_lazy_target:heavy_command")
+
+    def test_bad_target(self):
+        parser = argparse.ArgumentParser()
+        subparsers = parser.add_subparsers(action=clargs.LazySubParsersAction)
+        with self.assertRaisesRegex(ValueError, "module:function"):
+            clargs.add_lazy_subparser(subparsers, "clargs_lazy_target.heavy_command")
+
+    def test_add_subparser_populates_on_selection(self):
+        def first(number: int):
+            """First command"""
+            return number
+
+        def second(word: str):
+            """Second command"""
+            return word
+
+        tracer = clargs.FlameTracer()
+        clargs_obj = clargs.Clargs(clargs.Settings(tracer=tracer))
+        parser = argparse.ArgumentParser(prog="mytool")
+        subparsers = parser.add_subparsers(
+            required=True, action=clargs.LazySubParsersAction
+        )
+        clargs_obj.add_subparser(subparsers, first)
+        clargs_obj.add_subparser(subparsers, second)
+
+        capture = io.StringIO()
+        with self.assertRaises(SystemExit), contextlib.redirect_stdout(capture):
+            parser.parse_args(["--help"])
+        self.assertIn("{first,second}", capture.getvalue())
+        self.assertIn("First command", capture.getvalue())
+        self.assertIn("Second command", capture.getvalue())
+        self.assertNotIn(("add_to_parser",), tracer.stacks())
+
+        self.assertEqual(clargs.run(parser.parse_args(["second", "hi"])), "hi")
+        self.assertEqual(clargs.run(parser.parse_args(["second", "ho"])), "ho")
+        self.assertEqual(tracer.stacks()[("add_to_parser",)][1], 1)
+        self.assertEqual(clargs.run(parser.parse_args(["first", "3"])), 3)
+        self.assertEqual(tracer.stacks()[("add_to_parser",)][1], 2)
+
+    def test_unknown_and_conflicting_commands(self):
+        parser = self.create_parser()
+        capture = io.StringIO()
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(capture):
+            parser.parse_args(["other-command"])
+        self.assertIn("invalid choice: 'other-command'", capture.getvalue())
+        subparsers = parser._subparsers._group_actions[0]
+        with self.assertRaisesRegex(argparse.ArgumentError, "conflicting"):
+            clargs.add_lazy_subparser(subparsers, "clargs_lazy_target:heavy_command")
@@ -0,0 +1,120 @@
+import argparse
+import clargs
+import contextlib
+import io
+import pathlib
+import pickle
+import tempfile
+import typing as t
+import unittest.mock
+from clargs import bench
+from clargs import docsparser
+from clargs import lazyhelp
+from .test_simple import Base
+
+LAZY = clargs.Clargs(clargs.Settings(lazy_help=True))
+
+
+def percent_func(*, rate: int = 5, name: t.Literal["a", "b"] = "a"):
+    """
+    A function with %(prog)s in its description
+
+    :param rate: The rate in %%, default %(default)s
+    :param name: The name
+    """
+    return rate, name
+
+
+def undocumented_func(foo: str, *, bar: int = 1):
+    return foo, bar
+
+
+class TestLazyHelp(Base):
+    def setUp(self):
+        lazyhelp._parameter_descriptions.cache_clear()
+
+    def test_same_help(self):
+        functions = [percent_func, undocumented_func] + [
+            bench.synthetic_function(f"func_{style}", 24, style)[0]
+            for style in bench.STYLES
+        ]
+        for func in functions:
+            with self.subTest(func=func.__name__):
+                self.assertEqual(
+                    LAZY.create_parser(func).format_help(),
+                    clargs.create_parser(func).format_help(),
+                )
+                formatted = []
+                for clargs_obj in [LAZY, clargs.Clargs()]:
+                    parser = argparse.ArgumentParser(
+                        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+                    )
+                    clargs_obj.add_to_parser(parser, func)
+                    formatted.append(parser.format_help())
+                self.assertEqual(*formatted)
+
+    def test_same_subcommand_help(self):
+        for action in [None, clargs.LazySubParsersAction]:
+            formatted = []
+            for clargs_obj in [LAZY, clargs.Clargs()]:
+                parser = argparse.ArgumentParser()
+                subparsers = parser.add_subparsers(
+                    **({"action": action} if action else {})
+                )
+                clargs_obj.add_subparser(subparsers, percent_func)
+                clargs_obj.add_subparser(subparsers, undocumented_func)
+                formatted.append(parser.format_help())
+                with contextlib.redirect_stdout(io.StringIO()) as stdout:
+                    with self.assertRaises(SystemExit):
+                        parser.parse_args(["percent-func", "--help"])
+                formatted.append(stdout.getvalue())
+            self.assertEqual(formatted[:2], formatted[2:])
+            self.assertIn("The rate in %, default 5", formatted[1])
+
+    def test_docstring_not_parsed(self):
+        with unittest.mock.patch.object(
+            docsparser,
+            "get_parameter_info_from_docstring",
+            side_effect=AssertionError("should not be called"),
+        ):
+            parser = LAZY.create_parser(percent_func)
+            args = parser.parse_args(["--rate", "7"])
+            self.assertEqual(clargs.run(args), (7, "a"))
+            with self.assertExit(msg="invalid choice: 'c'"):
+                parser.parse_args(["--name", "c"])
+        self.assertIn("The rate in %, default 5", parser.format_help())
+
+    def test_lazy_help(self):
+        calls = []
+
+        def compute(text):
+            calls.append(text)
+            return text
+
+        help = lazyhelp.LazyHelp(compute, "  Some help  ")
+        self.assertEqual(calls, [])
+        self.assertEqual(help.strip(), "Some help")
+        self.assertEqual(help + "!", "  Some help  !")
+        self.assertEqual("%" + help, "%  Some help  ")
+        self.assertTrue(help)
+        self.assertIn("help", help)
+        self.assertEqual(help, "  Some help  ")
+        self.assertEqual(repr(help), repr("  Some help  "))
+        self.assertEqual(calls, ["  Some help  "])
+        empty = lazyhelp.LazyHelp(lambda: None)
+        self.assertFalse(empty)
+        self.assertEqual(str(empty), "")
+        self.assertIsNone(empty.resolve())
+
+    def test_spec_cache(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            clargs_obj = clargs.Clargs(
+                clargs.Settings(lazy_help=True, spec_cache_dir=pathlib.Path(tempdir))
+            )
+            expected = clargs.create_parser(percent_func).format_help()
+            for _ in range(2):
+                parser = clargs_obj.create_parser(percent_func)
+                self.assertEqual(parser.format_help(), expected)
+            self.assertEqual(len(list(pathlib.Path(tempdir).glob("*.pickle"))), 1)
+        help = lazyhelp.LazyHelp(lazyhelp.parameter_help, "@param a: b", "a")
+        self.assertEqual(pickle.loads(pickle.dumps(help)), "b")
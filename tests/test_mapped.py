@@ -0,0 +1,81 @@
+import clargs
+import io
+import pathlib
+import tempfile
+import typing as t
+import unittest.mock
+from clargs import mapped
+from .test_simple import Base
+
+
+class TestMappedFile(Base):
+    def setUp(self):
+        super().setUp()
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.tempdir = pathlib.Path(tempdir.name)
+
+    def test_mapped_and_closed_after_run(self):
+        views = []
+
+        def function(data: clargs.MappedFile):
+            views.append(data)
+            return data.readonly, bytes(data[:5]), len(data)
+
+        path = self.tempdir / "data.bin"
+        path.write_bytes(b"hello world")
+        parser = clargs.create_parser(function)
+        result = clargs.run(parser.parse_args([str(path)]))
+        self.assertEqual(result, (True, b"hello", 11))
+        with self.assertRaises(ValueError):
+            # released
+            views[0].tobytes()
+
+    def test_list_closed_after_run(self):
+        views = []
+
+        def function(
+            data: t.Annotated[
+                memoryview, clargs.extra_info(type=mapped.map_file, nargs="+")
+            ],
+        ):
+            views.extend(data)
+            return [bytes(view) for view in data]
+
+        paths = [self.tempdir / "a.bin", self.tempdir / "b.bin"]
+        for path in paths:
+            path.write_bytes(path.name.encode())
+        parser = clargs.create_parser(function)
+        result = clargs.run(parser.parse_args([str(path) for path in paths]))
+        self.assertEqual(result, [b"a.bin", b"b.bin"])
+        for view in views:
+            with self.assertRaises(ValueError):
+                view.tobytes()
+
+    def test_empty_file(self):
+        def function(data: clargs.MappedFile):
+            return bytes(data)
+
+        path = self.tempdir / "empty.bin"
+        path.write_bytes(b"")
+        parser = clargs.create_parser(function)
+        self.assertEqual(clargs.run(parser.parse_args([str(path)])), b"")
+
+    def test_stdin(self):
+        def function(data: clargs.MappedFile):
+            return bytes(data)
+
+        stdin = unittest.mock.Mock(buffer=io.BytesIO(b"from stdin"))
+        parser = clargs.create_parser(function)
+        with unittest.mock.patch("sys.stdin", stdin):
+            self.assertEqual(clargs.run(parser.parse_args(["-"])), b"from stdin")
+
+    def test_not_a_file(self):
+        def function(data: clargs.MappedFile):
+            pass
+
+        parser = clargs.create_parser(function)
+        with self.assertExit(msg="is not an existing file"):
+            parser.parse_args([str(self.tempdir / "missing.bin")])
+        with self.assertExit(msg="is not an existing file"):
+            parser.parse_args([str(self.tempdir)])
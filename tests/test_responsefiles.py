@@ -0,0 +1,118 @@
+import argparse
+import clargs
+import pathlib
+import random
+import shlex
+import tempfile
+import typing as t
+import unittest.mock
+from clargs import responsefiles
+from .test_simple import Base
+
+
+def files_func(names: t.List[str], *, count: int = 0):
+    return names, count
+
+
+def other_func(name: str):
+    return name
+
+
+class TestResponseFiles(Base):
+    def setUp(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.dir = pathlib.Path(tempdir.name)
+
+    def write(self, content: t.Union[str, bytes], name: str = "args.txt") -> str:
+        path = self.dir / name
+        if isinstance(content, str):
+            path.write_text(content)
+        else:
+            path.write_bytes(content)
+        return str(path)
+
+    def test_shell_quoted(self):
+        content = (
+            "a 'b c' \"d \\\"e\\\" \\n\"\n  f\\ g\th''\n"
+            "\"multi\nline\" # not-a-comment ''\n"
+        )
+        path = self.write(content)
+        self.assertEqual(responsefiles.read_response_file(path), shlex.split(content))
+
+    def test_nul_delimited(self):
+        path = self.write(b"a b\0'c'\0\0d\ne\0")
+        self.assertEqual(
+            responsefiles.read_response_file(path), ["a b", "'c'", "", "d\ne"]
+        )
+        path = self.write(b"x\0y")
+        self.assertEqual(responsefiles.read_response_file(path), ["x", "y"])
+
+    def test_chunk_boundaries(self):
+        rng = random.Random(4)
+        alphabet = "ab \n'\"\\\u20ac"
+        tested = 0
+        while tested < 300:
+            content = "".join(rng.choice(alphabet) for _ in range(rng.randrange(20)))
+            try:
+                expected = shlex.split(content)
+            except ValueError:
+                continue
+            tested += 1
+            path = self.write(content)
+            for chunk_size in [1, 2, 5]:
+                with unittest.mock.patch.object(
+                    responsefiles, "CHUNK_SIZE", chunk_size
+                ):
+                    self.assertEqual(
+                        responsefiles.read_response_file(path), expected, content
+                    )
+        # the format is decided on the first chunk
+        with unittest.mock.patch.object(responsefiles, "CHUNK_SIZE", 5):
+            path = self.write(b"abcd\0efgh\0\0ij")
+            self.assertEqual(
+                responsefiles.read_response_file(path), ["abcd", "efgh", "", "ij"]
+            )
+
+    def test_run(self):
+        path = self.write("x 'y z'\n@not-expanded\n--count 3")
+        for engine in ["argparse", "fast"]:
+            with self.subTest(engine=engine):
+                clargs_obj = clargs.Clargs(
+                    clargs.Settings(response_file_prefix="@", engine=engine)
+                )
+                self.assertEqual(
+                    clargs_obj.create_parser_and_run(files_func, ["w", "@" + path]),
+                    (["w", "x", "y z", "@not-expanded"], 3),
+                )
+                self.assertEqual(
+                    clargs_obj.create_parser_and_run(files_func, ["@", "-c1"]),
+                    (["@"], 1),
+                )
+
+    def test_subcommands(self):
+        parser = responsefiles.parser_class(argparse.ArgumentParser)(
+            response_file_prefix="+"
+        )
+        subparsers = parser.add_subparsers(required=True)
+        for func in [files_func, other_func]:
+            clargs.add_subparser(subparsers, func)
+        path = self.write("other-func +name")
+        self.assertEqual(clargs.run(parser.parse_args(["+" + path])), "+name")
+
+    def test_no_prefix(self):
+        self.assertEqual(
+            clargs.create_parser_and_run(files_func, ["@args.txt"]),
+            (["@args.txt"], 0),
+        )
+
+    def test_errors(self):
+        clargs_obj = clargs.Clargs(clargs.Settings(response_file_prefix="@"))
+        with self.assertExit(msg="No such file or directory"):
+            clargs_obj.create_parser_and_run(files_func, ["@" + str(self.dir / "x")])
+        for content in ["a 'b", 'a "b\\"', "a\\"]:
+            with self.subTest(content=content):
+                with self.assertExit(msg="error: No "):
+                    clargs_obj.create_parser_and_run(
+                        files_func, ["@" + self.write(content)]
+                    )
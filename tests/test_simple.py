@@ -708,3 +708,71 @@ class TestFlagShortening(Base):
         self.assertEqual(
             vars(args), {"_clargs_func_": function, "flag1": 1, "flag2": 3}
         )
+
+
+class TestLargeValues(Base):
+    def test_large_values_are_not_copied(self):
+        ids = list(range(500_000))
+        choices = tuple(str(i) for i in range(100_000))
+
+        def function(
+            *,
+            ids: list[int] = ids,
+            name: t.Annotated[str, clargs.extra_info(choices=choices)] = "1",
+        ):
+            pass
+
+        parser = clargs.create_parser(function)
+        actions = {action.dest: action for action in parser._actions}
+        self.assertIs(actions["ids"].default, ids)
+        self.assertIs(actions["name"].choices, choices)
+        args = parser.parse_args([])
+        self.assertIs(args.ids, ids)
+
+
+class TestRun(Base):
+    def test_run_does_not_inspect(self):
+        import unittest.mock
+
+        def function(a: int, /, b: int, *, c: int):
+            return (a, b, c)
+
+        parser = clargs.create_parser(function)
+        args = parser.parse_args(["1", "2", "--c", "3"])
+        with unittest.mock.patch(
+            "inspect.signature", side_effect=AssertionError("should not be called")
+        ):
+            self.assertEqual(clargs.run(args), (1, 2, 3))
+
+    def test_custom_name(self):
+        def function(*, number: t.Annotated[int, clargs.extra_info(name="--nr")]):
+            return number
+
+        parser = clargs.create_parser(function)
+        args = parser.parse_args(["--nr", "3"])
+        self.assertEqual(vars(args), {"_clargs_func_": function, "nr": 3})
+        self.assertEqual(clargs.run(args), 3)
+
+    def test_namespace_from_elsewhere(self):
+        import argparse
+
+        def function(a: int, /, *, b: int):
+            return (a, b)
+
+        clargs.create_parser(function)
+        args = argparse.Namespace(_clargs_func_=function, a=1, b=2)
+        self.assertEqual(clargs.run(args), (1, 2))
+
+    def test_other_values_are_passed(self):
+        import argparse
+
+        def function(a: int, /, *, b: int = 2):
+            return (a, b)
+
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--verbose", action="store_true")
+        clargs.add_subparser(parser.add_subparsers(), function)
+        args = parser.parse_args(["--verbose", "function", "1"])
+        self.assertEqual(
+            clargs.Clargs.bind(args), (function, [1], {"b": 2, "verbose": True})
+        )
@@ -0,0 +1,83 @@
+import clargs
+import pathlib
+import tempfile
+import typing as t
+import unittest.mock
+from clargs import aap_from_data
+from .test_simple import Base
+
+
+def cached_func(
+    foo: str,
+    *,
+    number: int = 3,
+    path: clargs.ExistingDirectoryPath = pathlib.Path("/"),
+    flag: clargs.Flag = False,
+):
+    """
+    A function to cache
+
+    :param foo: The foo
+    :param number: A number
+    """
+    return (foo, number, path, flag)
+
+
+def lambda_func(*, number: t.Annotated[int, clargs.extra_info(validate=lambda n: n)]):
+    return number
+
+
+class TestSpecCache(Base):
+    def setUp(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.cache_dir = pathlib.Path(tempdir.name)
+        self.clargs = clargs.Clargs(clargs.Settings(spec_cache_dir=self.cache_dir))
+
+    def test_cache_hit_skips_introspection(self):
+        parser = self.clargs.create_parser(cached_func)
+        self.assertEqual(len(list(self.cache_dir.glob("*.pickle"))), 1)
+        expected = vars(parser.parse_args(["bar", "-n", "5", "--flag"]))
+
+        with unittest.mock.patch.object(
+            aap_from_data.AapFromData,
+            "from_param_and_settings",
+            side_effect=AssertionError("should not be called"),
+        ):
+            parser = self.clargs.create_parser(cached_func)
+        args = parser.parse_args(["bar", "-n", "5", "--flag"])
+        self.assertEqual(vars(args), expected)
+        self.assertEqual(clargs.run(args), ("bar", 5, pathlib.Path("/"), True))
+        self.assertIn("The foo", parser.format_help())
+
+    def test_settings_change_fingerprint(self):
+        self.clargs.create_parser(cached_func)
+        clargs.Clargs(
+            clargs.Settings(spec_cache_dir=self.cache_dir, generate_short_flags=False)
+        ).create_parser(cached_func)
+        self.assertEqual(len(list(self.cache_dir.glob("*.pickle"))), 2)
+
+    def test_unpicklable_specs_are_not_cached(self):
+        parser = self.clargs.create_parser(lambda_func)
+        self.assertEqual(list(self.cache_dir.glob("*.pickle")), [])
+        self.assertEqual(clargs.run(parser.parse_args(["--number", "3"])), 3)
+
+    def test_broken_cache_file_is_ignored(self):
+        self.clargs.create_parser(cached_func)
+        (cache_file,) = self.cache_dir.glob("*.pickle")
+        cache_file.write_bytes(b"garbage")
+        parser = self.clargs.create_parser(cached_func)
+        self.assertEqual(clargs.run(parser.parse_args(["bar"]))[0], "bar")
+
+    def test_writable_by_others_is_ignored(self):
+        self.clargs.create_parser(cached_func)
+        (cache_file,) = self.cache_dir.glob("*.pickle")
+        cache_file.chmod(0o666)
+        with unittest.mock.patch.object(
+            aap_from_data.AapFromData,
+            "from_param_and_settings",
+            wraps=aap_from_data.AapFromData.from_param_and_settings,
+        ) as from_param:
+            with self.assertLogs("clargs", "WARNING"):
+                self.clargs.create_parser(cached_func)
+        self.assertTrue(from_param.called)
@@ -0,0 +1,96 @@
+import clargs
+import collections.abc
+import io
+import os
+import pathlib
+import tempfile
+import typing as t
+import unittest.mock
+from .test_simple import Base
+
+
+class TestStreamedList(Base):
+    def setUp(self):
+        super().setUp()
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.tempdir = pathlib.Path(tempdir.name)
+
+    def write(self, name: str, content: str) -> str:
+        (self.tempdir / name).write_text(content)
+        return f"@{self.tempdir / name}"
+
+    def test_from_file_and_argv(self):
+        def function(*, ids: clargs.StreamedList[int]):
+            pass
+
+        parser = clargs.create_parser(function)
+        lines = self.write("ids.txt", "1\n2\r\n\n3")
+        args = parser.parse_args(["--ids", "0", lines, "--ids", "4"])
+        self.assertEqual(
+            vars(args),
+            {"_clargs_func_": function, "ids": [0, 1, 2, 3, 4]},
+        )
+        nul = self.write("ids.nul", "5\0006\0")
+        args = parser.parse_args(["--ids", nul])
+        self.assertEqual(args.ids, [5, 6])
+
+    def test_decoded_like_argv(self):
+        def function(*, names: clargs.StreamedList[str]):
+            pass
+
+        parser = clargs.create_parser(function)
+        path = self.tempdir / "names.txt"
+        path.write_bytes("caf\u00e9\n".encode() + b"\xff\n")
+        args = parser.parse_args(["--names", f"@{path}"])
+        self.assertEqual(args.names, ["caf\u00e9", os.fsdecode(b"\xff")])
+
+    def test_from_stdin(self):
+        def function(names: t.Annotated[list[str], clargs.extra_info(stream=True)]):
+            pass
+
+        parser = clargs.create_parser(function)
+        with unittest.mock.patch("sys.stdin", io.StringIO("a b\nc\n")):
+            args = parser.parse_args(["-"])
+        self.assertEqual(args.names, ["a b", "c"])
+
+    def test_errors(self):
+        def function(*, ids: clargs.StreamedList[t.Literal[1, 2]]):
+            pass
+
+        parser = clargs.create_parser(function)
+        lines = self.write("ids.txt", "1\n3\n")
+        with self.assertExit(msg="ids.txt, item 2) (choose from 1, 2)"):
+            parser.parse_args(["--ids", lines])
+        with self.assertExit(msg="invalid int value: 'x'"):
+            parser.parse_args(["--ids", "x"])
+        with self.assertExit(msg="can't open"):
+            parser.parse_args(["--ids", f"@{self.tempdir / 'missing.txt'}"])
+
+
+class TestIterator(Base):
+    def test_lazy(self):
+        def function(ids: t.Iterator[int]):
+            return next(ids), next(ids), list(ids)
+
+        parser = clargs.create_parser(function)
+        stdin = io.StringIO("2\n3\n")
+        with unittest.mock.patch("sys.stdin", stdin):
+            args = parser.parse_args(["1", "-"])
+            self.assertIsInstance(args.ids, collections.abc.Iterator)
+            # nothing is read while parsing
+            self.assertEqual(stdin.tell(), 0)
+            self.assertEqual(clargs.run(args), (1, 2, [3]))
+
+    def test_iterable_error_during_iteration(self):
+        def function(ids: t.Iterable[int]):
+            return sum(ids)
+
+        parser = clargs.create_parser(function)
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = pathlib.Path(tempdir) / "ids.txt"
+            path.write_text("1\n2\n")
+            self.assertEqual(clargs.run(parser.parse_args([f"@{path}", "3"])), 6)
+            path.write_text("1\ntwo\n")
+            with self.assertRaisesRegex(ValueError, "invalid int value: 'two'"):
+                clargs.run(parser.parse_args([f"@{path}"]))
@@ -0,0 +1,88 @@
+import clargs
+import io
+import logging
+import typing as t
+import unittest.mock
+from .test_simple import Base
+
+
+def function(
+    count: int,
+    *,
+    names: list[str],
+    level: t.Annotated[int, clargs.extra_info(validate=lambda x: x > 0)] = 1,
+):
+    """
+    Does something
+
+    :param count: How often
+    """
+    return count
+
+
+class TestTracing(Base):
+    def test_phases(self):
+        tracer = clargs.FlameTracer()
+        settings = clargs.Settings(tracer=tracer)
+        result = clargs.Clargs(settings).create_parser_and_run(
+            function, ["3", "--names", "a", "b", "--level", "2"]
+        )
+        self.assertEqual(result, 3)
+        stacks = tracer.stacks()
+        builder = ("create_parser", "add_to_parser", "get_argument_specs")
+        self.assertIn((*builder, "signature"), stacks)
+        self.assertIn((*builder, "docstring"), stacks)
+        self.assertEqual(stacks[(*builder, "resolve_type (handle_simple_type)")][1], 2)
+        self.assertEqual(stacks[(*builder, "resolve_type (handle_list)")][1], 1)
+        self.assertEqual(stacks[(*builder[:2], "add_argument")][1], 3)
+        self.assertEqual(stacks[("parse_args", "validate")][1], 1)
+        self.assertIn(("run", "call"), stacks)
+
+        [parse] = [span for span in tracer.spans if span.name == "parse_args"]
+        self.assertEqual(parse.attributes, {"tokens": 6})
+        [call] = [span for span in tracer.spans if span.name == "call"]
+        self.assertEqual(call.attributes, {"function": "function"})
+
+        summary = tracer.summary()
+        self.assertTrue(summary.startswith("create_parser "))
+        self.assertIn("\n  add_to_parser ", summary)
+        self.assertIn("create_parser;add_to_parser;add_argument ", tracer.folded())
+
+    def test_subparsers(self):
+        tracer = clargs.FlameTracer()
+        clargs_obj = clargs.Clargs(clargs.Settings(tracer=tracer))
+        parser = clargs_obj.create_parser(lambda: None)
+        clargs_obj.add_subparser(parser.add_subparsers(), function)
+        self.assertIn(("add_subparser", "add_to_parser"), tracer.stacks())
+        [span] = [span for span in tracer.spans if span.name == "add_subparser"]
+        self.assertEqual(span.attributes, {"command": "function"})
+
+    def test_tracer_does_not_change_fingerprint(self):
+        settings = clargs.Settings(tracer=clargs.FlameTracer())
+        self.assertEqual(settings, clargs.Settings())
+
+    def test_debug_log_only_formatted_when_enabled(self):
+        aap = clargs.AddArgumentParameters(type=int)
+        with unittest.mock.patch.object(
+            clargs.AddArgumentParameters, "asdict", autospec=True, return_value={}
+        ) as asdict, unittest.mock.patch.object(
+            clargs.Clargs,
+            "get_argument_specs",
+            return_value=[
+                clargs.ArgumentSpec(param_name="a", param_kind=1, names=["a"], aap=aap)
+            ],
+        ):
+            clargs.create_parser(function)
+            self.assertEqual(asdict.call_count, 1)
+            logger = logging.getLogger("clargs")
+            stream = io.StringIO()
+            handler = logging.StreamHandler(stream)
+            logger.addHandler(handler)
+            logger.setLevel(logging.DEBUG)
+            try:
+                clargs.create_parser(function)
+            finally:
+                logger.removeHandler(handler)
+                logger.setLevel(logging.NOTSET)
+            self.assertEqual(asdict.call_count, 3)
+            self.assertEqual(stream.getvalue(), "Adding (['a'], {})\n")
@@ -0,0 +1,74 @@
+import clargs
+import typing as t
+from .test_simple import Base
+
+from clargs import aap_from_data
+
+
+class TestTypeCache(Base):
+    def setUp(self):
+        super().setUp()
+        aap_from_data.resolve_type.cache_clear()
+
+    def test_same_type_resolved_once(self):
+        def first(*, paths: list[clargs.ExistingFilePath], flag: clargs.Flag = False):
+            pass
+
+        def second(*, files: list[clargs.ExistingFilePath], count: clargs.Count):
+            """
+            :param files: The files
+            """
+
+        first_parser = clargs.create_parser(first)
+        second_parser = clargs.create_parser(second)
+        info = aap_from_data.resolve_type.cache_info()
+        self.assertEqual((info.misses, info.hits), (3, 1))
+
+        # the per-parameter parts are not shared
+        [files] = [a for a in second_parser._actions if a.dest == "files"]
+        [paths] = [a for a in first_parser._actions if a.dest == "paths"]
+        self.assertEqual(files.help, "The files")
+        self.assertIsNone(paths.help)
+        self.assertEqual(files.option_strings, ["--files", "-f"])
+
+    def test_errors_name_the_parameter(self):
+        def first(*, one: t.Literal[1, "a"]):
+            pass
+
+        def second(*, two: t.Literal[1, "a"]):
+            pass
+
+        for function, name in [(first, "one"), (second, "two")]:
+            with self.assertRaisesRegex(
+                clargs.GetArgsFromTypeException, f"(?s)^{name}: .*same type"
+            ):
+                clargs.create_parser(function)
+
+    def test_unhashable_type_hints_are_not_cached(self):
+        def function(level: t.Annotated[str, clargs.extra_info(choices=["a", "b"])]):
+            return level
+
+        for _ in range(2):
+            parser = clargs.create_parser(function)
+            self.assertEqual(clargs.run(parser.parse_args(["a"])), "a")
+        self.assertEqual(aap_from_data.resolve_type.cache_info().currsize, 0)
+
+    def test_equal_metadata_is_not_shared(self):
+        zero = t.Annotated[int, clargs.extra_info(default=0)]
+        # typing caches Annotated by value as well; in a larger program other
+        # hints push it out of that cache before the second one is made
+        for i in range(10_000):
+            t.Annotated[int, i]
+        false = t.Annotated[int, clargs.extra_info(default=False)]
+        self.assertEqual(false, zero)
+        self.assertIsNot(false, zero)
+
+        def first(*, value: zero = 1):
+            return value
+
+        def second(*, value: false = 1):
+            return value
+
+        self.assertIs(clargs.create_parser_and_run(first, []), 0)
+        self.assertIs(clargs.create_parser_and_run(second, []), False)
+        self.assertEqual(aap_from_data.resolve_type.cache_info().currsize, 2)